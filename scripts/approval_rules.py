@@ -0,0 +1,116 @@
+# scripts/approval_rules.py
+"""
+Declarative approval rules for manual_approver --rules
+------------------------------------------------------
+A rule file is JSON with an ordered list of rules; the first rule that
+matches a diff row decides it, unmatched rows are queued for the prompt.
+
+    {"rules": [
+      {"name": "clearance date filled in",
+       "action": "approve",
+       "change_type": "value_changed",
+       "changed_fields": ["date clearance completed"],
+       "fields": {"date clearance completed": {"old": "blank", "new": "date"}}},
+      {"name": "never auto-remove",
+       "action": "queue",
+       "change_type": "removed_record"}
+    ]}
+
+• action          approve | reject | queue
+• change_type     one value or a list
+• changed_fields  the row may only have changed these fields
+• fields          per-field predicates on the _old / _new values:
+                  "blank", "present", "date", {"equals": v}, {"in": [...]},
+                  {"regex": pattern}
+"""
+
+import json
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+ACTIONS = ("approve", "reject", "queue")
+NAMED_PREDICATES = ("blank", "present", "date")
+VALUE_PREDICATES = ("equals", "in", "regex")
+
+
+# ---------- Loading ----------
+def _check_predicate(rule_name, pred) -> None:
+    if isinstance(pred, str) and pred in NAMED_PREDICATES:
+        return
+    if isinstance(pred, dict) and len(pred) == 1 and next(iter(pred)) in VALUE_PREDICATES:
+        return
+    raise ValueError(f"❌ Rule {rule_name!r}: unknown predicate {pred!r}")
+
+def load_rules(path) -> list[dict]:
+    """Read and validate a rule file."""
+    rules = json.loads(Path(path).read_text()).get("rules", [])
+    for i, rule in enumerate(rules):
+        rule.setdefault("name", f"rule {i + 1}")
+        if rule.get("action") not in ACTIONS:
+            raise ValueError(f"❌ Rule {rule['name']!r}: action must be one of {ACTIONS}")
+        for preds in rule.get("fields", {}).values():
+            for side, pred in preds.items():
+                if side not in ("old", "new"):
+                    raise ValueError(f"❌ Rule {rule['name']!r}: use 'old'/'new', not {side!r}")
+                _check_predicate(rule["name"], pred)
+    return rules
+
+
+# ---------- Matching ----------
+def _blank(col: pd.Series) -> pd.Series:
+    return col.isna() | (col.astype(str).str.strip() == "")
+
+def _predicate_mask(col: pd.Series, pred) -> pd.Series:
+    if pred == "blank":
+        return _blank(col)
+    if pred == "present":
+        return ~_blank(col)
+    if pred == "date":
+        return pd.to_datetime(col, errors="coerce", format="mixed").notna()
+    (op, arg), = pred.items()
+    text = col.astype(str)
+    if op == "equals":
+        return col.notna() & (text == str(arg))
+    if op == "in":
+        return col.notna() & text.isin([str(a) for a in arg])
+    return col.notna() & text.str.fullmatch(arg)
+
+def _only_fields(changed: pd.Series, allowed) -> pd.Series:
+    """True where every changed field is in *allowed* (evaluated once per distinct pattern)."""
+    codes, patterns = pd.factorize(changed.fillna(""))
+    allowed = set(allowed)
+    ok = np.array([bool(p) and set(p.split(", ")) <= allowed for p in patterns] + [False])
+    return pd.Series(ok[codes], index=changed.index)
+
+def rule_mask(diff: pd.DataFrame, rule: dict) -> pd.Series:
+    """Boolean mask of the diff rows matched by *rule*."""
+    mask = pd.Series(True, index=diff.index)
+    if "change_type" in rule:
+        types = rule["change_type"]
+        mask &= diff["change_type"].isin([types] if isinstance(types, str) else types)
+    if "changed_fields" in rule:
+        mask &= _only_fields(diff["changed_fields"], rule["changed_fields"])
+    for field, preds in rule.get("fields", {}).items():
+        for side, pred in preds.items():
+            col = f"{field}_{side}"
+            if col not in diff.columns:
+                return pd.Series(False, index=diff.index)
+            mask &= _predicate_mask(diff[col], pred)
+    return mask
+
+def evaluate(diff: pd.DataFrame, rules: list[dict]):
+    """Return (decision, rule_name) Series for every diff row.
+
+    Rules are tried in order; the first match wins. Unmatched rows are
+    'queue' with no rule name.
+    """
+    decision = pd.Series("queue", index=diff.index, dtype=object)
+    rule_name = pd.Series([None] * len(diff), index=diff.index, dtype=object)
+    open_rows = pd.Series(True, index=diff.index)
+    for rule in rules:
+        hit = rule_mask(diff, rule) & open_rows
+        decision[hit] = rule["action"]
+        rule_name[hit] = rule["name"]
+        open_rows &= ~hit
+    return decision, rule_name
@@ -0,0 +1,286 @@
+# scripts/benchmark.py
+"""
+Synthetic benchmark suite
+-------------------------
+Generates seeded raw exports in the real 15-column schema (metadata first
+row included): a "live" week and a following week with a given churn.
+Each pipeline stage then runs in a fresh process, where its wall time,
+CPU time and peak RSS are recorded (the peak over the stage call alone,
+via the VmHWM reset of /proc/self/clear_refs; lifetime peak elsewhere).
+
+Stages: clean, clean_chunked, read, row_id, diff, diff_indexed, approve
+
+Results are JSON; save one as a baseline and compare later runs to flag
+regressions. Runs offline, standard library + pandas/numpy only.
+
+    python -m scripts.benchmark --sizes 10k 100k
+    python -m scripts.benchmark --sizes 1m --churn 0.02 --save-baseline benchmarks/baseline.json
+    python -m scripts.benchmark --sizes 10k 100k --compare benchmarks/baseline.json
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import json, multiprocessing, os, platform, resource, sys, time
+import numpy as np
+import pandas as pd
+from scripts import cli_args
+
+ROOT      = Path(__file__).resolve().parent.parent
+BENCH_DIR = ROOT / "data" / "bench"
+
+SIZES, STAGES = cli_args.SIZES, cli_args.STAGES
+BLOCK = 250_000   # rows generated per block; keeps generation memory flat
+
+HEADER = [
+    "Date Case Created", "Case Status", "Subject Name", "Employee Type", "Primary Position",
+    "Sector", "Region", "Nominee Personal Email Address", "Requestor Name",
+    "CISA Nominator / Sponsor Email Address", "Clearance Type", "Clearance Status",
+    "Date Suitability Decision", "Suitability Decision", "Date Clearance Completed",
+]
+METADATA_ROW = "This information is for Offical Use Only" + "," * (len(HEADER) - 1)
+
+STATUSES   = ["Completed", "open", "Pending", "In Progress", "closed"]
+EMP_TYPES  = ["Private Sector", "Federal", "State", "Contractor"]
+POSITIONS  = ["Manager", "Analyst", "Director", "Engineer", "Specialist"]
+SECTORS    = ["Chemical", "Energy", "Water", "Transportation", "Healthcare", "Financial"]
+REGIONS    = ["CA", "NY", "TX", "WA", "FL", "IL", "VA", "CO"]
+REQUESTORS = ["Wolf, Kelly", "Ng, Sam", "Ortiz, Ana", "Brown, Lee"]
+CLR_TYPES  = ["Secret", "Top Secret", "Public Trust"]
+CLR_STATUS = ["Active", "Pending", "Expired"]
+DECISIONS  = ["Grant", "Deny", "Pending"]
+
+
+# ---------- Generator ----------
+def _dates(rng, n, blank=0.0) -> np.ndarray:
+    days = pd.Timestamp("2018-01-01") + pd.to_timedelta(rng.integers(0, 2500, n), unit="D")
+    out = np.asarray(days.strftime("%-m/%-d/%Y"), dtype=object)
+    out[rng.random(n) < blank] = ""
+    return out
+
+def _block(start: int, stop: int, seed: int) -> pd.DataFrame:
+    """Base rows for subject ids [start, stop); depends only on (seed, start)."""
+    rng = np.random.default_rng([seed, start])
+    n = stop - start
+    ids = np.arange(start, stop)
+    pick = lambda pool: np.asarray(pool, dtype=object)[rng.integers(0, len(pool), n)]
+    return pd.DataFrame({
+        HEADER[0]:  _dates(rng, n),
+        HEADER[1]:  pick(STATUSES),
+        HEADER[2]:  [f"Person {i:08d}" for i in ids],
+        HEADER[3]:  pick(EMP_TYPES),
+        HEADER[4]:  pick(POSITIONS),
+        HEADER[5]:  pick(SECTORS),
+        HEADER[6]:  pick(REGIONS),
+        HEADER[7]:  [f"p{i}@mail.com" for i in ids],
+        HEADER[8]:  pick(REQUESTORS),
+        HEADER[9]:  pick(["kelly.w@c.com", "sam.n@c.com", "ana.o@c.com"]),
+        HEADER[10]: pick(CLR_TYPES),
+        HEADER[11]: pick(CLR_STATUS),
+        HEADER[12]: _dates(rng, n, blank=0.1),
+        HEADER[13]: pick(DECISIONS),
+        HEADER[14]: _dates(rng, n, blank=0.3),
+    })
+
+def _churn(df: pd.DataFrame, start: int, seed: int, churn: float) -> pd.DataFrame:
+    """Next week's version of a block: *churn* of rows edited, churn/2 dropped."""
+    rng = np.random.default_rng([seed, start, 1])
+    n = len(df)
+    edit = rng.random(n) < churn
+    df.loc[edit, HEADER[1]] = np.asarray(STATUSES, dtype=object)[rng.integers(0, len(STATUSES), edit.sum())]
+    edit = rng.random(n) < churn / 2
+    df.loc[edit, HEADER[14]] = _dates(rng, int(edit.sum()))
+    return df[rng.random(n) >= churn / 2]
+
+def write_raw(path: Path, rows: int, seed: int = 0, churn: float | None = None) -> Path:
+    """Write a raw export of *rows* subjects; with *churn* write the following week instead."""
+    with open(path, "w", newline="") as fh:
+        fh.write(METADATA_ROW + "\n" + ",".join(f'"{h}"' if "," in h else h for h in HEADER) + "\n")
+        for start in range(0, rows, BLOCK):
+            df = _block(start, min(start + BLOCK, rows), seed)
+            if churn is not None:
+                df = _churn(df, start, seed, churn)
+            df.to_csv(fh, header=False, index=False)
+        if churn is not None:   # new subjects this week
+            added = int(round(rows * churn / 2))
+            for start in range(rows, rows + added, BLOCK):
+                _block(start, min(start + BLOCK, rows + added), seed).to_csv(fh, header=False, index=False)
+    return path
+
+
+# ---------- Inputs ----------
+def prepare(rows: int, seed: int, churn: float) -> dict:
+    """Generate and clean the live/weekly pair once; reused across runs."""
+    from scripts.run_weekly_pipeline import clean_raw
+
+    d = BENCH_DIR / f"{rows}_{seed}_{churn:g}"
+    d.mkdir(parents=True, exist_ok=True)
+    files = {"raw_live": d / "raw_live.csv", "raw_week": d / "raw_week.csv",
+             "live": d / "live_clean.csv", "week": d / "week_clean.csv"}
+    if not files["week"].exists():
+        write_raw(files["raw_live"], rows, seed)
+        write_raw(files["raw_week"], rows, seed, churn)
+        clean_raw(src=files["raw_live"], out=files["live"])
+        clean_raw(src=files["raw_week"], out=files["week"])
+    return {k: str(v) for k, v in files.items()}
+
+
+# ---------- Stages ----------
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+def _reset_peak() -> bool:
+    """Restart the kernel's peak-RSS mark (VmHWM) from the current RSS; False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+def _peak_mb(since_reset: bool) -> float:
+    """Peak RSS since _reset_peak(), else over the whole process (setup included)."""
+    if since_reset:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _setup(stage: str, files: dict, tmp: Path):
+    """Load a stage's inputs (untimed); returns (callable, rows_in)."""
+    from scripts import run_weekly_pipeline as pipe, live_journal, row_index
+    from scripts.utils import build_row_id
+
+    if stage in ("clean", "clean_chunked"):
+        size = 200_000 if stage == "clean_chunked" else None
+        rows = sum(1 for _ in open(files["raw_week"])) - 2
+        return lambda: pipe.clean_raw(chunksize=size, src=Path(files["raw_week"]), out=tmp / "out.csv"), rows
+    if stage == "read":
+        return lambda: pipe._read_clean(Path(files["week"])), None
+
+    week = pipe._read_clean(Path(files["week"]))
+    if stage == "row_id":
+        return lambda: build_row_id(week.copy()), len(week)
+
+    live = pipe._read_clean(Path(files["live"]))
+    if stage == "diff":
+        return lambda: pipe.diff_frames(live.copy(), week.copy(), "bench"), len(live) + len(week)
+
+    norm = live.copy()
+    pipe._normalize_for_diff(norm)
+    cols = [c for c in pipe.CMP_COLS if c in norm]
+    idx = {"cols": cols, "row_id": build_row_id(norm).to_numpy(dtype=object),
+           "hash": row_index.row_hashes(norm, cols)}
+    if stage == "diff_indexed":
+        return lambda: pipe.diff_frames(live.copy(), week.copy(), "bench", old_index=idx), len(live) + len(week)
+
+    if stage == "approve":
+        from scripts.manual_approver import journal_ops
+        wide, _ = pipe.diff_frames(live.copy(), week.copy(), "bench", old_index=idx)
+        upd = wide.set_index("row_id")
+        live_path = tmp / "live.csv"
+        live.to_csv(live_path, index=False)
+
+        def run():
+            ops = journal_ops(upd, set(idx["row_id"]), pipe.CMP_COLS)
+            live_journal.append(live_path, ops, source="benchmark")
+            return pipe._read_live(live_path)
+        return run, len(upd)
+    raise ValueError(f"❌ Unknown stage: {stage}")
+
+def _run_stage(stage: str, files: dict) -> dict:
+    """Child-process body: set up, then time one call of the stage.
+
+    The peak is taken over the call only: setup (e.g. the diff the approve
+    stage reviews) can use more memory than the stage itself.
+    """
+    import gc, io, contextlib, tempfile, warnings
+    warnings.simplefilter("ignore")
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        fn, rows_in = _setup(stage, files, Path(tmp))
+        gc.collect()
+        base = _rss_mb()
+        reset = _reset_peak()
+        w0, c0 = time.perf_counter(), time.process_time()
+        out = fn()
+        wall, cpu = time.perf_counter() - w0, time.process_time() - c0
+        peak = _peak_mb(reset)
+    rows_out = len(out[0]) if isinstance(out, tuple) else (len(out) if hasattr(out, "__len__") else None)
+    return {
+        "stage": stage, "wall_s": round(wall, 4), "cpu_s": round(cpu, 4),
+        "rows_in": rows_in, "rows_out": rows_out,
+        "rows_per_s": round(rows_in / wall) if rows_in and wall else None,
+        "base_rss_mb": round(base, 1),
+        "peak_rss_mb": round(peak, 1), "peak_stage_only": reset,
+    }
+
+def run(sizes, stages=STAGES, seed: int = 0, churn: float = 0.05, repeat: int = 1) -> dict:
+    """Run *stages* at each size; each measurement is the best of *repeat* fresh processes."""
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for label in sizes:
+        rows = SIZES[label] if label in SIZES else int(label)
+        print(f"🧪 {label}: preparing {rows:,} rows (seed={seed}, churn={churn:g})")
+        files = prepare(rows, seed, churn)
+        for stage in stages:
+            runs = []
+            for _ in range(repeat):
+                with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                    runs.append(pool.submit(_run_stage, stage, files).result())
+            best = min(runs, key=lambda r: r["wall_s"])
+            results.append({"size": label, "rows": rows, **best})
+            print(f"   {stage:14} {best['wall_s']:9.3f}s  cpu {best['cpu_s']:8.3f}s  "
+                  f"peak {best['peak_rss_mb']:8.1f} MB")
+    return {
+        "meta": {"date": datetime.now().isoformat(timespec="seconds"), "seed": seed,
+                 "churn": churn, "repeat": repeat, "python": platform.python_version(),
+                 "pandas": pd.__version__, "numpy": np.__version__,
+                 "machine": platform.machine(), "cpus": os.cpu_count()},
+        "results": results,
+    }
+
+
+# ---------- Baselines ----------
+def compare(current: dict, baseline: dict, tolerance: float = 0.25, floor_s: float = 0.05) -> list[dict]:
+    """Stages that got slower (or hungrier) than *baseline* by more than *tolerance*.
+
+    Timings under *floor_s* in both runs are treated as noise.
+    """
+    base = {(r["size"], r["stage"]): r for r in baseline["results"]}
+    flagged = []
+    for r in current["results"]:
+        b = base.get((r["size"], r["stage"]))
+        if b is None:
+            continue
+        slow = r["wall_s"] > b["wall_s"] * (1 + tolerance) and r["wall_s"] - b["wall_s"] > floor_s
+        heavy = r["peak_rss_mb"] > b["peak_rss_mb"] * (1 + tolerance)
+        if slow or heavy:
+            flagged.append({"size": r["size"], "stage": r["stage"],
+                            "wall_s": [b["wall_s"], r["wall_s"]],
+                            "peak_rss_mb": [b["peak_rss_mb"], r["peak_rss_mb"]]})
+    return flagged
+
+
+# ---------- CLI ----------
+def main(argv: list[str] | None = None) -> None:
+    args = cli_args.benchmark_parser().parse_args(argv)
+
+    report = run(args.sizes, args.stages, args.seed, args.churn, args.repeat)
+    for path in filter(None, (args.out, args.save_baseline)):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=1))
+        print(f"✅ Results written -> {path}")
+
+    if args.compare:
+        flagged = compare(report, json.loads(args.compare.read_text()), args.tolerance)
+        for f in flagged:
+            print(f"⚠️  REGRESSION {f['size']} {f['stage']}: wall {f['wall_s'][0]}s → {f['wall_s'][1]}s, "
+                  f"peak {f['peak_rss_mb'][0]} → {f['peak_rss_mb'][1]} MB")
+        if flagged:
+            sys.exit(1)
+        print(f"✅ No regressions against {args.compare}")
+
+if __name__ == "__main__":
+    main()
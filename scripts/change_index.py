@@ -0,0 +1,178 @@
+# scripts/change_index.py
+"""
+Per-record change index
+-----------------------
+One SQLite table over every long diff set and approved-changes file,
+keyed by (row_id, field), so a record's full change history is an index
+lookup instead of a scan of every ChangesLong_* / Approved_Changes_* file.
+
+• Diff entries come straight from the long diffs (field "_row" marks a
+  whole record appearing or disappearing).
+• Approval entries are the approved wide rows in the same shape, with
+  who approved them and by which rule.
+• Indexing is incremental: each source is recorded with its size/mtime
+  and only new or rewritten sources are (re)read. The pipeline and
+  manual_approver add their outputs as they write them.
+
+    python -m scripts.change_index update               # catch up on files on disk
+    python -m scripts.change_index timeline <row_id> [--field "case status"]
+"""
+
+from contextlib import closing
+from pathlib import Path
+import argparse, re, sqlite3
+import pandas as pd
+from scripts import diff_store
+
+ROOT         = Path(__file__).resolve().parent.parent
+DIFF_LONG    = ROOT / "data" / "diffs" / "long"
+APPROVED_DIR = ROOT / "data" / "diffs" / "approved"
+INDEX_PATH   = ROOT / "data" / "diffs" / "change_index.sqlite"
+
+ENTRY_COLS = ["row_id", "field", "date", "source", "tag", "change_type", "old", "new",
+              "matched_row_id", "approved_by", "rule"]
+
+
+def _connect(db: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE IF NOT EXISTS sources "
+                 "(id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime_ns INTEGER)")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS changes ({', '.join(c + ' TEXT' for c in ENTRY_COLS)}, "
+                 "source_id INTEGER)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_changes_row ON changes (row_id, field, date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_changes_source ON changes (source_id)")
+    return conn
+
+def _date(path: Path) -> str:
+    m = re.search(r"\d{4}-\d{2}-\d{2}", path.name)
+    return m.group(0) if m else ""
+
+def _stamp(path: Path) -> tuple[int, int]:
+    """Size/mtime of a source; a diff set changes with its partitions.json."""
+    st = (path / diff_store.PARTITIONS if path.is_dir() else path).stat()
+    return st.st_size, st.st_mtime_ns
+
+
+# ---------- Entries ----------
+def diff_entries(path: Path) -> pd.DataFrame:
+    """Index entries of a long diff set (or legacy ChangesLong_*.csv)."""
+    long = diff_store.read(path)
+    if long.empty:
+        return pd.DataFrame(columns=ENTRY_COLS)
+    out = long[["row_id", "field", "old", "new"]].copy()
+    out["date"] = _date(path)
+    out["source"] = "diff"
+    out["tag"] = long["tag"] if "tag" in long else None
+    out["change_type"] = diff_store.long_change_type(long).astype(str)
+    return out.reindex(columns=ENTRY_COLS)
+
+def approved_entries(path: Path) -> pd.DataFrame:
+    """Index entries of an Approved_Changes_*.csv, one per approved field (or _row)."""
+    upd = pd.read_csv(path, dtype=str)
+    if upd.empty:
+        return pd.DataFrame(columns=ENTRY_COLS)
+    ctype = upd["change_type"]
+    whole = ctype.isin(["new_record", "removed_record"])
+    upd["field"] = upd["changed_fields"].fillna("").str.split(", ").where(~whole, "_row")
+    out = upd.explode("field", ignore_index=True)
+    out = out[out["field"] != ""].reset_index(drop=True)
+    out["old"] = out["new"] = None
+    for f in out["field"].unique():
+        hit = (out["field"] == f).to_numpy()
+        if f == "_row":
+            added = (out["change_type"] == "new_record").to_numpy()
+            out.loc[hit & ~added, "old"] = "present"
+            out.loc[hit & added, "new"] = "present"
+        else:
+            for side in ("old", "new"):
+                if f"{f}_{side}" in out:
+                    out.loc[hit, side] = out.loc[hit, f"{f}_{side}"]
+    out["date"] = _date(path)
+    out["source"] = "approved"
+    return out.reindex(columns=ENTRY_COLS)
+
+
+# ---------- Indexing ----------
+def add(path: Path, db: Path | None = None) -> int:
+    """(Re)index one source unless it is unchanged; returns the entries written."""
+    path = Path(path)
+    entries = approved_entries if path.name.startswith("Approved_Changes_") else diff_entries
+    stamp = _stamp(path)
+    with closing(_connect(db or INDEX_PATH)) as conn, conn:
+        row = conn.execute("SELECT id, size, mtime_ns FROM sources WHERE path = ?",
+                           [str(path)]).fetchone()
+        if row and tuple(row[1:]) == stamp:
+            return 0
+        if row:
+            conn.execute("DELETE FROM changes WHERE source_id = ?", [row[0]])
+            conn.execute("UPDATE sources SET size = ?, mtime_ns = ? WHERE id = ?", [*stamp, row[0]])
+            sid = row[0]
+        else:
+            sid = conn.execute("INSERT INTO sources (path, size, mtime_ns) VALUES (?, ?, ?)",
+                               [str(path), *stamp]).lastrowid
+        df = entries(path)
+        df = df.astype(object).where(df.notna(), None)
+        conn.executemany(f"INSERT INTO changes VALUES ({', '.join('?' * (len(ENTRY_COLS) + 1))})",
+                         ((*r, sid) for r in df.itertuples(index=False, name=None)))
+    return len(df)
+
+def sources(long_dir: Path | None = None, approved_dir: Path | None = None) -> list[Path]:
+    long_dir, approved_dir = long_dir or DIFF_LONG, approved_dir or APPROVED_DIR
+    found = [p for p in long_dir.glob("ChangesLong_*")
+             if (p / diff_store.PARTITIONS).exists() or p.suffix == ".csv"]
+    found += approved_dir.glob("Approved_Changes_*.csv")
+    return sorted(found)
+
+def update(db: Path | None = None, long_dir: Path | None = None,
+           approved_dir: Path | None = None) -> int:
+    """Index new or rewritten sources and forget deleted ones; returns entries written."""
+    db = db or INDEX_PATH
+    found = sources(long_dir, approved_dir)
+    n = sum(add(p, db) for p in found)
+    keep = {str(p) for p in found}
+    with closing(_connect(db)) as conn, conn:
+        gone = [sid for sid, p in conn.execute("SELECT id, path FROM sources") if p not in keep]
+        conn.executemany("DELETE FROM changes WHERE source_id = ?", [(s,) for s in gone])
+        conn.executemany("DELETE FROM sources WHERE id = ?", [(s,) for s in gone])
+    return n
+
+
+# ---------- Lookup ----------
+def timeline(row_id: str, field: str | None = None, db: Path | None = None) -> pd.DataFrame:
+    """Every indexed diff and approval entry of *row_id* (optionally one field), oldest first."""
+    db = db or INDEX_PATH
+    if not db.exists():
+        return pd.DataFrame(columns=ENTRY_COLS + ["file"])
+    query = (f"SELECT {', '.join('c.' + c for c in ENTRY_COLS)}, s.path AS file "
+             "FROM changes c JOIN sources s ON s.id = c.source_id WHERE c.row_id = ?")
+    params = [row_id]
+    if field:
+        query += " AND c.field = ?"
+        params.append(field)
+    with closing(_connect(db)) as conn:
+        df = pd.read_sql_query(query + " ORDER BY c.date, c.source DESC, c.field", conn, params=params)
+    df["file"] = df["file"].map(lambda p: Path(p).name)
+    return df
+
+
+# ---------- CLI ----------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the per-record change index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("update")
+    p = sub.add_parser("timeline"); p.add_argument("row_id"); p.add_argument("--field")
+    args = parser.parse_args()
+
+    if args.command == "update":
+        n = update()
+        print(f"🗂️  Change index up to date ({n} new entries) -> {INDEX_PATH}")
+    else:
+        update()
+        df = timeline(args.row_id, args.field)
+        if df.empty:
+            print(f"ℹ️  No indexed changes for {args.row_id}.")
+        else:
+            print(df.dropna(axis=1, how="all").to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# scripts/cli_args.py
+"""
+Argument parsers for the delegated stakeholder commands
+-------------------------------------------------------
+`stakeholder diff|approve|benchmark` hand their arguments to
+run_weekly_pipeline, manual_approver and benchmark, which load pandas and
+numpy at import. The parsers live here, standard library only, so
+`--help` and usage errors are answered before any of that is imported;
+each module builds its own parser from the same function.
+"""
+
+from pathlib import Path
+import argparse, importlib.util
+
+COMPRESSIONS = ["zstd", "gzip", "none"]
+DEFAULT_COMPRESSION = "zstd" if importlib.util.find_spec("zstandard") else "gzip"
+CHANGE_TYPES = ["new_record", "removed_record", "value_changed"]
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+STAGES = ["clean", "clean_chunked", "read", "row_id", "diff", "diff_indexed", "approve"]
+
+
+# ---------- run_weekly_pipeline ----------
+def pipeline_parser(prog: str | None = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog)
+    parser.add_argument(
+        "--auto-update",
+        action="store_true",
+        help="Directly overwrite Stakeholder_Live_Clean.csv without manual approval.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Stream the raw export in chunks of this many rows to bound memory.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recompute every stage even if its inputs are unchanged since the last run.",
+    )
+    parser.add_argument(
+        "--backlog",
+        action="store_true",
+        help="Process every unprocessed raw export in date order instead of just the newest.",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Split each diff into this many row_id-hash shards run in parallel.",
+    )
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help="Write a per-stage timing/memory report to data/diffs/reports/.",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="With --report, also record each stage's tracemalloc peak (slower).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        default=None,
+        help="Dump cProfile stats for the whole run to this file.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --backlog and --shards (default: one per CPU).",
+    )
+    parser.add_argument(
+        "--diff-compression",
+        choices=COMPRESSIONS,
+        default=None,
+        help=f"Compression of the diff partitions (default: {DEFAULT_COMPRESSION}).",
+    )
+    parser.add_argument(
+        "--out-of-core",
+        action="store_true",
+        help="Diff by external sort-merge on disk instead of in memory (see scripts/ooc_diff.py).",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        default=512,
+        help="With --out-of-core, the memory to size runs and diff batches for, in MB (default: 512).",
+    )
+    return parser
+
+
+# ---------- manual_approver ----------
+def approver_parser(prog: str | None = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog)
+    parser.add_argument("--dry-run", action="store_true", help="Run full process without saving any files")
+    parser.add_argument("--rules", type=Path, help="JSON rule file; auto-approve/reject matching rows, prompt for the rest")
+    parser.add_argument("--report", action="store_true", help="Write a per-stage timing/memory report to data/diffs/reports/")
+    parser.add_argument("--trace-memory", action="store_true", help="With --report, also record tracemalloc peaks (slower)")
+    parser.add_argument("--profile", type=Path, help="Dump cProfile stats for the run to this file")
+    parser.add_argument("--tag", default="weekly_vs_live", choices=["weekly_vs_live", "week_to_week", "all"],
+                        help="Diff comparison to review (default: weekly_vs_live)")
+    parser.add_argument("--change-type", nargs="+", choices=CHANGE_TYPES,
+                        help="Only review these change types")
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard the saved review session for this diff and start over")
+    return parser
+
+
+# ---------- benchmark ----------
+def benchmark_parser(prog: str | None = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog, description="Benchmark the pipeline stages on synthetic data.")
+    parser.add_argument("--sizes", nargs="+", default=["10k", "100k"],
+                        help=f"Row counts: {', '.join(SIZES)} or an integer.")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--churn", type=float, default=0.05, help="Fraction of rows changed week to week.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="Keep the fastest of N runs per stage.")
+    parser.add_argument("--out", type=Path, help="Write results JSON here.")
+    parser.add_argument("--save-baseline", type=Path, help="Write results JSON as the new baseline.")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    return parser
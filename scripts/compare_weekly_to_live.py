@@ -1,6 +1,7 @@
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
+from scripts.utils import normalize_text_series
 
 # Setup paths
 staging_dir = Path("data/staging")
@@ -21,13 +22,10 @@ live = pd.read_csv(live_path, parse_dates=["date_submitted", "date_cleared"])
 print(f"📁 Live records: {len(live)}, Weekly records: {len(weekly)}")
 
 # Normalize text fields
-def normalize_text(val):
-    return str(val).strip().lower() if pd.notna(val) else ""
-
 text_cols = ["name", "company", "status", "nominator", "clearance_level"]
 for col in text_cols:
-    weekly[col] = weekly[col].apply(normalize_text)
-    live[col] = live[col].apply(normalize_text)
+    weekly[col] = normalize_text_series(weekly[col])
+    live[col] = normalize_text_series(live[col])
 
 # Add row_id for matching
 weekly["row_id"] = weekly["name"] + "*" + weekly["company"] + "*" + weekly["date_submitted"].astype(str)
@@ -0,0 +1,194 @@
+# scripts/diff_store.py
+"""
+Partitioned, compressed diff outputs
+------------------------------------
+A week's diffs are a directory per kind, one compressed CSV per
+comparison tag and change type:
+
+    data/diffs/wide/Changes_<week>/weekly_vs_live/value_changed.csv.gz
+    data/diffs/long/ChangesLong_<week>/week_to_week/new_record.csv.gz
+    .../partitions.json      partition order and row counts
+
+Compression is zstd when `zstandard` is installed, else gzip. A
+DiffWriter appends each comparison as soon as it is produced, so the
+comparisons are never concatenated in memory; read() loads only the
+partitions asked for. Older single-file Changes_*.csv outputs are still
+readable (whole file only).
+"""
+
+from pathlib import Path
+import csv, gzip, io, json, shutil
+import numpy as np
+import pandas as pd
+from scripts.cli_args import COMPRESSIONS, CHANGE_TYPES   # shared with the light CLI parsers
+
+try:
+    import zstandard
+    DEFAULT_COMPRESSION = "zstd"
+except ImportError:
+    zstandard = None
+    DEFAULT_COMPRESSION = "gzip"
+
+SUFFIX = {"zstd": ".csv.zst", "gzip": ".csv.gz", "none": ".csv"}
+PARTITIONS = "partitions.json"
+
+GZIP_LEVEL = 1   # diffs are re-read once or twice; favour write speed
+ZSTD_LEVEL = 3
+
+
+def _open(path: Path, compression: str, mode: str = "w"):
+    """Text handle on a partition file; mode "a" adds a new compressed frame/member."""
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("❌ zstd compression needs the `zstandard` package")
+        return zstandard.open(path, f"{mode}t", cctx=zstandard.ZstdCompressor(level=ZSTD_LEVEL),
+                              newline="")
+    if compression == "gzip":
+        # mtime=0 keeps the bytes reproducible for the stage cache
+        raw = gzip.GzipFile(path, f"{mode}b", compresslevel=GZIP_LEVEL, mtime=0)
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    return open(path, mode, newline="")
+
+def _reader(path: Path, compression: str):
+    if compression == "zstd":
+        return zstandard.open(path, "rt", newline="")
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, newline="")
+
+def long_change_type(long: pd.DataFrame) -> pd.Series:
+    """Change type of each long entry (_row entries are whole new/removed records)."""
+    row = long["field"] == "_row"
+    added = long["new"].notna()
+    codes = np.where(row, np.where(added, 0, 1), 2)
+    return pd.Series(pd.Categorical.from_codes(codes, CHANGE_TYPES), index=long.index)
+
+
+class DiffWriter:
+    """Write one week's wide and long diffs, a comparison (tag) at a time.
+
+    append() may be called repeatedly for the same tag (streamed diffs);
+    each partition stays open until close(). A later piece with extra
+    trailing columns widens the rows already written.
+
+    Partitions are written into hidden .<name>.tmp directories that close()
+    renames into place, so a failed run leaves the previous set of that
+    week untouched and latest() never sees a partial one.
+    """
+
+    def __init__(self, wide_dir: Path, long_dir: Path, compression: str | None = None):
+        self.compression = compression or DEFAULT_COMPRESSION
+        self.final = {"wide": Path(wide_dir), "long": Path(long_dir)}
+        self.dirs = {k: d.with_name(f".{d.name}.tmp") for k, d in self.final.items()}
+        self.parts = {k: {} for k in self.dirs}     # rel -> partition entry
+        self.handles, self.columns, self.tags = {}, {}, []
+        for d in self.dirs.values():
+            shutil.rmtree(d, ignore_errors=True)   # left over from an interrupted run
+            d.mkdir(parents=True)
+
+    def _widen(self, kind: str, rel: str, extra: list[str]) -> None:
+        """Add empty *extra* columns to the rows of a partition written so far."""
+        self.handles.pop((kind, rel)).close()
+        path = self.dirs[kind] / rel
+        tmp = path.with_name(path.name + ".tmp")
+        with _reader(path, self.compression) as src, _open(tmp, self.compression) as dst:
+            out = csv.writer(dst, lineterminator="\n")
+            rows = csv.reader(src)
+            out.writerow(next(rows) + extra)
+            out.writerows(r + [""] * len(extra) for r in rows)
+        tmp.replace(path)
+        self.handles[(kind, rel)] = _open(path, self.compression, "a")
+        self.columns[(kind, rel)] += extra
+
+    def _write(self, kind: str, tag: str, df: pd.DataFrame, types: pd.Series) -> None:
+        for ctype in CHANGE_TYPES:
+            part = df[(types == ctype).to_numpy()]
+            if part.empty:
+                continue
+            rel = f"{tag}/{ctype}{SUFFIX[self.compression]}"
+            key = (kind, rel)
+            if key not in self.handles:
+                path = self.dirs[kind] / rel
+                path.parent.mkdir(exist_ok=True)
+                self.handles[key] = _open(path, self.compression)
+                self.columns[key] = list(part.columns)
+                self.parts[kind][rel] = {"tag": tag, "change_type": ctype, "file": rel, "rows": 0}
+                part.to_csv(self.handles[key], index=False)
+            else:
+                extra = [c for c in part.columns if c not in self.columns[key]]
+                if extra:
+                    self._widen(kind, rel, extra)
+                part.reindex(columns=self.columns[key]).to_csv(self.handles[key], index=False,
+                                                                header=False)
+            self.parts[kind][rel]["rows"] += len(part)
+
+    def append(self, tag: str, wide: pd.DataFrame, long: pd.DataFrame) -> None:
+        """Add diff rows of comparison *tag*; partitions grow across calls."""
+        if tag not in self.tags:
+            self.tags.append(tag)
+        if len(wide):
+            self._write("wide", tag, wide, wide["change_type"])
+        if len(long):
+            self._write("long", tag, long, long_change_type(long))
+
+    def write(self, tag: str, wide: pd.DataFrame, long: pd.DataFrame) -> None:
+        """Write the diffs of comparison *tag* (each tag once per week)."""
+        self.append(tag, wide, long)
+
+    def _close_handles(self) -> None:
+        for fh in self.handles.values():
+            fh.close()
+        self.handles = {}
+
+    def close(self) -> None:
+        """Finish the partitions and move the set into place (replacing a re-run week)."""
+        self._close_handles()
+        for kind, d in self.dirs.items():
+            # partition order: comparison, then change type
+            parts = sorted(self.parts[kind].values(), key=lambda p: (
+                self.tags.index(p["tag"]), CHANGE_TYPES.index(p["change_type"])))
+            (d / PARTITIONS).write_text(json.dumps(
+                {"compression": self.compression, "partitions": parts}, indent=1))
+        for kind, d in self.dirs.items():
+            shutil.rmtree(self.final[kind], ignore_errors=True)
+            d.rename(self.final[kind])
+
+    def abort(self) -> None:
+        """Drop everything written so far; the previous set (if any) stays."""
+        self._close_handles()
+        for d in self.dirs.values():
+            shutil.rmtree(d, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# ---------- Reading ----------
+def partitions(set_dir: Path) -> list[dict]:
+    return json.loads((Path(set_dir) / PARTITIONS).read_text())["partitions"]
+
+def latest(out_dir: Path, prefix: str) -> Path | None:
+    """Newest diff set (or legacy CSV) named <prefix><date> in *out_dir*."""
+    found = sorted((p for p in out_dir.glob(f"{prefix}*")
+                    if (p / PARTITIONS).exists() or p.suffix == ".csv"),
+                   key=lambda p: (p.name.removesuffix(".csv"), p.is_dir()))
+    return found[-1] if found else None
+
+def read(path: Path, tag: str | None = None, change_type=None) -> pd.DataFrame:
+    """Rows of the matching partitions (all when *tag*/*change_type* are None)."""
+    path = Path(path)
+    if isinstance(change_type, str):
+        change_type = [change_type]
+    if path.is_file():   # legacy single-file output: no tag to filter on
+        df = pd.read_csv(path)
+        return df[df["change_type"].isin(change_type)] if change_type and len(df) else df
+    frames = [pd.read_csv(path / p["file"]) for p in partitions(path)
+              if (tag is None or p["tag"] == tag)
+              and (change_type is None or p["change_type"] in change_type)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,278 @@
+# scripts/history_store.py
+"""
+Delta history store for weekly snapshots
+----------------------------------------
+Replaces full copies of every cleaned weekly file in data/history/.
+Each week is stored under data/history/store/ as the rows that were
+added or changed since the previous week plus the row_ids that were
+dropped; every KEYFRAME_EVERY weeks a full snapshot bounds the
+reconstruction chain.
+
+• as_of(date)        -> the weekly frame in effect on *date*
+• timeline(row_id)   -> every week the row appeared, changed or vanished,
+                        read from a per-row event table (only the weeks
+                        involved are loaded)
+
+Frames are stored typed, exactly as the pipeline reads a cleaned file,
+so a reconstructed week diffs identically to the original CSV. Row
+order within a week is not preserved.
+
+    python -m scripts.history_store weeks
+    python -m scripts.history_store as-of 2025-07-19 [--out week.csv]
+    python -m scripts.history_store timeline "miller, sam_manager"
+    python -m scripts.history_store import
+"""
+
+from pathlib import Path
+import argparse, hashlib, json, os, re
+import numpy as np
+import pandas as pd
+from scripts.utils import build_row_id
+
+ROOT      = Path(__file__).resolve().parent.parent
+HIST_DIR  = ROOT / "data" / "history"
+STORE_DIR = HIST_DIR / "store"
+
+KEYFRAME_EVERY = 13   # weeks between full snapshots
+
+
+# ---------- Manifest ----------
+def _manifest_path(store: Path) -> Path:
+    return store / "weeks.json"
+
+def _load(store: Path) -> list[dict]:
+    try:
+        return json.loads(_manifest_path(store).read_text())
+    except FileNotFoundError:
+        return []
+
+def _save(store: Path, weeks: list[dict]) -> None:
+    tmp = _manifest_path(store).with_suffix(".tmp")
+    tmp.write_text(json.dumps(weeks, indent=1))
+    os.replace(tmp, _manifest_path(store))
+
+def _dir(store: Path | None) -> Path:
+    return store or STORE_DIR
+
+def manifest_path(store: Path | None = None) -> Path:
+    return _manifest_path(_dir(store))
+
+def weeks(store: Path | None = None) -> list[str]:
+    store = _dir(store)
+    return [w["week"] for w in _load(store)]
+
+def week_file(week: str, store: Path | None = None) -> Path:
+    """Stored data file of *week*."""
+    store = _dir(store)
+    return store / next(w["file"] for w in _load(store) if w["week"] == week)
+
+def week_rows(week: str, store: Path | None = None) -> int:
+    """Row count of stored *week*."""
+    return next(w["rows"] for w in _load(_dir(store)) if w["week"] == week)
+
+def week_label(path: Path) -> str:
+    """'Weekly_Cleaned_2025-07-19.csv' -> '2025-07-19'."""
+    m = re.search(r"\d{4}-\d{2}-\d{2}", path.stem)
+    return m.group(0) if m else path.stem
+
+
+# ---------- Row keys / fingerprints ----------
+def _keyed(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.reset_index(drop=True)
+    out.index = pd.Index(build_row_id(out[[c for c in ("subject name", "primary position") if c in out]].copy()).to_numpy(dtype=object), name="row_id")
+    return out
+
+def _row_hashes(df: pd.DataFrame) -> pd.Series:
+    return pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy(), index=df.index)
+
+def _digest(df: pd.DataFrame) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\x1f".join(map(str, df.columns)).encode())
+    h.update(np.sort(_row_hashes(df).to_numpy()).tobytes())
+    return h.hexdigest()
+
+
+# ---------- Deltas ----------
+def _delta(prev: pd.DataFrame | None, cur: pd.DataFrame):
+    """(upserts, removed ids, events) turning keyed *prev* into keyed *cur*."""
+    if prev is None:
+        events = pd.DataFrame({"row_id": cur.index, "op": "added"})
+        return cur, [], events
+    if list(prev.columns) != list(cur.columns):
+        same = pd.Series(False, index=cur.index)
+    else:
+        ph = _row_hashes(prev)
+        same = _row_hashes(cur).reindex(cur.index).eq(ph.reindex(cur.index))
+    is_new = ~cur.index.isin(prev.index)
+    removed = prev.index.difference(cur.index)
+    upserts = cur[~same.to_numpy()]
+    events = pd.concat([
+        pd.DataFrame({"row_id": cur.index[is_new], "op": "added"}),
+        pd.DataFrame({"row_id": cur.index[~same.to_numpy() & ~is_new], "op": "changed"}),
+        pd.DataFrame({"row_id": removed, "op": "removed"}),
+    ], ignore_index=True)
+    return upserts, list(removed), events
+
+def _apply(state: pd.DataFrame, entry: dict, store: Path) -> pd.DataFrame:
+    data = pd.read_pickle(store / entry["file"])
+    if entry["kind"] == "full":
+        return data
+    keep = ~state.index.isin(data.index) & ~state.index.isin(entry["removed"])
+    return pd.concat([state[keep], data])[entry["columns"]]
+
+
+# ---------- Reconstruction ----------
+def _state_at(ws: list[dict], i: int, store: Path) -> pd.DataFrame:
+    start = max(j for j in range(i + 1) if ws[j]["kind"] == "full")
+    state = None
+    for entry in ws[start:i + 1]:
+        state = _apply(state, entry, store)
+    return state
+
+def _public(state: pd.DataFrame) -> pd.DataFrame:
+    return state.reset_index(drop=True)
+
+def load_week(week: str, store: Path | None = None) -> pd.DataFrame:
+    store = _dir(store)
+    ws = _load(store)
+    i = [w["week"] for w in ws].index(week)
+    return _public(_state_at(ws, i, store))
+
+def as_of(date, store: Path | None = None) -> pd.DataFrame:
+    """Weekly frame in effect on *date* (the latest week on or before it)."""
+    store = _dir(store)
+    ws = _load(store)
+    when = pd.Timestamp(date).strftime("%Y-%m-%d")
+    idx = [i for i, w in enumerate(ws) if w["week"] <= when]
+    if not idx:
+        raise LookupError(f"❌ No weekly snapshot on or before {when}")
+    return _public(_state_at(ws, idx[-1], store))
+
+def previous_week(week: str, store: Path | None = None) -> str | None:
+    store = _dir(store)
+    earlier = [w for w in weeks(store) if w < week]
+    return earlier[-1] if earlier else None
+
+
+# ---------- Writing ----------
+def _write_entry(store: Path, ws: list[dict], i: int, prev, cur, force_full=False) -> pd.DataFrame:
+    """(Re)write week *i* of *ws* from keyed frames; returns its events."""
+    week = ws[i]["week"]
+    upserts, removed, events = _delta(prev, cur)
+    since_full = 0
+    for w in reversed(ws[:i]):
+        if w["kind"] == "full":
+            break
+        since_full += 1
+    full = force_full or prev is None or since_full + 1 >= KEYFRAME_EVERY
+    name = f"week_{week}.pkl.gz"
+    (cur if full else upserts).to_pickle(store / name, compression="gzip")
+    ws[i].update({"file": name, "kind": "full" if full else "delta",
+                  "removed": [] if full else removed, "columns": list(cur.columns),
+                  "rows": len(cur), "digest": _digest(cur)})
+    return events.assign(week=week)
+
+def add_week(week: str, df: pd.DataFrame, store: Path | None = None) -> bool:
+    """Store *df* as the snapshot for *week*; returns False if it was already stored unchanged.
+
+    Weeks may arrive out of order or be re-added; the following week's
+    delta is rebuilt against the new content.
+    """
+    store = _dir(store)
+    store.mkdir(parents=True, exist_ok=True)
+    cur = _keyed(df)
+    ws = _load(store)
+    labels = [w["week"] for w in ws]
+    if week in labels and ws[labels.index(week)]["digest"] == _digest(cur):
+        return False
+
+    nxt_state = None
+    if week in labels:
+        i = labels.index(week)
+        if i + 1 < len(ws):
+            nxt_state = _state_at(ws, i + 1, store)
+    else:
+        i = int(np.searchsorted(labels, week))
+        if i < len(ws):
+            nxt_state = _state_at(ws, i, store)
+        ws.insert(i, {"week": week})
+
+    prev_state = _state_at(ws, i - 1, store) if i > 0 else None
+    events = _events(store)
+    touched = [week]
+    new_events = [_write_entry(store, ws, i, prev_state, cur)]
+    if nxt_state is not None:
+        touched.append(ws[i + 1]["week"])
+        new_events.append(_write_entry(store, ws, i + 1, cur, nxt_state,
+                                       force_full=ws[i + 1].get("kind") == "full"))
+    events = pd.concat([events[~events["week"].isin(touched)], *new_events], ignore_index=True)
+    events.sort_values(["row_id", "week"], kind="stable").to_pickle(store / "events.pkl")
+    _save(store, ws)
+    return True
+
+
+# ---------- Timeline ----------
+def _events(store: Path) -> pd.DataFrame:
+    path = store / "events.pkl"
+    if path.exists():
+        return pd.read_pickle(path)
+    return pd.DataFrame({"row_id": pd.Series(dtype=object), "op": pd.Series(dtype=object),
+                         "week": pd.Series(dtype=object)})
+
+def timeline(row_id: str, store: Path | None = None) -> pd.DataFrame:
+    """One row per week in which *row_id* was added, changed or removed, with its values."""
+    store = _dir(store)
+    ev = _events(store)
+    ids = ev["row_id"].to_numpy(dtype=object)
+    lo, hi = np.searchsorted(ids, row_id, "left"), np.searchsorted(ids, row_id, "right")
+    hits = ev.iloc[lo:hi]
+    by_week = {w["week"]: w for w in _load(store)}
+    rows = []
+    for week, op in zip(hits["week"], hits["op"]):
+        values = {}
+        if op != "removed":
+            data = pd.read_pickle(store / by_week[week]["file"])
+            values = data.loc[row_id].to_dict()
+        rows.append({"week": week, "op": op, **values})
+    return pd.DataFrame(rows)
+
+
+# ---------- Legacy import ----------
+def import_legacy(hist_dir: Path = HIST_DIR, store: Path | None = None, read=None) -> int:
+    """Load full Weekly_Cleaned_*.csv copies from *hist_dir* into the store."""
+    store = _dir(store)
+    read = read or (lambda p: pd.read_csv(p).dropna(how="all"))
+    n = 0
+    for f in sorted(hist_dir.glob("Weekly_Cleaned_*.csv")):
+        n += add_week(week_label(f), read(f), store)
+    return n
+
+
+# ---------- CLI ----------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the weekly history store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("weeks")
+    p = sub.add_parser("as-of"); p.add_argument("date"); p.add_argument("--out", type=Path)
+    p = sub.add_parser("timeline"); p.add_argument("row_id")
+    sub.add_parser("import")
+    args = parser.parse_args()
+
+    if args.command == "weeks":
+        for w in _load(STORE_DIR):
+            print(f"{w['week']}  {w['kind']:5}  {w['rows']:>8} rows  {w['file']}")
+    elif args.command == "as-of":
+        df = as_of(args.date)
+        if args.out:
+            df.to_csv(args.out, index=False); print(f"✅ Snapshot written -> {args.out}")
+        else:
+            print(df.to_string())
+    elif args.command == "timeline":
+        print(timeline(args.row_id).to_string())
+    else:
+        from scripts import schema
+        n = import_legacy(read=lambda p: schema.read(p).dropna(how="all"))
+        print(f"✅ Imported {n} weekly file(s) into {STORE_DIR}")
+
+if __name__ == "__main__":
+    main()
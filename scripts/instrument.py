@@ -0,0 +1,139 @@
+# scripts/instrument.py
+"""
+Per-stage run instrumentation
+-----------------------------
+Wrap a step in `with instrument.stage("name") as st:` and, while a report
+is active, its wall time, CPU time, rows in/out and memory are recorded.
+Nested stages are stored with dotted names ("diff.merge"). With no
+active report stage() hands back a shared no-op context, so the calls
+can stay in hot paths.
+
+Memory is the process peak RSS at stage end, plus the stage's own
+tracemalloc peak when trace_memory is on (slower; numpy/pandas buffers
+are included).
+
+    report = instrument.start("run_weekly_pipeline", trace_memory=False)
+    with instrument.stage("read", rows_in=n) as st:
+        df = ...
+        st.rows_out = len(df)
+    instrument.finish(path)
+"""
+
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+import cProfile, json, os, resource, time, tracemalloc
+
+
+class _Stage:
+    __slots__ = ("rows_in", "rows_out")
+
+    def __init__(self, rows_in=None):
+        self.rows_in = rows_in
+        self.rows_out = None
+
+_NULL = nullcontext(_Stage())
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Report:
+    def __init__(self, command: str, trace_memory: bool = False, args: dict | None = None):
+        self.command = command
+        self.args = args or {}
+        self.trace_memory = trace_memory
+        self.started = datetime.now()
+        self.stages: list[dict] = []
+        self._stack: list[list] = []   # [name, running tracemalloc peak]
+        self._t0 = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, rows_in=None):
+        st = _Stage(rows_in)
+        if self.trace_memory:
+            if self._stack:   # fold what the parent used so far before resetting
+                self._stack[-1][1] = max(self._stack[-1][1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._stack.append([name, 0])
+        path = ".".join(s[0] for s in self._stack)
+        entry = {"stage": path}
+        self.stages.append(entry)
+        w0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield st
+        finally:
+            wall, cpu = time.perf_counter() - w0, time.process_time() - c0
+            _, own_peak = self._stack.pop()
+            entry.update(wall_s=round(wall, 4), cpu_s=round(cpu, 4),
+                         rows_in=st.rows_in, rows_out=st.rows_out)
+            rows = st.rows_in if st.rows_in is not None else st.rows_out
+            entry["rows_per_s"] = round(rows / wall) if rows and wall > 0 else None
+            entry["peak_rss_mb"] = round(_peak_rss_mb(), 1)
+            if self.trace_memory:
+                peak = max(own_peak, tracemalloc.get_traced_memory()[1])
+                entry["traced_peak_mb"] = round(peak / 2**20, 1)
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+
+    def to_dict(self) -> dict:
+        return {
+            "command": self.command,
+            "started": self.started.isoformat(timespec="seconds"),
+            "args": self.args,
+            "pid": os.getpid(),
+            "total_wall_s": round(time.perf_counter() - self._t0, 4),
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "stages": self.stages,
+        }
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=1, default=str))
+        return path
+
+
+# ---------- Active report ----------
+_active: Report | None = None
+
+def start(command: str, trace_memory: bool = False, args: dict | None = None) -> Report:
+    global _active
+    _active = Report(command, trace_memory, args)
+    return _active
+
+def stage(name: str, rows_in=None):
+    """Context manager timing *name* in the active report (no-op when none is active)."""
+    if _active is None:
+        return _NULL
+    return _active.stage(name, rows_in)
+
+def finish(path: Path) -> Path | None:
+    """Write the active report to *path* and deactivate it."""
+    global _active
+    report, _active = _active, None
+    if report is None:
+        return None
+    if report.trace_memory:
+        tracemalloc.stop()
+    return report.write(path)
+
+def report_path(out_dir: Path, prefix: str) -> Path:
+    return out_dir / f"{prefix}_{datetime.now():%Y-%m-%d_%H%M%S}.json"
+
+@contextmanager
+def profiled(path: Path | None):
+    """cProfile the block and dump stats to *path* (no-op when None)."""
+    if path is None:
+        yield
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        prof.dump_stats(path)
+        print(f"🧭 Profile written -> {path}")
@@ -0,0 +1,150 @@
+# scripts/live_aggregates.py
+"""
+Live summary aggregates
+-----------------------
+Dashboard counts (rows per sector, region, clearance type, case status
+and suitability decision) and time-to-clear (days from date case created
+to date clearance completed) kept in a small JSON file next to the live
+dataset, so a summary is one file read instead of a pass over live.
+
+• Every change to live goes through apply(): the touched rows are
+  tallied before and after the change and the difference is added to the
+  stored counts, so an update costs the size of the delta.
+• Time-to-clear is stored as a histogram of days, which can be added to
+  and subtracted from; mean and percentiles are read off the histogram.
+• rebuild() recomputes everything from the full live state, only when
+  asked (or when no store exists yet).
+
+    python -m scripts.live_aggregates show [--by sector]
+    python -m scripts.live_aggregates rebuild
+"""
+
+from datetime import datetime
+from pathlib import Path
+import argparse, json, os
+import numpy as np
+import pandas as pd
+from scripts import live_journal
+
+DIMENSIONS = ["sector", "region", "clearance type", "case status", "suitability decision"]
+CREATED    = "date case created"
+COMPLETED  = "date clearance completed"
+BLANK      = "(blank)"
+
+
+def store_path(live_path: Path) -> Path:
+    return live_path.with_name(live_path.stem + ".aggregates.json")
+
+def exists(live_path: Path) -> bool:
+    return store_path(live_path).exists()
+
+
+# ---------- Tallies ----------
+def _dates(s: pd.Series) -> pd.Series:
+    return pd.to_datetime(s.astype(object), errors="coerce", format="mixed")
+
+def tally(df: pd.DataFrame) -> dict:
+    """Row count, per-dimension value counts and the days-to-clear histogram of *df*."""
+    out = {"rows": len(df), "counts": {}, "days_to_clear": {}}
+    for c in DIMENSIONS:
+        if c in df.columns:
+            vals = df[c].astype(object).where(df[c].notna(), BLANK).astype(str)
+            out["counts"][c] = {k: int(n) for k, n in vals.value_counts().items()}
+    if CREATED in df.columns and COMPLETED in df.columns:
+        days = (_dates(df[COMPLETED]) - _dates(df[CREATED])).dt.days.dropna().astype(int)
+        out["days_to_clear"] = {str(k): int(n) for k, n in days.value_counts().items()}
+    return out
+
+def _add(into: dict, counts: dict, sign: int) -> None:
+    for k, n in counts.items():
+        into[k] = into.get(k, 0) + sign * n
+        if not into[k]:
+            del into[k]
+
+def combine(store: dict, delta: dict, sign: int = 1) -> dict:
+    """*store* plus (sign=1) or minus (sign=-1) the tally *delta*, in place."""
+    store["rows"] += sign * delta["rows"]
+    for c, counts in delta["counts"].items():
+        _add(store["counts"].setdefault(c, {}), counts, sign)
+    _add(store["days_to_clear"], delta["days_to_clear"], sign)
+    return store
+
+
+# ---------- Store ----------
+def _write(live_path: Path, store: dict) -> None:
+    store["updated"] = datetime.now().isoformat(timespec="seconds")
+    path = store_path(live_path)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(store, indent=1, sort_keys=True))
+    os.replace(tmp, path)
+
+def load(live_path: Path) -> dict | None:
+    try:
+        return json.loads(store_path(live_path).read_text())
+    except FileNotFoundError:
+        return None
+
+def rebuild(live_path: Path, live: pd.DataFrame) -> dict:
+    """Recompute the store of *live_path* from its full state *live*."""
+    store = tally(live)
+    _write(live_path, store)
+    return store
+
+def apply(live_path: Path, before: pd.DataFrame, ops: list[dict]) -> bool:
+    """Update the store for journal *ops* applied to the rows *before* (with row_id).
+
+    Returns False (and leaves it to the next rebuild) when there is no store yet.
+    """
+    store = load(live_path)
+    if store is None:
+        return False
+    after = live_journal.fold(before, ops)
+    combine(combine(store, tally(before), -1), tally(after))
+    _write(live_path, store)
+    return True
+
+
+# ---------- Queries ----------
+def counts(store: dict, by: str) -> pd.Series:
+    """Rows per value of dimension *by*, largest first."""
+    return pd.Series(store["counts"].get(by, {}), dtype=int, name="rows").sort_values(ascending=False)
+
+def time_to_clear(store: dict) -> dict:
+    """Count, mean, median and 90th percentile of days to clear."""
+    hist = store["days_to_clear"]
+    if not hist:
+        return {"cleared": 0, "mean": None, "median": None, "p90": None}
+    days = np.array(sorted(int(d) for d in hist))
+    n = np.array([hist[str(d)] for d in days])
+    cum = np.cumsum(n)
+    pct = lambda q: int(days[np.searchsorted(cum, q * cum[-1])])
+    return {"cleared": int(cum[-1]), "mean": round(float((days * n).sum() / cum[-1]), 1),
+            "median": pct(0.5), "p90": pct(0.9)}
+
+
+# ---------- CLI ----------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summary counts of the live dataset.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("show"); p.add_argument("--by", choices=DIMENSIONS)
+    sub.add_parser("rebuild")
+    args = parser.parse_args()
+
+    from scripts import run_weekly_pipeline as pipe   # live readers
+    src = pipe.live_source()
+    store = load(src)
+    if args.command == "rebuild" or store is None:
+        store = rebuild(src, pipe.load_live(src))
+        print(f"🧮 Aggregates rebuilt from {store['rows']} live rows -> {store_path(src).name}")
+        if args.command == "rebuild":
+            return
+
+    print(f"Live rows: {store['rows']}  (updated {store.get('updated')})")
+    for dim in [args.by] if args.by else DIMENSIONS:
+        print(f"\n{dim}:")
+        print(counts(store, dim).to_string())
+    if not args.by:
+        print("\ndays to clear:", ", ".join(f"{k} {v}" for k, v in time_to_clear(store).items()))
+
+if __name__ == "__main__":
+    main()
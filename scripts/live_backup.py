@@ -0,0 +1,279 @@
+# scripts/live_backup.py
+"""
+Deduplicating live backups
+--------------------------
+Snapshots of the live dataset (base CSV or SQLite store, plus its change
+journal) in data/live/backups/, stored as compressed content-addressed
+chunks so regions that did not change since an earlier snapshot are kept
+once:
+
+    backups/chunks/ab/<sha256>.gz           one chunk of file content
+    backups/snapshots/<time>_<reason>.json  files of one snapshot, as chunk lists
+
+• Text files are cut after lines whose checksum hits a mask (content
+  defined), so an edited or inserted row only changes the chunks around
+  it; the SQLite store is cut into fixed blocks, matching its in-place
+  page writes. A file whose size/mtime match the previous snapshot is
+  not read at all, so a backup costs roughly what changed.
+• Every snapshot is followed by pruning to the retention policy (keep
+  the N newest, the newest per day for D days and per week for W weeks;
+  backups/retention.json overrides the defaults) and removal of chunks no
+  snapshot references.
+• restore rebuilds a snapshot's files (the newest at or before --at);
+  verify re-hashes every chunk and file.
+
+    python -m scripts.live_backup list
+    python -m scripts.live_backup backup
+    python -m scripts.live_backup restore [--at "2025-07-19 12:00"] [--out DIR | --in-place]
+    python -m scripts.live_backup verify
+    python -m scripts.live_backup prune [--keep-last N] [--keep-daily N] [--keep-weekly N]
+"""
+
+from datetime import datetime
+from pathlib import Path
+import argparse, gzip, hashlib, json, os, zlib
+
+RETENTION  = {"last": 20, "daily": 14, "weekly": 8}
+GZIP_LEVEL = 6
+BLOCK      = 64 * 1024    # fixed chunk size of binary files (a multiple of SQLite pages)
+MIN_CHUNK  = 16 * 1024    # text chunks: cut after a line whose crc32 & CUT_MASK == 0 ...
+MAX_CHUNK  = 256 * 1024   # ... once past MIN_CHUNK, and always by MAX_CHUNK
+CUT_MASK   = 0xFF
+TIME_FMT   = "%Y%m%d_%H%M%S_%f"
+
+
+def store_dir(live_path: Path) -> Path:
+    return live_path.parent / "backups"
+
+def _chunk_path(store: Path, digest: str) -> Path:
+    return store / "chunks" / digest[:2] / f"{digest}.gz"
+
+def _snapshots_dir(store: Path) -> Path:
+    return store / "snapshots"
+
+
+# ---------- Chunking ----------
+def _text_chunks(fh):
+    buf, size = [], 0
+    for line in fh:
+        buf.append(line)
+        size += len(line)
+        if size >= MAX_CHUNK or (size >= MIN_CHUNK and not zlib.crc32(line) & CUT_MASK):
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+def _block_chunks(fh):
+    while block := fh.read(BLOCK):
+        yield block
+
+def _store_file(store: Path, path: Path) -> dict:
+    """Chunk *path* into *store* (writing only new chunks); returns its manifest entry."""
+    whole, chunks, new = hashlib.sha256(), [], 0
+    st = path.stat()
+    with open(path, "rb") as fh:
+        for data in (_block_chunks if path.suffix == ".sqlite" else _text_chunks)(fh):
+            whole.update(data)
+            digest = hashlib.sha256(data).hexdigest()
+            out = _chunk_path(store, digest)
+            if not out.exists():
+                out.parent.mkdir(parents=True, exist_ok=True)
+                tmp = out.with_suffix(".tmp")
+                tmp.write_bytes(gzip.compress(data, GZIP_LEVEL, mtime=0))
+                os.replace(tmp, out)
+                new += len(data)
+            chunks.append(digest)
+    return {"name": path.name, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "sha256": whole.hexdigest(), "chunks": chunks, "new_bytes": new}
+
+
+# ---------- Snapshots ----------
+def snapshots(store: Path) -> list[Path]:
+    """Snapshot manifests, oldest first."""
+    d = _snapshots_dir(store)
+    return sorted(d.glob("*.json")) if d.exists() else []
+
+def snapshot_time(manifest: Path) -> datetime:
+    return datetime.strptime(manifest.name[:22], TIME_FMT)
+
+def read_snapshot(manifest: Path) -> dict:
+    return json.loads(manifest.read_text())
+
+def backup(files, reason: str, store: Path | None = None, prune_after: bool = True) -> Path | None:
+    """Snapshot the existing *files* (live base first) into *store*; returns the manifest.
+
+    Files unchanged (size/mtime) since the previous snapshot reuse its entry.
+    """
+    files = [Path(f) for f in files if Path(f).exists()]
+    if not files:
+        return None
+    store = store or store_dir(files[0])
+    prev = snapshots(store)
+    prev = {f["name"]: f for f in read_snapshot(prev[-1])["files"]} if prev else {}
+
+    entries = []
+    for path in files:
+        st, old = path.stat(), prev.get(path.name)
+        if old and (old["size"], old["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            entries.append({**old, "new_bytes": 0})
+        else:
+            entries.append(_store_file(store, path))
+
+    now = datetime.now()
+    out = _snapshots_dir(store) / f"{now.strftime(TIME_FMT)}_{reason}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"time": now.isoformat(), "reason": reason, "files": entries}, indent=1))
+    os.replace(tmp, out)
+    if prune_after:
+        prune(store)
+    return out
+
+def find(store: Path, at: datetime | None = None) -> Path | None:
+    """The newest snapshot taken at or before *at* (default: the newest)."""
+    found = [m for m in snapshots(store) if at is None or snapshot_time(m) <= at]
+    return found[-1] if found else None
+
+def restore(manifest: Path, out_dir: Path) -> list[Path]:
+    """Write the files of snapshot *manifest* into *out_dir*; returns their paths."""
+    store = manifest.parent.parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for f in read_snapshot(manifest)["files"]:
+        out = out_dir / f["name"]
+        tmp = out.with_name(out.name + ".restore")
+        with open(tmp, "wb") as fh:
+            for digest in f["chunks"]:
+                fh.write(gzip.decompress(_chunk_path(store, digest).read_bytes()))
+        os.replace(tmp, out)
+        written.append(out)
+    return written
+
+
+# ---------- Retention ----------
+def policy(store: Path) -> dict:
+    """RETENTION, overridden by backups/retention.json if present."""
+    try:
+        return {**RETENTION, **json.loads((store / "retention.json").read_text())}
+    except FileNotFoundError:
+        return dict(RETENTION)
+
+def keep(manifests: list[Path], last: int, daily: int, weekly: int) -> set[Path]:
+    """Snapshots kept: the *last* newest, then the newest of each of the
+    *daily* most recent days and *weekly* most recent ISO weeks."""
+    newest = sorted(manifests, key=snapshot_time, reverse=True)
+    kept = set(newest[:max(last, 1)])
+    for period, n in ((lambda t: t.date(), daily), (lambda t: t.isocalendar()[:2], weekly)):
+        seen = []
+        for m in newest:
+            key = period(snapshot_time(m))
+            if key in seen:
+                continue
+            if len(seen) == n:
+                break
+            seen.append(key)
+            kept.add(m)
+    return kept
+
+def prune(store: Path, **override) -> tuple[int, int]:
+    """Drop snapshots outside the retention policy and unreferenced chunks;
+    returns (snapshots, chunks) removed."""
+    rule = {**policy(store), **{k: v for k, v in override.items() if v is not None}}
+    manifests = snapshots(store)
+    kept = keep(manifests, rule["last"], rule["daily"], rule["weekly"])
+    gone = [m for m in manifests if m not in kept]
+    for m in gone:
+        m.unlink()
+
+    used = {d for m in kept for f in read_snapshot(m)["files"] for d in f["chunks"]}
+    n_chunks = 0
+    for p in (store / "chunks").glob("*/*.gz") if gone else ():
+        if p.name[:-3] not in used:
+            p.unlink()
+            n_chunks += 1
+    return len(gone), n_chunks
+
+
+# ---------- Verification ----------
+def verify(store: Path) -> list[str]:
+    """Re-hash every chunk and every file of every snapshot; returns the problems found."""
+    problems, bad = [], set()
+    for m in snapshots(store):
+        for f in read_snapshot(m)["files"]:
+            whole, ok = hashlib.sha256(), True
+            for digest in f["chunks"]:
+                try:
+                    data = gzip.decompress(_chunk_path(store, digest).read_bytes())
+                except (OSError, EOFError, zlib.error):
+                    data = None
+                if data is None or hashlib.sha256(data).hexdigest() != digest:
+                    if digest not in bad:
+                        problems.append(f"{m.name}: chunk {digest[:12]} of {f['name']} missing or corrupt")
+                    bad.add(digest)
+                    ok = False
+                    continue
+                whole.update(data)
+            if ok and whole.hexdigest() != f["sha256"]:
+                problems.append(f"{m.name}: {f['name']} does not match its checksum")
+    return problems
+
+
+# ---------- CLI ----------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Deduplicating backups of the live dataset.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list"); sub.add_parser("backup"); sub.add_parser("verify")
+    p = sub.add_parser("restore")
+    p.add_argument("--at", type=datetime.fromisoformat, help="Restore the newest snapshot at or before this time")
+    where = p.add_mutually_exclusive_group()
+    where.add_argument("--out", type=Path, help="Directory to restore into (default: backups/restored_<time>/)")
+    where.add_argument("--in-place", action="store_true",
+                       help="Replace the live files (the current state is snapshotted first)")
+    p = sub.add_parser("prune")
+    for k in RETENTION:
+        p.add_argument(f"--keep-{k}", type=int, dest=k)
+    args = parser.parse_args()
+
+    from scripts import run_weekly_pipeline as pipe, live_journal, live_aggregates
+    src = pipe.live_source()
+    files = [src, live_journal.journal_path(src)]
+    store = store_dir(src)
+
+    if args.command == "backup":
+        m = backup(files, "manual", store)
+        print(f"💾 Snapshot {m.name}: {sum(f['new_bytes'] for f in read_snapshot(m)['files'])} new bytes")
+    elif args.command == "list":
+        for m in snapshots(store):
+            snap = read_snapshot(m)
+            print(f"{snapshot_time(m):%Y-%m-%d %H:%M:%S}  {snap['reason']:16} "
+                  + ", ".join(f"{f['name']} ({f['size']} B)" for f in snap["files"]))
+    elif args.command == "prune":
+        n, c = prune(store, **{k: getattr(args, k) for k in RETENTION})
+        print(f"🧹 Removed {n} snapshot(s) and {c} unreferenced chunk(s).")
+    elif args.command == "verify":
+        problems = verify(store)
+        for msg in problems:
+            print(f"❌ {msg}")
+        if problems:
+            raise SystemExit(1)
+        print(f"✅ {len(snapshots(store))} snapshot(s) verified.")
+    else:
+        m = find(store, args.at)
+        if m is None:
+            raise SystemExit("❌ No snapshot at or before that time.")
+        if args.in_place:
+            backup(files, "pre_restore", store)
+            names = {f["name"] for f in read_snapshot(m)["files"]}
+            for f in files:
+                if f.exists() and f.name not in names:
+                    f.unlink()   # e.g. a journal begun after the snapshot (kept in pre_restore)
+            out = restore(m, src.parent)
+            if live_aggregates.exists(src):
+                live_aggregates.rebuild(src, pipe.load_live(src))
+        else:
+            out = restore(m, args.out or store / f"restored_{snapshot_time(m):{TIME_FMT}}")
+        print(f"♻️  Restored {m.name} -> {', '.join(str(p) for p in out)}")
+
+if __name__ == "__main__":
+    main()
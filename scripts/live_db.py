@@ -0,0 +1,206 @@
+# scripts/live_db.py
+"""
+SQLite live store (optional backend)
+------------------------------------
+Once data/live/Stakeholder_Live.sqlite exists it is the live dataset:
+the pipeline and manual_approver read and write it instead of
+Stakeholder_Live_Clean.csv + journal.
+
+• Table `live`: one row per row_id (primary key), the schema columns as
+  text, indexed on the usual filter columns. Rows keep insertion order
+  (rowid), so reads match the folded CSV + journal.
+• Table `ops`: every applied op with the same stamp fields as the
+  journal (ts, source, batch, user, ...), i.e. the audit trail.
+• apply() runs a batch of journal-style ops (insert/update are upserts
+  of the given columns, remove deletes) in one transaction.
+• lookup()/existing_ids() fetch only the requested row_ids, so an
+  approval touches O(changes) rows.
+
+    python -m scripts.live_db import              # CSV + journal -> SQLite
+    python -m scripts.live_db export [--out FILE] # SQLite -> CSV for downstream use
+    python -m scripts.live_db get <row_id> ...
+    python -m scripts.live_db status
+"""
+
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+import argparse, getpass, json, sqlite3, uuid
+import numpy as np
+import pandas as pd
+from scripts import live_aggregates, live_journal, schema
+from scripts.utils import build_row_id
+
+ROOT    = Path(__file__).resolve().parent.parent
+DB_PATH = ROOT / "data" / "live" / "Stakeholder_Live.sqlite"
+
+INDEXED = ["case status", "region", "sector", "clearance status", "employee type"]
+
+
+def enabled(db: Path | None = None) -> bool:
+    return (db or DB_PATH).exists()
+
+def _q(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def _connect(db: Path) -> sqlite3.Connection:
+    # default rollback journal: every commit lands in the .sqlite file itself,
+    # so the stat-keyed stage cache and row index see each change
+    return sqlite3.connect(db)
+
+def columns(db: Path | None = None) -> list[str]:
+    """Data columns of the live table, in order (row_id excluded)."""
+    with closing(_connect(db or DB_PATH)) as conn:
+        return [r[1] for r in conn.execute("PRAGMA table_info(live)") if r[1] != "row_id"]
+
+
+# ---------- Create / import ----------
+def _create(conn, cols) -> None:
+    conn.execute(f"CREATE TABLE live (row_id TEXT PRIMARY KEY, "
+                 f"{', '.join(_q(c) + ' TEXT' for c in cols)})")
+    for c in INDEXED:
+        if c in cols:
+            conn.execute(f"CREATE INDEX {_q('ix_' + c.replace(' ', '_'))} ON live ({_q(c)})")
+    conn.execute("CREATE TABLE ops (ts TEXT, source TEXT, batch TEXT, user TEXT, op TEXT, "
+                 "row_id TEXT, [values] TEXT, meta TEXT)")
+    conn.execute("CREATE INDEX ix_ops_row_id ON ops (row_id)")
+
+def create(df: pd.DataFrame, db: Path | None = None) -> Path:
+    """Write *df* (text values, no row_id column needed) as a new live store."""
+    db = db or DB_PATH
+    if db.exists():
+        raise ValueError(f"❌ {db} already exists")
+    ids = build_row_id(df[["subject name", "primary position"]].copy())
+    cols = [c for c in schema.COLUMNS if c in df] + [c for c in df if c not in schema.COLUMNS]
+    rows = df[cols].astype(object).where(df[cols].notna(), None)
+    with closing(_connect(db)) as conn, conn:
+        _create(conn, cols)
+        conn.executemany(f"INSERT INTO live VALUES ({', '.join('?' * (len(cols) + 1))})",
+                         zip(ids, *(rows[c] for c in cols)))
+    return db
+
+def import_live(live_path: Path = live_journal.LIVE_PATH, db: Path | None = None) -> int:
+    """Build the store, and its summary aggregates, from the current CSV base + journal;
+    returns the row count."""
+    # fold on the raw text so values are stored exactly as live writes them
+    state = live_journal.fold(pd.read_csv(live_path, dtype=str), live_journal.read_journal(live_path))
+    state = state.dropna(how="all")
+    db = create(state, db)
+    live_aggregates.rebuild(db, state)
+    return len(state)
+
+
+# ---------- Reading ----------
+def read_all(db: Path | None = None) -> pd.DataFrame:
+    """Every live row, schema columns only (no row_id), like the CSV base."""
+    with closing(_connect(db or DB_PATH)) as conn:
+        df = pd.read_sql_query("SELECT * FROM live ORDER BY rowid", conn)
+    return df.drop(columns="row_id").fillna(np.nan)
+
+def iter_chunks(db: Path | None = None, chunksize: int = 50_000):
+    """read_all() in chunks of *chunksize* rows, in the same order."""
+    with closing(_connect(db or DB_PATH)) as conn:
+        for df in pd.read_sql_query("SELECT * FROM live ORDER BY rowid", conn, chunksize=chunksize):
+            yield df.drop(columns="row_id").fillna(np.nan)
+
+def lookup(row_ids, db: Path | None = None) -> pd.DataFrame:
+    """Live rows for *row_ids* (missing ids are skipped), with a row_id column."""
+    with closing(_connect(db or DB_PATH)) as conn:
+        return pd.read_sql_query(
+            "SELECT * FROM live WHERE row_id IN (SELECT value FROM json_each(?))", conn,
+            params=[json.dumps([str(r) for r in row_ids])])
+
+def existing_ids(row_ids, db: Path | None = None) -> set:
+    with closing(_connect(db or DB_PATH)) as conn:
+        return {r[0] for r in conn.execute(
+            "SELECT row_id FROM live WHERE row_id IN (SELECT value FROM json_each(?))",
+            [json.dumps([str(r) for r in row_ids])])}
+
+def export_csv(out: Path, db: Path | None = None) -> Path:
+    """Write the live table as a CSV in the Stakeholder_Live_Clean.csv layout."""
+    with closing(_connect(db or DB_PATH)) as conn:
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(live)") if r[1] != "row_id"]
+        query = f"SELECT {', '.join(_q(c) for c in cols)} FROM live ORDER BY rowid"
+        with open(out, "w", newline="") as fh:
+            header = True
+            for chunk in pd.read_sql_query(query, conn, chunksize=100_000):
+                chunk.to_csv(fh, header=header, index=False)
+                header = False
+            if header:
+                pd.DataFrame(columns=cols).to_csv(fh, index=False)
+    return out
+
+
+# ---------- Writing ----------
+def apply(ops, source: str, db: Path | None = None, **meta) -> int:
+    """Apply journal-style *ops* in order as one transaction; returns the number applied.
+
+    insert/update upsert the given columns (a new row_id becomes a row),
+    remove deletes the row; unknown columns are added to the table.
+    """
+    db = db or DB_PATH
+    ops = list(ops)
+    stamp = (datetime.now().isoformat(), source, uuid.uuid4().hex[:12], getpass.getuser())
+    with closing(_connect(db)) as conn, conn:
+        known = {r[1] for r in conn.execute("PRAGMA table_info(live)")}
+        for op in ops:
+            for c in op.get("values", {}):
+                if c not in known:
+                    conn.execute(f"ALTER TABLE live ADD COLUMN {_q(c)} TEXT")
+                    known.add(c)
+
+        # consecutive ops with the same shape run as one executemany, keeping op order
+        i = 0
+        while i < len(ops):
+            kind, cols = ops[i]["op"], tuple(ops[i].get("values", {}))
+            j = i
+            while j < len(ops) and ops[j]["op"] == kind and tuple(ops[j].get("values", {})) == cols:
+                j += 1
+            batch = ops[i:j]
+            if kind == "remove":
+                conn.executemany("DELETE FROM live WHERE row_id = ?", [(o["row_id"],) for o in batch])
+            elif cols:
+                names = ", ".join(_q(c) for c in cols)
+                sets = ", ".join(f"{_q(c)} = excluded.{_q(c)}" for c in cols)
+                conn.executemany(
+                    f"INSERT INTO live (row_id, {names}) VALUES ({', '.join('?' * (len(cols) + 1))}) "
+                    f"ON CONFLICT(row_id) DO UPDATE SET {sets}",
+                    [(o["row_id"], *(live_journal.jsonable(v) for v in o["values"].values()))
+                     for o in batch])
+            i = j
+
+        conn.executemany(
+            "INSERT INTO ops VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(*stamp, o["op"], o["row_id"],
+              json.dumps({k: live_journal.jsonable(v) for k, v in o.get("values", {}).items()}),
+              json.dumps(meta, default=str)) for o in ops])
+    return len(ops)
+
+
+# ---------- CLI ----------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the SQLite live store.")
+    parser.add_argument("command", choices=["import", "export", "get", "status"])
+    parser.add_argument("row_ids", nargs="*", help="row_ids for `get`")
+    parser.add_argument("--out", type=Path, default=live_journal.LIVE_PATH,
+                        help="CSV written by `export` (default: Stakeholder_Live_Clean.csv)")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        n = import_live(live_journal.LIVE_PATH)
+        print(f"🗄️  Imported {n} live rows into {DB_PATH.name}; it is now the live store.")
+        return
+    if not enabled():
+        print(f"❌ No live store at {DB_PATH}; run `python -m scripts.live_db import` first."); return
+    if args.command == "export":
+        print(f"✅ Live store exported -> {export_csv(args.out)}")
+    elif args.command == "get":
+        print(lookup(args.row_ids).to_string(index=False))
+    else:
+        with closing(_connect(DB_PATH)) as conn:
+            rows = conn.execute("SELECT COUNT(*) FROM live").fetchone()[0]
+            ops = conn.execute("SELECT COUNT(*) FROM ops").fetchone()[0]
+        print(f"🗄️  {rows} live rows, {ops} applied ops in {DB_PATH.name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# scripts/live_journal.py
+"""
+Journaled live store
+--------------------
+Stakeholder_Live_Clean.csv is the base snapshot; approved changes are
+appended to Stakeholder_Live_Clean.journal.jsonl as small delta records
+keyed by row_id:
+
+    {"ts": ..., "op": "update", "row_id": ..., "values": {col: val}, "source": ..., "batch": ..., "user": ...}
+    {"ts": ..., "op": "insert", "row_id": ..., "values": {...}, ...}
+    {"ts": ..., "op": "remove", "row_id": ..., ...}
+
+Readers get base + journal through read_live(); read_rows() gets only
+the rows of some row_ids, seeking to them in the base through a byte
+offset sidecar (Stakeholder_Live_Clean.offsets.pkl, rebuilt whenever the
+base is rewritten) and folding only their records. compact() folds the
+journal into a new base and moves the folded records to
+data/live/journal_archive/, which together with the active journal is
+the audit trail of every change to live.
+
+    python -m scripts.live_journal status
+    python -m scripts.live_journal compact
+"""
+
+from datetime import datetime
+from pathlib import Path
+import argparse, csv, getpass, io, json, os, pickle, tempfile, uuid
+import numpy as np
+import pandas as pd
+from scripts.utils import build_row_id
+from scripts import live_backup
+
+ROOT      = Path(__file__).resolve().parent.parent
+LIVE_PATH = ROOT / "data" / "live" / "Stakeholder_Live_Clean.csv"
+
+# Fold the journal into the base once it reaches this fraction of the base size.
+COMPACT_RATIO = 0.25
+
+
+def journal_path(live_path: Path) -> Path:
+    return live_path.with_name(live_path.stem + ".journal.jsonl")
+
+def archive_dir(live_path: Path) -> Path:
+    return live_path.parent / "journal_archive"
+
+def offsets_path(live_path: Path) -> Path:
+    return live_path.with_name(live_path.stem + ".offsets.pkl")
+
+
+# ---------- Writing ----------
+def jsonable(v):
+    """A value as the journal stores it: None when missing, days as YYYY-MM-DD, else text."""
+    if v is None or (not isinstance(v, (list, dict)) and pd.isna(v)):
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.strftime("%Y-%m-%d") if v == v.normalize() else str(v)
+    return v if isinstance(v, str) else str(v)
+
+def update_op(row_id, values: dict) -> dict:
+    return {"op": "update", "row_id": row_id, "values": values}
+
+def insert_op(row_id, values: dict) -> dict:
+    return {"op": "insert", "row_id": row_id, "values": values}
+
+def remove_op(row_id) -> dict:
+    return {"op": "remove", "row_id": row_id}
+
+def append(live_path: Path, ops, source: str, **meta) -> int:
+    """Append *ops* to the journal as one batch; returns the number written."""
+    stamp = {"ts": datetime.now().isoformat(), "source": source,
+             "batch": uuid.uuid4().hex[:12], "user": getpass.getuser(), **meta}
+    n = 0
+    with open(journal_path(live_path), "a") as fh:
+        for op in ops:
+            rec = {**stamp, **op}
+            if "values" in rec:
+                rec["values"] = {k: jsonable(v) for k, v in rec["values"].items()}
+            fh.write(json.dumps(rec) + "\n")
+            n += 1
+        fh.flush()
+        os.fsync(fh.fileno())
+    return n
+
+
+# ---------- Reading ----------
+def read_journal(live_path: Path) -> list[dict]:
+    path = journal_path(live_path)
+    if not path.exists():
+        return []
+    with open(path) as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+def _coerce(values: pd.Series, dtype):
+    """Journal values are strings; bring them to the base column's dtype."""
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return pd.to_datetime(values, errors="coerce", format="mixed")
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        return pd.to_numeric(values, errors="coerce")
+    return values.astype(object)
+
+def fold(base: pd.DataFrame, records: list[dict]) -> pd.DataFrame:
+    """Apply journal *records* to *base* (last write per row_id/column wins).
+
+    Folding is idempotent, so replaying records already contained in the
+    base (e.g. after an interrupted compaction) leaves the state unchanged.
+    """
+    if not records:
+        return base
+    ids = base["row_id"] if "row_id" in base.columns else build_row_id(base.copy())
+    ids = ids.to_numpy(dtype=object)
+
+    last_remove = {r["row_id"]: i for i, r in enumerate(records) if r["op"] == "remove"}
+    cells = pd.DataFrame(
+        [(r["row_id"], c, v)
+         for i, r in enumerate(records) if r["op"] != "remove" and i > last_remove.get(r["row_id"], -1)
+         for c, v in r.get("values", {}).items()],
+        columns=["row_id", "col", "val"],
+    )
+    # new rows come in the order they were first written after their last remove
+    touched = pd.unique(cells["row_id"])
+    cells = cells.drop_duplicates(["row_id", "col"], keep="last")
+
+    keep = ~pd.Series(ids).isin(list(last_remove)).to_numpy()
+    out = base[keep].copy()
+    pos = pd.Index(ids[keep])
+
+    new_ids = [rid for rid in touched if rid not in pos]
+    new_rows = pd.DataFrame(index=range(len(new_ids)), columns=out.columns)
+    if "row_id" in out.columns:
+        new_rows["row_id"] = new_ids
+    new_pos = pd.Index(new_ids)
+
+    for col, grp in cells.groupby("col", sort=False):
+        if col not in out.columns:
+            out[col] = pd.Series(dtype=object)
+            new_rows[col] = None
+        vals = _coerce(grp["val"].reset_index(drop=True), out[col].dtype)
+        at = pos.get_indexer(grp["row_id"])
+        hit = at >= 0
+        if hit.any():
+            out.iloc[at[hit], out.columns.get_loc(col)] = vals[hit].to_numpy()
+        if (~hit).any():
+            new_rows.loc[new_pos.get_indexer(grp["row_id"][~hit]), col] = vals[~hit].to_numpy()
+
+    if len(new_rows):
+        new_rows.index = range(len(out), len(out) + len(new_rows))
+        out = pd.concat([out, new_rows.astype(out.dtypes.to_dict(), errors="ignore")])
+    return out
+
+def read_live(live_path: Path = LIVE_PATH, reader=pd.read_csv, **read_kw) -> pd.DataFrame:
+    """Current live state: base snapshot read by *reader* with *read_kw*, plus the journal."""
+    return fold(reader(live_path, **read_kw), read_journal(live_path))
+
+def _base_state(live_path: Path) -> tuple:
+    st = live_path.stat()
+    return st.st_size, st.st_mtime_ns
+
+def _build_offsets(live_path: Path, reader, **read_kw) -> dict:
+    """Byte span of every base record, with the row_id *reader* gives it."""
+    ends, pos = [], 0
+    with open(live_path, "rb") as fh:
+        lines = iter(fh)
+        def text():
+            nonlocal pos
+            for line in lines:
+                pos += len(line)
+                yield line.decode("utf-8-sig" if pos == len(line) else "utf-8")
+        ends = [pos for row in csv.reader(text()) if row]   # read_csv skips blank lines too
+    ids = np.concatenate([
+        (c["row_id"] if "row_id" in c.columns else build_row_id(c.copy())).to_numpy(dtype=object)
+        for c in reader(live_path, chunksize=50_000, **read_kw)] or [np.array([], dtype=object)])
+    # records before the data rows are the header (and any metadata rows above it)
+    head = len(ends) - len(ids)
+    return {"state": _base_state(live_path), "row_id": ids,
+            "start": np.array(ends[head - 1:-1] if ids.size else [], dtype=np.int64),
+            "end": np.array(ends[head:], dtype=np.int64), "header": ends[head - 1] if head else 0}
+
+def base_offsets(live_path: Path, reader=pd.read_csv, **read_kw) -> dict:
+    """The offset sidecar of *live_path*'s base, rebuilt (one pass) if the base changed."""
+    path = offsets_path(live_path)
+    if path.exists():
+        with open(path, "rb") as fh:
+            offsets = pickle.load(fh)
+        if offsets["state"] == _base_state(live_path):
+            return offsets
+    offsets = _build_offsets(live_path, reader, **read_kw)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as fh:
+        pickle.dump(offsets, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+    return offsets
+
+def read_rows(live_path: Path, row_ids, reader=pd.read_csv, **read_kw) -> pd.DataFrame:
+    """read_live() restricted to *row_ids*, without reading the rest of the base.
+
+    The base rows are read at their offsets and only their journal records
+    are folded, so the cost follows the number of rows asked for (plus one
+    pass over the journal).
+    """
+    wanted = set(row_ids)
+    offsets = base_offsets(live_path, reader, **read_kw)
+    at = np.sort(pd.Index(offsets["row_id"]).get_indexer(list(wanted)))
+    at = at[at >= 0]
+    buf = io.BytesIO()
+    with open(live_path, "rb") as fh:
+        buf.write(fh.read(offsets["header"]))
+        for i in at:
+            fh.seek(offsets["start"][i])
+            buf.write(fh.read(offsets["end"][i] - offsets["start"][i]).rstrip(b"\r\n") + b"\n")
+    # the reader takes a path (it sniffs the header), so hand it the rows as a small file
+    with tempfile.TemporaryDirectory() as tmp:
+        part = Path(tmp) / live_path.name
+        part.write_bytes(buf.getvalue())
+        base = reader(part, **read_kw)
+    ids = base["row_id"] if "row_id" in base.columns else build_row_id(base.copy())
+    if not np.array_equal(ids.to_numpy(dtype=object), offsets["row_id"][at]):
+        # records the offsets cannot place (e.g. rows read_csv skips); read it all
+        live = read_live(live_path, reader, **read_kw)
+        ids = live["row_id"] if "row_id" in live.columns else build_row_id(live.copy())
+        return live[ids.isin(wanted).to_numpy()]
+    return fold(base, [r for r in read_journal(live_path) if r["row_id"] in wanted])
+
+def iter_live(live_path: Path = LIVE_PATH, chunksize: int = 50_000, reader=pd.read_csv,
+              **read_kw):
+    """read_live() in chunks: each base chunk folded with the records of its rows.
+
+    Inserts of rows not in the base come last, as one extra chunk.
+    """
+    records = read_journal(live_path)
+    by_id = {}
+    for i, r in enumerate(records):
+        by_id.setdefault(r["row_id"], []).append(i)
+    template = None
+    for chunk in reader(live_path, chunksize=chunksize, **read_kw):
+        template = chunk.iloc[:0]
+        ids = chunk["row_id"] if "row_id" in chunk.columns else build_row_id(chunk.copy())
+        mine = sorted(i for rid in pd.unique(ids.to_numpy(dtype=object)) for i in by_id.pop(rid, ()))
+        yield fold(chunk, [records[i] for i in mine])
+    rest = sorted(i for idx in by_id.values() for i in idx)
+    if rest and template is not None:
+        yield fold(template, [records[i] for i in rest])
+
+
+# ---------- Compaction ----------
+def pending(live_path: Path) -> int:
+    return len(read_journal(live_path))
+
+def needs_compaction(live_path: Path) -> bool:
+    jp = journal_path(live_path)
+    return jp.exists() and live_path.exists() and (
+        jp.stat().st_size > COMPACT_RATIO * max(live_path.stat().st_size, 1)
+    )
+
+def compact(live_path: Path = LIVE_PATH) -> Path | None:
+    """Fold the journal into a new base snapshot; returns the backup (see scripts/live_backup.py)
+    of the old base and journal."""
+    records = read_journal(live_path)
+    if not records:
+        return None
+    # fold on the raw text so untouched cells are written back unchanged
+    state = fold(pd.read_csv(live_path, dtype=str), records)
+
+    bkup = live_backup.backup([live_path, journal_path(live_path)], "compact")
+
+    tmp = live_path.with_suffix(".tmp")
+    state.to_csv(tmp, index=False)
+    os.replace(tmp, live_path)
+
+    archive = archive_dir(live_path); archive.mkdir(exist_ok=True)
+    os.replace(journal_path(live_path),
+               archive / f"{live_path.stem}.journal.{datetime.now():%Y%m%d_%H%M%S_%f}.jsonl")
+    print(f"🗜️  Compacted {len(records)} journal records into {live_path.name}. Backup: {bkup}")
+    return bkup
+
+def maybe_compact(live_path: Path) -> Path | None:
+    return compact(live_path) if needs_compaction(live_path) else None
+
+
+# ---------- CLI ----------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or compact the live change journal.")
+    parser.add_argument("command", choices=["status", "compact"])
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        if compact(LIVE_PATH) is None:
+            print("ℹ️  Journal is empty; nothing to compact.")
+    else:
+        print(f"📒 {pending(LIVE_PATH)} journal records pending in {journal_path(LIVE_PATH).name}")
+
+if __name__ == "__main__":
+    main()
@@ -1,165 +1,309 @@
 # Enhanced CLI version of manual_approver.py with improvements 1-8
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-import shutil
-from scripts.utils import normalize_text, normalize_dates, proper_case_status, build_row_id
-import argparse
+from scripts.utils import build_row_id
+from scripts.run_weekly_pipeline import apply_live_ops, live_rows, live_source
+from scripts.approval_rules import load_rules, evaluate
+from scripts import live_journal, live_db, instrument, schema, diff_store, change_index, stage_cache, cli_args
+import getpass, json, os
 
-DATE_FIELDS = [
-    "date case created",
-    "date suitability decision",
-    "date clearance completed"
-]
+DATE_FIELDS = schema.DATE_COLS
 
 
 # ---------- Paths ----------
 ROOT      = Path(__file__).resolve().parent.parent
 DIFF_WIDE = ROOT / "data" / "diffs" / "wide"
-LIVE_PATH = ROOT / "data" / "live" / "Stakeholder_Live_Clean.csv"
-BACK_DIR  = LIVE_PATH.parent / "backups"
 APPROVED_DIR = ROOT / "data" / "diffs" / "approved"
-LOG_PATH = ROOT / "logs" / "manual_updates.log"
-
-for p in (BACK_DIR, APPROVED_DIR, LOG_PATH.parent):
-    p.mkdir(parents=True, exist_ok=True)
+REPORT_DIR   = ROOT / "data" / "diffs" / "reports"
+SESSION_DIR  = ROOT / "data" / "diffs" / "reviews"
 
 # ---------- CLI args ----------
-parser = argparse.ArgumentParser()
-parser.add_argument("--dry-run", action="store_true", help="Run full process without saving any files")
-args = parser.parse_args()
+parser = cli_args.approver_parser()
 
 # ---------- Prompt helper ----------
-def prompt(row) -> str:
+def prompt(row, group: int = 1) -> str:
     print("\n" + "-"*50)
     print(f"Row-ID : {row['row_id']}")
     print(f"Type   : {row['change_type']}")
+    if pd.notna(row.get("matched_row_id")):
+        print(f"Match  : was {row['matched_row_id']} (confidence {row['match_confidence']:.2f})")
     print(f"Fields : {row['changed_fields']}")
     for fld in row['changed_fields'].split(", "):
         print(f"{fld:14}: {row.get(f'{fld}_old')}  →  {row.get(f'{fld}_new')}")
-    return (input("(y)es / (n)o / (s)kip rest / (o)verride  [y]: ").strip().lower() or "y")
+    if group > 1:
+        print(f"Group  : {group} undecided {row['change_type']} rows change exactly these fields")
+    return (input("(y)es / (n)o / (s)kip rest / (o)verride / (a)pprove or (r)eject whole group  [y]: ")
+            .strip().lower() or "y")
+
+# ---------- Review sessions ----------
+class ReviewSession:
+    """Checkpointed decisions for one diff set + filter, appended to a JSONL file.
+
+    Each decision (or group decision) is written and fsynced as it is
+    made, keyed by the row's position in the diff under review; an
+    interrupted or skipped review resumes at the first undecided row.
+    Positions already applied to live are recorded too, so a resumed
+    session applies only new approvals. A session whose diff content
+    changed is set aside and a new one started.
+    """
+
+    def __init__(self, path: Path | None, digest: str | None):
+        self.path, self.decisions, self.applied = path, {}, set()
+        lines = []
+        if path is not None and path.exists():
+            lines = [json.loads(l) for l in path.read_text().splitlines() if l.strip()]
+            if not lines or lines[0].get("diff_digest") != digest:
+                stale = path.with_name(f"{path.stem}_stale_{datetime.now():%Y%m%d_%H%M%S}.jsonl")
+                path.rename(stale)
+                print(f"ℹ️  The diff changed since the last review; old session kept as {stale.name}.")
+                lines = []
+        for rec in lines[1:]:
+            if "applied" in rec:
+                self.applied.update(rec["applied"])
+            else:
+                for pos in rec["rows"]:
+                    self.decisions[pos] = rec
+        if path is not None and not lines:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._write({"diff_digest": digest, "created": datetime.now().isoformat()})
+
+    def _write(self, rec: dict) -> None:
+        if self.path is None:   # dry run: nothing persists
+            return
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(rec, default=str) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def decide(self, rows, decision: str, overrides: dict | None = None) -> None:
+        rec = {"rows": [int(r) for r in rows], "decision": decision,
+               "user": getpass.getuser(), "ts": datetime.now().isoformat()}
+        if overrides:
+            rec["overrides"] = overrides
+        self._write(rec)
+        for pos in rec["rows"]:
+            self.decisions[pos] = rec
+
+    def mark_applied(self, rows) -> None:
+        rows = [int(r) for r in rows]
+        self._write({"applied": rows, "ts": datetime.now().isoformat()})
+        self.applied.update(rows)
+
+def session_path(diff_set: Path, tag: str, change_types) -> Path:
+    key = "_".join([diff_set.name.removesuffix(".csv"), tag, *sorted(change_types or [])])
+    return SESSION_DIR / f"Review_{key}.jsonl"
+
+def approved_path(now: datetime | None = None) -> Path:
+    """A new approvals file per apply, so a resumed review never overwrites an earlier batch."""
+    return APPROVED_DIR / f"Approved_Changes_{now or datetime.now():%Y-%m-%d_%H%M%S_%f}.csv"
+
+def session_rows(diff: pd.DataFrame, session: ReviewSession, answer: str) -> pd.DataFrame:
+    """Rows of *diff* decided *answer* in *session* and not yet applied, overrides filled in."""
+    pos = [p for p in diff.index if p not in session.applied
+           and session.decisions.get(p, {}).get("decision") == answer]
+    rows = diff.loc[pos].copy()
+    for p in pos:
+        for field, value in session.decisions[p].get("overrides", {}).items():
+            rows.at[p, f"{field}_new"] = value
+    return rows
+
+# ---------- Journal ops ----------
+def _live_value(col, v):
+    """Diff values carry normalized text; store dates the way live writes them."""
+    if col in DATE_FIELDS and pd.notna(v):
+        ts = pd.to_datetime(v, errors="coerce")
+        return v if pd.isna(ts) else ts.date()
+    return v
+
+def _live_values(col, s: pd.Series) -> np.ndarray:
+    """_live_value() for a whole column, parsing each distinct date once."""
+    values = s.to_numpy(dtype=object)
+    if col not in DATE_FIELDS:
+        return values
+    codes, uniques = pd.factorize(s)
+    # format="mixed" parses each value on its own, like the scalar to_datetime above
+    ts = pd.to_datetime(pd.Series(uniques, dtype=object), errors="coerce", format="mixed")
+    days = np.where(ts.notna(), ts.dt.date.to_numpy(dtype=object), np.asarray(uniques, dtype=object))
+    return np.where(codes >= 0, np.append(days, None)[codes], values)
+
+def journal_ops(upd: pd.DataFrame, live_ids, compare_cols) -> list[dict]:
+    """Delta records for the approved rows (indexed by row_id).
+
+    A row linked to an older row_id (matched_row_id, a corrected name)
+    replaces that record: the old id is removed and the new one inserted.
+    Values are converted column-wise; only the op records are built per row.
+    """
+    ids = upd.index.to_numpy(dtype=object)
+    n = len(upd)
+    ctype = upd["change_type"].to_numpy(dtype=object) if "change_type" in upd else np.full(n, None)
+    renamed = upd["matched_row_id"].to_numpy(dtype=object) if "matched_row_id" in upd else np.full(n, None)
+    fields = upd["changed_fields"].fillna("").astype(str).to_numpy(dtype=object) \
+        if "changed_fields" in upd else np.full(n, "")
+    new = {c: _live_values(c, upd[f"{c}_new"]) for c in upd.columns.str.removesuffix("_new")
+           if f"{c}_new" in upd}
+    insert_cols = [c for c in compare_cols if c in new]
+    known = pd.Index(ids).isin(list(live_ids))
+    renamed_live = pd.Index(renamed).isin(list(live_ids)) & pd.notna(renamed) & (renamed != ids)
+
+    ops = []
+    for i, rid in enumerate(ids):
+        if renamed_live[i]:
+            ops.append(live_journal.remove_op(renamed[i]))
+        if ctype[i] == "removed_record":
+            if known[i]:
+                ops.append(live_journal.remove_op(rid))
+        elif ctype[i] == "new_record" or not known[i]:
+            ops.append(live_journal.insert_op(rid, {c: new[c][i] for c in insert_cols}))
+        else:
+            ops.append(live_journal.update_op(
+                rid, {f: new[f][i] for f in fields[i].split(", ") if f in new}))
+    return ops
 
 # ---------- Main ----------
-def main():
-    diff_files = sorted(DIFF_WIDE.glob("Changes_*.csv"))
-    if not diff_files:
+def main(argv: list[str] | None = None):
+    args = parser.parse_args(argv)
+    if args.report:
+        instrument.start("manual_approver", trace_memory=args.trace_memory, args=vars(args))
+    try:
+        with instrument.profiled(args.profile):
+            approve(args)
+    finally:
+        path = instrument.finish(instrument.report_path(REPORT_DIR, "ApproverReport"))
+        if path:
+            print(f"📊 Run report → {path}")
+
+def approve(args):
+    diff_set = diff_store.latest(DIFF_WIDE, "Changes_")
+    if diff_set is None:
         print("❌ No diff file found."); return
-    diff = pd.read_csv(diff_files[-1]).dropna(how="all")
-    live = pd.read_csv(LIVE_PATH).dropna(how="all")
-
-    if "row_id" not in live.columns:
-        live["row_id"] = build_row_id(live)
-
-    approved = []
-    counts = {"approved": 0, "manual": 0, "skipped": 0}
-
-    for _, row in diff.iterrows():
-        ans = prompt(row)
-        if ans == "s":
-            counts["skipped"] += 1
-            break
-        elif ans == "y":
-            approved.append(row)
-            counts["approved"] += 1
-        elif ans == "o":
-            print("Manual override. Leave blank to keep proposed value.")
-            new_row = row.copy()
-            for field in row["changed_fields"].split(", "):
-                old_val = row.get(f"{field}_old", "")
-                proposed_val = row.get(f"{field}_new", "")
-                new_val = input(f"  {field} [{proposed_val}]: ").strip()
-                if new_val:
-                    new_row[f"{field}_new"] = new_val
-            approved.append(new_row)
-            counts["manual"] += 1
-
-    if not approved:
-        print("⚠️  No rows approved."); return
-
-    upd = pd.DataFrame(approved)
+    with instrument.stage("read_diff") as st:
+        # only the partitions under review are read
+        tag = None if args.tag == "all" else args.tag
+        diff = diff_store.read(diff_set, tag, args.change_type).dropna(how="all")
+        st.rows_out = len(diff)
+    if diff.empty:
+        print(f"ℹ️  No {args.tag} changes to review in {diff_set.name}."); return
+    counts = {"approved": 0, "manual": 0, "rejected": 0, "skipped": 0}
+
+    path = None if args.dry_run else session_path(diff_set, args.tag, args.change_type)
+    if args.restart and path is not None:
+        path.unlink(missing_ok=True)
+    session = ReviewSession(path, stage_cache.file_digest(diff_set))
+    if session.decisions:
+        print(f"↩️  Resuming review session: {len(session.decisions)} of {len(diff)} row(s) already decided.")
+
+    # ----- rule-driven batch decisions -----
+    auto, queue = [], diff
+    if args.rules:
+        with instrument.stage("rules", rows_in=len(diff)) as st:
+            decision, rule_name = evaluate(diff, load_rules(args.rules))
+            hit = (decision == "approve") & ~diff.index.isin(list(session.applied))
+            auto = [diff[hit].assign(rule=rule_name[hit])]
+            queue = diff[decision == "queue"]
+            st.rows_out = len(queue)
+        counts["auto_approved"] = int(hit.sum())
+        counts["auto_rejected"] = int((decision == "reject").sum())
+        print(f"📏 Rules: {counts['auto_approved']} approved, {counts['auto_rejected']} rejected, "
+              f"{len(queue)} queued for review.")
+
+    queue = queue[~queue.index.isin(list(session.decisions))]
+    pattern = queue["change_type"].astype(str) + "|" + queue["changed_fields"].fillna("").astype(str)
+    with instrument.stage("review", rows_in=len(queue)):
+        try:
+            for pos, row in queue.iterrows():
+                if pos in session.decisions:   # decided with its group
+                    continue
+                same = queue.index[(pattern == pattern[pos]).to_numpy()
+                                   & ~queue.index.isin(list(session.decisions))]
+                ans = prompt(row, len(same))
+                if ans == "s":
+                    counts["skipped"] += 1
+                    break
+                elif ans in ("y", "n"):
+                    session.decide([pos], ans)
+                elif ans in ("a", "r"):
+                    session.decide(same, "y" if ans == "a" else "n")
+                    print(f"{'✅ Approved' if ans == 'a' else '❌ Rejected'} {len(same)} row(s) "
+                          f"changing {row['changed_fields']}.")
+                elif ans == "o":
+                    print("Manual override. Leave blank to keep proposed value.")
+                    overrides = {}
+                    for field in row["changed_fields"].split(", "):
+                        proposed_val = row.get(f"{field}_new", "")
+                        new_val = input(f"  {field} [{proposed_val}]: ").strip()
+                        if new_val:
+                            overrides[field] = new_val
+                    session.decide([pos], "o", overrides)
+        except (KeyboardInterrupt, EOFError):
+            print(f"\n⏸️  Review interrupted; {len(session.decisions)} decision(s) saved. "
+                  "Run again to resume.")
+            return
+
+    # ----- everything decided so far and not yet applied, in one frame -----
+    yes, manual = session_rows(diff, session, "y"), session_rows(diff, session, "o")
+    counts["approved"], counts["manual"] = len(yes), len(manual)
+    counts["rejected"] = sum(1 for r in session.decisions.values() if r["decision"] == "n")
+    auto += [yes, manual]
+    if not any(len(a) for a in auto):
+        done = " (review complete; --restart to review again)" if session.applied else ""
+        print(f"⚠️  No rows approved{done}."); return
+
+    upd = pd.concat([a for a in auto if len(a)])
+    applied_pos = upd.index
+    upd = upd.reset_index(drop=True)
     if "row_id" not in upd.columns:
         upd["row_id"] = build_row_id(upd)
 
-    live.set_index("row_id", inplace=True)
     upd.set_index("row_id", inplace=True)
 
-    compare_cols = [
-    "date case created",
-    "case status",
-    "subject name",
-    "employee type",
-    "primary position",
-    "sector",
-    "region",
-    "nominee personal email address",
-    "requestor name",
-    "cisa nominator / sponsor email address",
-    "clearance type",
-    "clearance status",
-    "date suitability decision",
-    "suitability decision",
-    "date clearance completed"
-]
-
-
-    required_cols = [
-    "date case created",
-    "case status",
-    "subject name",
-    "employee type",
-    "primary position",
-    "sector",
-    "region",
-    "nominee personal email address",
-    "requestor name",
-    "cisa nominator / sponsor email address",
-    "clearance type",
-    "clearance status",
-    "date suitability decision",
-    "suitability decision",
-    "date clearance completed"
-]
-
-
-    live = normalize_dates(live, DATE_FIELDS)
-    upd = normalize_dates(upd, DATE_FIELDS)
-
-
-    if missing := set(required_cols) - set(live.columns):
-        raise ValueError(f"❌ Live data is missing columns: {missing}")
-
-    common_idx = upd.index.intersection(live.index)
-    for col in compare_cols:
-        if f"{col}_new" in upd.columns:
-            live.loc[common_idx, col] = upd.loc[common_idx, f"{col}_new"]
+    with instrument.stage("read_live") as st:
+        # point lookups: only the ids this approval touches
+        source = live_source()
+        touched = set(upd.index)
+        if "matched_row_id" in upd.columns:
+            touched |= set(upd["matched_row_id"].dropna())
+        if source.suffix != ".sqlite":
+            live = live_rows(touched, source)
+            live_cols = [c for c in live.columns if c != "row_id"]
+            live_ids = set(live["row_id"])
+            st.rows_out = len(live)
+        else:
+            live_cols = live_db.columns(source)
+            live_ids = live_db.existing_ids(touched, source)
+            st.rows_out = len(live_ids)
 
-    if "change_type" in upd.columns and "new_record" in upd["change_type"].values:
-        new_rows = upd[upd["change_type"] == "new_record"]
-        cols_map = {f"{c}_new": c for c in compare_cols}
-        new_df = new_rows.rename(columns=cols_map)[list(cols_map.values())]
-        live = pd.concat([live, new_df.set_index(new_rows.index)])
+    if missing := set(schema.COLUMNS) - set(live_cols):
+        raise ValueError(f"❌ Live data is missing columns: {missing}")
 
-    live = proper_case_status(live)
+    with instrument.stage("journal_ops", rows_in=len(upd)) as st:
+        ops = journal_ops(upd, live_ids, schema.COLUMNS)
+        st.rows_out = len(ops)
 
     if args.dry_run:
-        print("ℹ️  Dry run complete. No files written.")
+        print(f"ℹ️  Dry run complete. No files written ({len(ops)} change(s) would be journaled).")
     else:
-        approved_path = APPROVED_DIR / f"Approved_Changes_{datetime.now().date()}.csv"
-        upd.reset_index().to_csv(approved_path, index=False)
-        with open(LOG_PATH, "a") as log:
-            for rid in upd.index:
-                log.write(f"[{datetime.now()}] Row updated: {rid}\n")
-
-        bkup = BACK_DIR / f"Stakeholder_Live_Clean_backup_manual_{datetime.now():%Y%m%d_%H%M%S}.csv"
-        shutil.copy(LIVE_PATH, bkup)
-        live.reset_index().to_csv(LIVE_PATH, index=False)
-        print(f"✅ Live updated with approvals. Backup: {bkup}")
-        print(f"📄 Approved entries saved to: {approved_path}")
+        APPROVED_DIR.mkdir(parents=True, exist_ok=True)
+        approved_file = approved_path()
+        with instrument.stage("write_approved", rows_in=len(upd)):
+            upd.reset_index().assign(approved_by=getpass.getuser()).to_csv(approved_file, index=False)
+        with instrument.stage("index_changes", rows_in=len(upd)):
+            change_index.add(approved_file)
+
+        target = apply_live_ops(ops, "manual_approver", diff_file=diff_set.name)
+        session.mark_applied(applied_pos)
+        print(f"✅ Live updated with approvals: {len(ops)} change(s) -> {target}")
+        print(f"📄 Approved entries saved to: {approved_file}")
 
     print("\nSummary:")
     print(f"  ✅ Approved: {counts['approved']}")
     print(f"  ✍️  Manual overrides: {counts['manual']}")
+    print(f"  ❌ Rejected: {counts['rejected']}")
     print(f"  ⏭️  Skipped: {counts['skipped']}")
+    if args.rules:
+        print(f"  📏 Auto-approved by rule: {counts['auto_approved']}")
+        print(f"  🚫 Auto-rejected by rule: {counts['auto_rejected']}")
 
 if __name__ == "__main__":
     main()
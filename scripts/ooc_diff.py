@@ -0,0 +1,287 @@
+# scripts/ooc_diff.py
+"""
+Out-of-core diff
+----------------
+diff_frames() needs both sides of a comparison in memory. For inputs
+larger than RAM, run_weekly_pipeline --out-of-core diffs by external
+sort-merge instead:
+
+1. Spill: each input is read in chunks, keyed by row_id, and written as
+   sorted runs of pickled pages to a scratch directory.
+2. Reduce: while there are more runs than can be merged at once within
+   the budget, groups of runs are merged into longer ones.
+3. Merge: one streaming pass over every run of both sides cuts the key
+   space into ranges no run continues past; each batch of ranges is
+   diffed with diff_frames() and appended to the diff set straight away.
+
+Memory stays around --memory-budget: runs, merge pages and diff batches
+are sized from the bytes per row of the first chunk. New and removed
+rows are spilled to a scratch file as they come; record linkage pairs
+any removed row with any new one, so it needs all of them in memory and
+runs only when they fit the budget (linked value_changed rows are then
+written after the streamed ones). Past that, e.g. for a new agency load
+or a mass removal, they are written unlinked and a warning is printed.
+The previous week is streamed from its cleaned file in data/staging/
+when that is still on disk.
+
+    python -m scripts.run_weekly_pipeline --out-of-core [--memory-budget 512]
+"""
+
+from pathlib import Path
+import pickle, tempfile
+import numpy as np, pandas as pd
+from pandas.api.types import union_categoricals
+from scripts import run_weekly_pipeline as pipe
+from scripts import change_index, diff_store, history_store, instrument, schema
+
+KEY        = "_key"
+READ_ROWS  = 50_000     # rows per chunk read from an input
+PAGE_ROWS  = 2_000      # rows per page of a run (a merge reads one page per run at a time)
+SORT_COST  = 3          # peak memory of sorting a run, in multiples of its size
+DIFF_COST  = 8          # peak memory of diff_frames, in multiples of its input
+LINK_COST  = 8          # peak memory of record linkage, in multiples of the held rows
+
+
+def _row_bytes(chunk: pd.DataFrame) -> int:
+    return max(1, int(chunk.memory_usage(deep=True).sum() / max(len(chunk), 1)))
+
+class Budget:
+    """Rows per run, runs per merge and rows per diff batch for *mb* megabytes."""
+
+    def __init__(self, mb: float, row_bytes: int):
+        rows = mb * 2**20 / row_bytes
+        self.run_rows = max(PAGE_ROWS, int(rows / SORT_COST))
+        self.fan_in = max(2, int(rows / (PAGE_ROWS * DIFF_COST)))
+        self.batch_rows = max(PAGE_ROWS, int(rows / DIFF_COST))
+        self.link_rows = int(rows / LINK_COST)
+
+
+# ---------- Runs ----------
+def _concat(parts: list[pd.DataFrame]) -> pd.DataFrame:
+    """pd.concat, keeping columns categorical when chunks have different categories."""
+    df = pd.concat(parts, ignore_index=True)
+    for c in parts[0].columns:
+        if df[c].dtype == object and all(isinstance(p[c].dtype, pd.CategoricalDtype) for p in parts):
+            df[c] = union_categoricals([p[c] for p in parts])
+    return df
+
+def _write_pages(fh, df: pd.DataFrame) -> None:
+    """Pickle sorted *df* as pages of about PAGE_ROWS rows; a key never spans two pages."""
+    keys = df[KEY].to_numpy()
+    start = 0
+    while start < len(df):
+        stop = min(start + PAGE_ROWS, len(df))
+        if stop < len(df):
+            stop = int(np.searchsorted(keys, keys[stop - 1], side="right"))
+        pickle.dump(df.iloc[start:stop], fh, protocol=pickle.HIGHEST_PROTOCOL)
+        start = stop
+
+def _pages(path: Path):
+    with open(path, "rb") as fh:
+        while True:
+            try:
+                yield pickle.load(fh)
+            except EOFError:
+                return
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    # stable, so rows sharing a row_id keep their input order
+    return df.take(np.argsort(df[KEY].to_numpy(), kind="stable"))
+
+def spill(chunks, workdir: Path, name: str, mb: float):
+    """Write *chunks* as sorted runs; returns (runs, empty template frame, budget).
+
+    The budget is None when no chunk has rows.
+    """
+    runs, held, n_held, budget, template = [], [], 0, None, None
+
+    def flush():
+        nonlocal held, n_held
+        path = workdir / f"{name}_{len(runs):04d}.run"
+        with open(path, "wb") as fh:
+            _write_pages(fh, _sorted(_concat(held)))
+        runs.append(path)
+        held, n_held = [], 0
+
+    for chunk in chunks:
+        chunk = chunk.reset_index(drop=True)
+        chunk[KEY] = pipe.row_ids(chunk)
+        if template is None:
+            template = chunk.iloc[:0]
+        if budget is None and len(chunk):
+            budget = Budget(mb, _row_bytes(chunk))
+        while len(chunk):
+            take = budget.run_rows - n_held
+            held.append(chunk.iloc[:take])
+            n_held += len(held[-1])
+            chunk = chunk.iloc[take:]
+            if n_held >= budget.run_rows:
+                flush()
+    if held:
+        flush()
+    return runs, template, budget
+
+
+# ---------- Merge ----------
+class _Cursor:
+    def __init__(self, path: Path):
+        self.pages = _pages(path)
+        self.buf, self.more = None, True
+        self.fill()
+
+    def fill(self) -> None:
+        while self.more and (self.buf is None or not len(self.buf)):
+            self.buf = next(self.pages, None)
+            if self.buf is None:
+                self.more = False
+
+    def take(self, bound) -> pd.DataFrame:
+        if self.buf is None or not len(self.buf):
+            return None
+        n = int(np.searchsorted(self.buf[KEY].to_numpy(), bound, side="right"))
+        part, self.buf = self.buf.iloc[:n], self.buf.iloc[n:]
+        self.fill()
+        return part
+
+def merge_ranges(paths: list[Path]):
+    """Yield, per key range, the rows of each run in it (lists aligned with *paths*).
+
+    A range ends at the smallest last key among the pages loaded from runs
+    that have more pages, so no run has rows of a range left unread.
+    """
+    cursors = [_Cursor(p) for p in paths]
+    while True:
+        live = [c for c in cursors if c.buf is not None and len(c.buf)]
+        if not live:
+            return
+        pending = [c.buf[KEY].iat[-1] for c in live if c.more]
+        bound = min(pending) if pending else max(c.buf[KEY].iat[-1] for c in live)
+        yield [c.take(bound) for c in cursors]
+
+def reduce_runs(runs: list[Path], fan_in: int, workdir: Path, name: str) -> list[Path]:
+    """Merge groups of *fan_in* runs (in order) until at most *fan_in* remain."""
+    level = 0
+    while len(runs) > fan_in:
+        level += 1
+        merged = []
+        for g in range(0, len(runs), fan_in):
+            group = runs[g:g + fan_in]
+            if len(group) == 1:
+                merged += group
+                continue
+            path = workdir / f"{name}_l{level}_{len(merged):04d}.run"
+            with open(path, "wb") as fh:
+                for parts in merge_ranges(group):
+                    # run order first, so the stable sort keeps input order per key
+                    _write_pages(fh, _sorted(_concat([p for p in parts if p is not None])))
+            for p in group:
+                p.unlink()
+            merged.append(path)
+        runs = merged
+    return runs
+
+
+# ---------- Diff ----------
+def _frame(parts, template) -> pd.DataFrame:
+    parts = [p for p in parts if p is not None and len(p)]
+    df = _concat(parts) if parts else template
+    return df.drop(columns=KEY)
+
+def diff_batches(old_runs, new_runs, old_tmpl, new_tmpl, batch_rows: int):
+    """Yield (old, new) frames covering disjoint row_id ranges, about *batch_rows* rows each."""
+    n_old = len(old_runs)
+    olds, news, n = [], [], 0
+    for parts in merge_ranges(old_runs + new_runs):
+        olds += parts[:n_old]
+        news += parts[n_old:]
+        n += sum(len(p) for p in parts if p is not None)
+        if n >= batch_rows:
+            yield _frame(olds, old_tmpl), _frame(news, new_tmpl)
+            olds, news, n = [], [], 0
+    if n:
+        yield _frame(olds, old_tmpl), _frame(news, new_tmpl)
+
+def diff_chunks(writer: diff_store.DiffWriter, tag: str, old_chunks, new_chunks,
+                mb: float = 512, workdir: Path | None = None) -> int:
+    """Diff two chunked inputs into *writer* under *tag*; returns the wide rows written."""
+    with tempfile.TemporaryDirectory(prefix="ooc_diff_", dir=workdir) as tmp:
+        tmp = Path(tmp)
+        with instrument.stage(f"spill_{tag}") as st:
+            old_runs, old_tmpl, ob = spill(old_chunks, tmp, "old", mb)
+            new_runs, new_tmpl, nb = spill(new_chunks, tmp, "new", mb)
+            st.rows_out = len(old_runs) + len(new_runs)
+        if old_tmpl is None or new_tmpl is None:
+            raise ValueError(f"❌ {tag}: an input of the out-of-core diff yielded no chunks")
+        budget = min([b for b in (ob, nb) if b] or [Budget(mb, 1)], key=lambda b: b.batch_rows)
+
+        with instrument.stage(f"reduce_{tag}"):
+            # both sides are merged together, so they share the fan-in
+            share = max(2, budget.fan_in // 2)
+            old_runs = reduce_runs(old_runs, share, tmp, "old")
+            new_runs = reduce_runs(new_runs, share, tmp, "new")
+
+        # new/removed rows (wide, and their long _row entries) wait on disk for linkage
+        held_path, n_held, n_wide = tmp / "held.pkl", 0, 0
+        with instrument.stage(f"merge_{tag}") as st, open(held_path, "wb") as held:
+            for old, new in diff_batches(old_runs, new_runs, old_tmpl, new_tmpl, budget.batch_rows):
+                wide, long = pipe.diff_frames(old, new, tag, link=False)
+                whole = (wide["change_type"] != "value_changed").to_numpy()
+                whole_long = (long["field"] == "_row").to_numpy() if len(long) else np.zeros(0, bool)
+                if whole.any():
+                    pickle.dump((wide[whole], long[whole_long]), held, protocol=pickle.HIGHEST_PROTOCOL)
+                    n_held += int(whole.sum())
+                writer.append(tag, wide[~whole], long[~whole_long] if len(long) else long)
+                n_wide += int((~whole).sum())
+            st.rows_out = n_wide
+
+        if n_held <= budget.link_rows:
+            # linkage pairs any removed row with any new one, so it needs all of them at once
+            pieces = list(_pages(held_path))
+            wide = pd.concat([w for w, _ in pieces], ignore_index=True) if pieces else pd.DataFrame([])
+            long = [l for _, l in pieces if len(l)]
+            long = pd.concat(long, ignore_index=True) if long else pd.DataFrame([])
+            wide, long = pipe.link_records(wide, long, tag)
+            writer.append(tag, wide, long)
+            return n_wide + len(wide)
+
+        print(f"⚠️  {tag}: {n_held} new/removed rows do not fit the memory budget for record "
+              f"linkage (about {budget.link_rows}); written unlinked.")
+        for wide, long in _pages(held_path):
+            writer.append(tag, wide, long)
+            n_wide += len(wide)
+    return n_wide
+
+
+# ---------- Pipeline ----------
+def _week_chunks(week: str, rows: int):
+    """Chunks of stored *week*: its cleaned staging file if still on disk, else the
+    history snapshot (rebuilt from deltas in memory)."""
+    clean = pipe.staging_path(week)
+    if not clean.exists():
+        df = schema.typed(history_store.load_week(week))
+        for start in range(0, len(df), rows):
+            yield df.iloc[start:start + rows]
+        return
+    n, stored = 0, history_store.week_rows(week)
+    for chunk in schema.read(clean, chunksize=rows):
+        chunk = chunk.dropna(how="all")
+        n += len(chunk)
+        yield chunk
+    if n != stored:
+        raise ValueError(f"❌ {clean.name} has {n} rows but history week {week} has {stored}; "
+                         "remove the stale staging file to diff against the history store")
+
+def write_week(week: str, week_clean: Path, live_path: Path, prev_week: str | None,
+               mb: float = 512, compression: str | None = None) -> tuple[Path, Path]:
+    """run_weekly_pipeline's diffs of *week*, out of core; returns the set dirs."""
+    wide_dir, long_dir = pipe.diff_paths(week)
+    olds = [("weekly_vs_live", pipe.iter_live(live_path, READ_ROWS))]
+    if prev_week:
+        olds.append(("week_to_week", _week_chunks(prev_week, READ_ROWS)))
+    with diff_store.DiffWriter(wide_dir, long_dir, compression) as writer:
+        for tag, old in olds:
+            new = (c.dropna(how="all") for c in schema.read(week_clean, chunksize=READ_ROWS))
+            diff_chunks(writer, tag, old, new, mb, workdir=pipe.STAGING_DIR)
+    with instrument.stage("index_changes"):
+        change_index.add(long_dir)
+    return wide_dir, long_dir
@@ -0,0 +1,131 @@
+# scripts/record_linkage.py
+"""
+Fuzzy record linkage for unmatched diff rows
+--------------------------------------------
+A typo fix in a subject name or position changes the row_id, so the diff
+would report a removed_record plus an unrelated new_record. match() pairs
+such leftovers:
+
+1. Blocking   each key is split into padded character trigrams; pairs
+              sharing a trigram are candidates, keeping the TOP_K per
+              left key with the most shared trigrams. Trigrams held by
+              more than MAX_BLOCK keys on a side are ignored, so keys
+              made only of common trigrams are also paired with their
+              WINDOW nearest neighbours in sorted order on the right.
+              Every key meets a bounded number of others, so the cost
+              grows linearly with the number of rows, not n².
+2. Scoring    candidates get an exact trigram Dice similarity. It is blended with
+              the share of the other fields that agree, so "person 1" vs
+              "person 11" with different emails and dates is not a match.
+3. Assignment pairs at or above THRESHOLD are taken greedily, best
+              confidence first, each row used at most once.
+"""
+
+import numpy as np
+import pandas as pd
+
+NGRAM      = 3
+MAX_BLOCK  = 64     # trigrams on more keys than this (per side) don't block
+TOP_K      = 3      # trigram candidates per left key scored exactly
+WINDOW     = 2      # sorted-neighbourhood candidates on each side of a left key
+KEY_MIN    = 0.7    # minimum key similarity for any match
+KEY_WEIGHT = 0.5    # confidence = KEY_WEIGHT * key + (1 - KEY_WEIGHT) * fields
+THRESHOLD  = 0.9
+
+
+def grams(key: str) -> set[str]:
+    padded = " " * (NGRAM - 1) + key + " "
+    return {padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)}
+
+def dice(a: set, b: set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 1.0
+
+def _postings(gram_sets, vocab):
+    """(key position, gram id) arrays for every gram of every key."""
+    keys = np.repeat(np.arange(len(gram_sets)), [len(g) for g in gram_sets])
+    ids = vocab.get_indexer([g for gs in gram_sets for g in gs])
+    return keys, ids
+
+def _neighbours(left_keys, right_keys) -> tuple[np.ndarray, np.ndarray]:
+    """Each left key with the WINDOW right keys either side of it in sorted order."""
+    order = np.argsort(np.asarray(right_keys, dtype=str), kind="stable")
+    at = np.searchsorted(np.asarray(right_keys, dtype=str)[order], np.asarray(left_keys, dtype=str))
+    offsets = np.arange(-WINDOW, WINDOW)
+    pos = at[:, None] + offsets
+    ok = (pos >= 0) & (pos < len(right_keys))
+    left = np.broadcast_to(np.arange(len(left_keys))[:, None], pos.shape)[ok]
+    return left, order[pos[ok]]
+
+def _gram_candidates(left_grams, right_grams) -> tuple[np.ndarray, np.ndarray]:
+    """Pairs sharing a usable trigram, at most TOP_K per left key."""
+    if not left_grams or not right_grams:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    vocab = pd.Index(sorted(set().union(*left_grams) | set().union(*right_grams)))
+    lk, lg = _postings(left_grams, vocab)
+    rk, rg = _postings(right_grams, vocab)
+
+    n_l = np.bincount(lg, minlength=len(vocab))
+    n_r = np.bincount(rg, minlength=len(vocab))
+    usable = (n_l <= MAX_BLOCK) & (n_r <= MAX_BLOCK)
+    keep = usable[lg]
+    lk, lg = lk[keep], lg[keep]
+
+    # right keys grouped by gram; each left posting pairs with its gram's group
+    order = np.argsort(rg, kind="stable")
+    r_sorted = rk[order]
+    r_start = np.concatenate([[0], np.cumsum(n_r)])[:-1]
+    fan = n_r[lg]
+    if not fan.sum():
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    left = np.repeat(lk, fan)
+    within = np.arange(fan.sum()) - np.repeat(np.cumsum(fan) - fan, fan)
+    right = r_sorted[np.repeat(r_start[lg], fan) + within]
+
+    # shared usable grams per pair, then the TOP_K best per left key
+    pair, shared = np.unique(left * len(right_grams) + right, return_counts=True)
+    left, right = pair // len(right_grams), pair % len(right_grams)
+    order = np.lexsort((right, -shared, left))
+    left, right = left[order], right[order]
+    first = np.concatenate([[0], np.flatnonzero(np.diff(left)) + 1])
+    rank = np.arange(len(left)) - np.repeat(first, np.diff(np.append(first, len(left))))
+    top = rank < TOP_K
+    return left[top], right[top]
+
+def candidates(left_keys, right_keys, left_grams, right_grams) -> tuple[np.ndarray, np.ndarray]:
+    """Blocked candidate pairs (left pos, right pos), each pair once."""
+    if not len(left_keys) or not len(right_keys):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    gl, gr = _gram_candidates(left_grams, right_grams)
+    nl, nr = _neighbours(left_keys, right_keys)
+    pair = np.unique(np.concatenate([gl, nl]) * len(right_keys) + np.concatenate([gr, nr]))
+    return pair // len(right_keys), pair % len(right_keys)
+
+def match(left_keys, right_keys, left_fields=None, right_fields=None):
+    """Pair *left_keys* with *right_keys*; returns (left pos, right pos, confidence).
+
+    *left_fields*/*right_fields* are (rows x fields) arrays of comparable
+    values for the other columns; equal values (or both missing) agree.
+    """
+    left_grams = [grams(k) for k in left_keys]
+    right_grams = [grams(k) for k in right_keys]
+    li, ri = candidates(left_keys, right_keys, left_grams, right_grams)
+
+    key_sim = np.array([dice(left_grams[i], right_grams[j]) for i, j in zip(li, ri)])
+    ok = key_sim >= KEY_MIN
+    li, ri, key_sim = li[ok], ri[ok], key_sim[ok]
+    if left_fields is not None and left_fields.shape[1]:
+        a, b = left_fields[li], right_fields[ri]
+        agree = ((a == b) | (pd.isna(a) & pd.isna(b))).mean(axis=1)
+        conf = KEY_WEIGHT * key_sim + (1 - KEY_WEIGHT) * agree
+    else:
+        conf = key_sim
+    ok = conf >= THRESHOLD
+    li, ri, conf = li[ok], ri[ok], conf[ok]
+
+    used_l, used_r, out = set(), set(), []
+    for k in np.lexsort((ri, li, -conf)):
+        if li[k] not in used_l and ri[k] not in used_r:
+            used_l.add(li[k]); used_r.add(ri[k])
+            out.append(k)
+    out = np.array(sorted(out, key=lambda k: li[k]), dtype=np.int64)
+    return li[out], ri[out], np.round(conf[out], 4)
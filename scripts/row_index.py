@@ -0,0 +1,74 @@
+# scripts/row_index.py
+"""
+Per-row hash index for the live dataset
+---------------------------------------
+Sidecar file next to Stakeholder_Live_Clean.csv mapping each row_id to a
+64-bit hash of its normalized compare columns. diff_frames uses it to
+drop rows whose incoming hash matches, so field-level comparison only
+runs on rows that actually changed. A second hash per row covers every
+column as stored, un-normalized; auto-update compares that one, so
+case- or whitespace-only corrections still reach live.
+
+The index remembers the size/mtime of the live file and its change
+journal at build time; if either is written by anything else the index
+is treated as stale.
+"""
+
+import pickle
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scripts.live_journal import journal_path
+
+
+def index_path(live_path: Path) -> Path:
+    return live_path.with_name(live_path.stem + ".rowidx.pkl")
+
+def _state(live_path: Path) -> tuple:
+    """Size/mtime of the live base and its journal."""
+    out = []
+    for p in (live_path, journal_path(live_path)):
+        st = p.stat() if p.exists() else None
+        out += [st.st_size, st.st_mtime_ns] if st else [None, None]
+    return tuple(out)
+
+def row_hashes(df: pd.DataFrame, cols) -> np.ndarray:
+    """uint64 hash per row over *cols* (values must already be normalized)."""
+    return pd.util.hash_pandas_object(df[list(cols)], index=False).to_numpy()
+
+def save(live_path: Path, row_ids, hashes, cols, raw_hashes=None, raw_cols=None) -> Path:
+    out = index_path(live_path)
+    tmp = out.with_suffix(".tmp")
+    with open(tmp, "wb") as fh:
+        pickle.dump({
+            "state": _state(live_path),
+            "cols": list(cols),
+            "row_id": np.asarray(row_ids, dtype=object),
+            "hash": np.asarray(hashes, dtype=np.uint64),
+            "raw_cols": None if raw_cols is None else list(raw_cols),
+            "raw_hash": None if raw_hashes is None else np.asarray(raw_hashes, dtype=np.uint64),
+        }, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(out)
+    return out
+
+def load(live_path: Path) -> dict | None:
+    """Return the index for *live_path*, or None if missing or stale."""
+    path = index_path(live_path)
+    if not path.exists() or not live_path.exists():
+        return None
+    with open(path, "rb") as fh:
+        idx = pickle.load(fh)
+    if idx.get("state") != _state(live_path) or idx.get("raw_hash") is None:
+        return None   # stale, or saved before the stored-value hashes
+    return idx
+
+def unchanged_masks(idx: dict, new_ids, new_hashes):
+    """Keep-masks for (old, new): False where the row_id hashes identically on both sides."""
+    pos = pd.Index(idx["row_id"]).get_indexer(new_ids)
+    found = pos >= 0
+    same = np.zeros(len(pos), dtype=bool)
+    same[found] = idx["hash"][pos[found]] == new_hashes[found]
+
+    keep_old = np.ones(len(idx["row_id"]), dtype=bool)
+    keep_old[pos[same]] = False
+    return keep_old, ~same
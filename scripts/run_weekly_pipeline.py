@@ -2,31 +2,39 @@
 Weekly Stakeholder Pipeline  •  Manual-default mode
 ---------------------------------------------------
 • Cleans newest raw CSV  -> data/staging/
-• Archives a copy        -> data/history/
-• Creates wide + long diffs in data/diffs/
-• By default **does NOT** overwrite the live file.
-  Use --auto-update to skip manual approval.
+• Archives the week      -> data/history/store/ (delta snapshots,
+                            see scripts/history_store.py)
+• Creates wide + long diffs in data/diffs/, compressed and partitioned
+  by comparison and change type (see scripts/diff_store.py); a removed
+  row and a new row that look like one record under a corrected name
+  are reported as value_changed (see scripts/record_linkage.py).
+• By default **does NOT** update the live file.
+  Use --auto-update to skip manual approval; changes are
+  appended to the live journal (see scripts/live_journal.py), or
+  upserted into the SQLite live store once it has been imported
+  (see scripts/live_db.py).
+• --backlog cleans every unprocessed raw export in parallel and
+  diffs the weeks in date order, as if run one week at a time.
+• --shards N splits both diffs by row_id hash across a process pool.
+• --out-of-core diffs by external sort-merge within --memory-budget MB
+  (see scripts/ooc_diff.py).
+• --report writes per-stage timings to data/diffs/reports/;
+  --profile FILE dumps cProfile stats.
 """
 
 from datetime import datetime
 from pathlib import Path
-import argparse, shutil, pandas as pd
-from scripts.utils import normalize_text, normalize_dates, proper_case_status, build_row_id
+from concurrent.futures import ProcessPoolExecutor
+import json, re, numpy as np, pandas as pd
+from scripts.utils import normalize_text_series, normalize_dates, proper_case_status, build_row_id
+from scripts import stage_cache, row_index, live_journal, history_store, instrument, schema
+from scripts import record_linkage, diff_store, live_db, change_index, live_aggregates, live_backup, cli_args
 
-DATE_FIELDS = [
-    "date case created",
-    "date suitability decision",
-    "date clearance completed"
-]
+DATE_FIELDS = schema.DATE_COLS
 
 
 # ---------- CLI ----------
-parser = argparse.ArgumentParser()
-parser.add_argument(
-    "--auto-update",
-    action="store_true",
-    help="Directly overwrite Stakeholder_Live_Clean.csv without manual approval.",
-)
+parser = cli_args.pipeline_parser()
 
 # ---------- Paths ----------
 ROOT        = Path(__file__).resolve().parent.parent
@@ -36,201 +44,791 @@ HIST_DIR    = ROOT / "data" / "history"
 LIVE_PATH   = ROOT / "data" / "live" / "Stakeholder_Live_Clean.csv"
 DIFF_WIDE   = ROOT / "data" / "diffs" / "wide"
 DIFF_LONG   = ROOT / "data" / "diffs" / "long"
-for p in (STAGING_DIR, HIST_DIR, DIFF_WIDE, DIFF_LONG):
-    p.mkdir(parents=True, exist_ok=True)
+REPORT_DIR  = ROOT / "data" / "diffs" / "reports"
+
+def ensure_dirs() -> None:
+    """Create the data directories a run writes to (never at import)."""
+    for p in (STAGING_DIR, HIST_DIR, DIFF_WIDE, DIFF_LONG, LIVE_PATH.parent):
+        p.mkdir(parents=True, exist_ok=True)
 
 # ---------- Helpers ----------
 def _has_cols(df, *cols) -> bool:
     """True if *all* columns exist on the DataFrame."""
     return all(c in df.columns for c in cols)
 
-def clean_raw() -> Path:
-    latest = max(RAW_DIR.glob("*.csv"), key=lambda f: f.stat().st_mtime)
-
-    # Always skip row 1 since it contains metadata
-    df = pd.read_csv(latest, skiprows=1)
-
-    df.columns = df.columns.str.strip().str.lower()
-    df.columns = df.columns.str.replace(r"\s+", " ", regex=True)
-
-    #print("🔍 Actual column names:", list(df.columns))
-
-    EXPECTED_COLS = {
-    "date case created",
-    "case status",
-    "subject name",
-    "employee type",
-    "primary position",
-    "sector",
-    "region",
-    "nominee personal email address",
-    "requestor name",
-    "cisa nominator / sponsor email address",
-    "clearance type",
-    "clearance status",
-    "date suitability decision",
-    "suitability decision",
-    "date clearance completed"
-}
-
-
-    raw_cols = set(df.columns)
-    missing = EXPECTED_COLS - raw_cols
-    extra = raw_cols - EXPECTED_COLS
-
-    if missing:
-        print(f"⚠️  WARNING: Raw data is missing expected columns: {missing}")
-        raise ValueError(f"Aborting: Required columns missing: {missing}")
-    if extra:
-        print(f"⚠️  NOTE: Raw data has extra columns not in expected schema: {extra}")
-
-    df = df.dropna(how="all")
-    df = normalize_dates(df, [
-        "date_submitted", "date_cleared",
-        "date case create", "date suitability decision", "date clearance completed"
-    ])
-    df = proper_case_status(df)
-
-    out = STAGING_DIR / f"Weekly_Cleaned_{datetime.now().date()}.csv"
-    df.to_csv(out, index=False)
+EXPECTED_COLS = set(schema.COLUMNS)
+
+# Columns compared by diff_frames, in output order
+CMP_COLS = schema.COLUMNS
+
+def _clean_columns(cols):
+    """Strip, lowercase and collapse whitespace in raw header names."""
+    return pd.Index([schema.clean_name(c) for c in cols])
+
+def _clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # dates were parsed by schema.read (unparseable -> NaT)
+    return proper_case_status(df.dropna(how="all"))
+
+def latest_raw() -> Path:
+    return max(RAW_DIR.glob("*.csv"), key=lambda f: f.stat().st_mtime)
+
+def staging_path(week: str | None = None) -> Path:
+    return STAGING_DIR / f"Weekly_Cleaned_{week or datetime.now().date()}.csv"
+
+def clean_raw(chunksize: int | None = None, src: Path | None = None,
+              out: Path | None = None) -> Path:
+    """Clean *src* (default: the newest raw export) into *out* (default: today's staging file).
+
+    The metadata line above the header is found by schema.read, which also
+    validates the header before the body is parsed and loads only the
+    schema columns. With *chunksize* the file is streamed: each chunk is
+    cleaned and appended, so peak memory stays at one chunk regardless of
+    export size.
+    """
+    latest = src or latest_raw()
+    out = out or staging_path()
+    read_kw = dict(schema_only=True, strict=True, coerce_dates=True)
+
+    if chunksize:
+        wrote_header = False
+        with instrument.stage("stream") as st, open(out, "w", newline="") as fh:
+            st.rows_out = 0
+            for chunk in schema.read(latest, chunksize=chunksize, **read_kw):
+                chunk = _clean_frame(chunk)
+                chunk.to_csv(fh, header=not wrote_header, index=False)
+                wrote_header = True
+                st.rows_out += len(chunk)
+            if not wrote_header:
+                pd.DataFrame(columns=schema.COLUMNS).to_csv(fh, index=False)
+        print(f"✅ Cleaned file saved -> {out}")
+        return out
+
+    with instrument.stage("parse") as st:
+        df = schema.read(latest, **read_kw)
+        st.rows_out = len(df)
+
+    with instrument.stage("normalize", rows_in=len(df)) as st:
+        df = _clean_frame(df)
+        st.rows_out = len(df)
+
+    with instrument.stage("write", rows_in=len(df)):
+        df.to_csv(out, index=False)
     print(f"✅ Cleaned file saved -> {out}")
     return out
 
 
 
 # ---------- Diff core ----------
-def diff_frames(old: pd.DataFrame, new: pd.DataFrame, tag: str):
-    cmp_cols = [
-    "date case created",
-    "case status",
-    "subject name",
-    "employee type",
-    "primary position",
-    "sector",
-    "region",
-    "nominee personal email address",
-    "requestor name",
-    "cisa nominator / sponsor email address",
-    "clearance type",
-    "clearance status",
-    "date suitability decision",
-    "suitability decision",
-    "date clearance completed"
-]
-
-
-
-    for d in (old, new):
-        normalize_dates(d)
-        for c in cmp_cols:
-            if c in d:
-                d[c] = d[c].apply(normalize_text)
-
-    old["row_id"] = build_row_id(old)
-    new["row_id"] = build_row_id(new)
-
-    m = pd.merge(old, new, on="row_id", how="outer",
-                 suffixes=("_old", "_new"), indicator=True)
-
-    added   = m[m["_merge"] == "right_only"]
-    removed = m[m["_merge"] == "left_only"]
-
-    # ---------- value-change mask ----------
-    mask = False
-    for c in cmp_cols:
-        col_old, col_new = f"{c}_old", f"{c}_new"
-        if _has_cols(m, col_old, col_new):
-            mask |= m[col_old] != m[col_new]
-    changed = m[(m["_merge"] == "both") & mask]
+def _is_cat(s: pd.Series) -> bool:
+    return isinstance(s.dtype, pd.CategoricalDtype)
+
+def _shared_codes(left: pd.Series, right: pd.Series):
+    """Category codes of both sides against the union of their categories (-1 = NaN)."""
+    union = left.cat.categories.union(right.cat.categories)
+    to_union = lambda s: np.append(union.get_indexer(s.cat.categories), -1)[s.cat.codes.to_numpy()]
+    return to_union(left), to_union(right)
+
+def _field_changes(m, fields):
+    """Boolean (rows x fields) matrices: raw inequality and NaN-aware change."""
+    ne = np.zeros((len(m), len(fields)), dtype=bool)
+    both_na = np.zeros_like(ne)
+    for j, c in enumerate(fields):
+        left, right = m[f"{c}_old"], m[f"{c}_new"]
+        if _is_cat(left) and _is_cat(right):
+            # compare codes; NaN never equals anything, as with object values
+            lc, rc = _shared_codes(left, right)
+            ne[:, j] = (lc != rc) | (lc < 0) | (rc < 0)
+            both_na[:, j] = (lc < 0) & (rc < 0)
+            continue
+        if _is_cat(left) or _is_cat(right):
+            left, right = left.astype(object), right.astype(object)
+        ne[:, j] = (left != right).to_numpy()
+        both_na[:, j] = (left.isna() & right.isna()).to_numpy()
+    return ne, ne & ~both_na
+
+def _changed_fields_labels(changes, fields):
+    """Join the changed field names per row; one string build per distinct pattern."""
+    if not len(changes):
+        return np.empty(0, dtype=object)
+    codes = changes.astype(np.int64) @ (np.int64(1) << np.arange(len(fields), dtype=np.int64))
+    patterns, inverse = np.unique(codes, return_inverse=True)
+    labels = np.array(
+        [", ".join(f for j, f in enumerate(fields) if p >> j & 1) for p in patterns],
+        dtype=object,
+    )
+    return labels[inverse.ravel()]
+
+def _long_frame(m, fields, changes, tag):
+    """Long (row_id, field, old, new, tag) table in merge order, built column-wise."""
+    merge = m["_merge"].to_numpy()
+    is_both = merge == "both"
+    rows_b, cols_b = np.nonzero(changes & is_both[:, None])
+    single = np.flatnonzero(~is_both)
+    if not len(rows_b) and not len(single):
+        return pd.DataFrame([])
+
+    old_b = np.empty(len(rows_b), dtype=object)
+    new_b = np.empty(len(rows_b), dtype=object)
+    for j, c in enumerate(fields):
+        sel = cols_b == j
+        if sel.any():
+            old_b[sel] = m[f"{c}_old"].to_numpy(dtype=object)[rows_b[sel]]
+            new_b[sel] = m[f"{c}_new"].to_numpy(dtype=object)[rows_b[sel]]
+
+    added = merge[single] == "right_only"
+    old_s = np.where(added, None, "present").astype(object)
+    new_s = np.where(added, "present", None).astype(object)
+
+    # entries for the same merged row stay in compare-column order
+    pos = np.concatenate([rows_b, single])
+    order = np.argsort(pos, kind="stable")
+    field_names = np.array(fields + ["_row"], dtype=object)
+    field_idx = np.concatenate([cols_b, np.full(len(single), len(fields))])
+
+    return pd.DataFrame({
+        "row_id": m["row_id"].to_numpy(dtype=object)[pos[order]],
+        "field":  field_names[field_idx[order]],
+        "old":    np.concatenate([old_b, old_s])[order],
+        "new":    np.concatenate([new_b, new_s])[order],
+        "tag":    np.full(len(pos), tag, dtype=object),
+    })
+
+def _normalize_for_diff(d: pd.DataFrame) -> None:
+    normalize_dates(d)
+    for c in CMP_COLS:
+        if c in d:
+            # typed category columns stay categorical so they compare by code
+            d[c] = normalize_text_series(d[c], categorical=_is_cat(d[c]))
+
+def _index_usable(idx, old, new) -> bool:
+    """The index applies if it covers *old* row for row and both sides compare the same columns."""
+    if idx is None or len(idx["row_id"]) != len(old):
+        return False
+    present = [c for c in CMP_COLS if c in old]
+    return (idx["cols"] == present == [c for c in CMP_COLS if c in new]
+            and _has_cols(old, "subject name", "primary position"))
+
+def diff_frames(old: pd.DataFrame, new: pd.DataFrame, tag: str, old_index: dict | None = None,
+                link: bool = True):
+    """Wide and long diff of *old* -> *new*.
+
+    *old_index* is a row-hash index of *old* (see scripts/row_index.py).
+    When it applies, rows whose incoming hash matches are dropped before
+    the merge, so only changed rows are normalized and compared.
+    With *link*, removed/new rows that look like the same record under a
+    corrected name are reported as one value_changed row (see link_records).
+    """
+    cmp_cols = CMP_COLS
+
+    n_in = len(old) + len(new)
+    if _index_usable(old_index, old, new):
+        with instrument.stage("index_filter", rows_in=n_in) as st:
+            _normalize_for_diff(new)
+            new["row_id"] = build_row_id(new)
+            keep_old, keep_new = row_index.unchanged_masks(
+                old_index, new["row_id"].to_numpy(), row_index.row_hashes(new, old_index["cols"])
+            )
+            old = old[keep_old].copy()
+            new = new[keep_new]
+            _normalize_for_diff(old)
+            if old.empty:   # keep the normalized (object) dtypes a full diff would have
+                old = old.astype({c: object for c in old_index["cols"]})
+            old["row_id"] = old_index["row_id"][keep_old]
+            st.rows_out = len(old) + len(new)
+    else:
+        with instrument.stage("normalize", rows_in=n_in):
+            for d in (old, new):
+                _normalize_for_diff(d)
+
+        with instrument.stage("row_id", rows_in=n_in):
+            old["row_id"] = build_row_id(old)
+            new["row_id"] = build_row_id(new)
+
+    with instrument.stage("merge", rows_in=len(old) + len(new)) as st:
+        m = pd.merge(old, new, on="row_id", how="outer",
+                     suffixes=("_old", "_new"), indicator=True)
+        st.rows_out = len(m)
+
+    # ---------- per-field change masks ----------
+    fields = [c for c in cmp_cols if _has_cols(m, f"{c}_old", f"{c}_new")]
+    with instrument.stage("compare", rows_in=len(m)):
+        ne, changes = _field_changes(m, fields)
+
+    merge = m["_merge"].to_numpy()
+    added_pos   = np.flatnonzero(merge == "right_only")
+    removed_pos = np.flatnonzero(merge == "left_only")
+    changed_pos = np.flatnonzero((merge == "both") & ne.any(axis=1))
 
     # ---------- wide ----------
-    wide = pd.concat([added, removed, changed], ignore_index=True)
-
-    def tag_row(r):
-        if r["_merge"] == "right_only": return "new_record"
-        if r["_merge"] == "left_only":  return "removed_record"
-        return "value_changed"
-    wide["change_type"] = wide.apply(tag_row, axis=1)
-
-    def changed_fields_row(r):
-        out = []
-        for c in cmp_cols:
-            col_old, col_new = f"{c}_old", f"{c}_new"
-            if col_old not in r or col_new not in r:
-                continue
-            left, right = r[col_old], r[col_new]
-            if pd.isna(left) and pd.isna(right):
-                continue
-            if left != right:
-                out.append(c)
-        return ", ".join(out)
-    wide["changed_fields"] = wide.apply(changed_fields_row, axis=1)
+    with instrument.stage("wide", rows_in=len(m)) as st:
+        wide_pos = np.concatenate([added_pos, removed_pos, changed_pos])
+        wide = m.take(wide_pos).reset_index(drop=True)
+        wide["change_type"] = np.select(
+            [merge[wide_pos] == "right_only", merge[wide_pos] == "left_only"],
+            ["new_record", "removed_record"],
+            "value_changed",
+        ).astype(object)
+        wide["changed_fields"] = _changed_fields_labels(changes[wide_pos], fields)
+        st.rows_out = len(wide)
 
     # ---------- long ----------
-    long_rows = []
-    for _, r in m.iterrows():
-        if r["_merge"] == "both":
-            for c in cmp_cols:
-                col_old, col_new = f"{c}_old", f"{c}_new"
-                if col_old not in r or col_new not in r:
-                    continue
-                left, right = r[col_old], r[col_new]
-                if pd.isna(left) and pd.isna(right) or left == right:
-                    continue
-                long_rows.append({"row_id": r["row_id"], "field": c,
-                                  "old": left, "new": right, "tag": tag})
-        else:
-            long_rows.append({"row_id": r["row_id"], "field": "_row",
-                              "old": None if r["_merge"]=="right_only" else "present",
-                              "new": "present" if r["_merge"]=="right_only" else None,
-                              "tag": tag})
-    long = pd.DataFrame(long_rows)
+    with instrument.stage("long", rows_in=len(m)) as st:
+        long = _long_frame(m, fields, changes, tag)
+        st.rows_out = len(long)
+    return link_records(wide, long, tag) if link else (wide, long)
+
+# ---------- Record linkage ----------
+_KEY_COLS = ("subject name", "primary position")
+
+def _wide_order(wide: pd.DataFrame) -> np.ndarray:
+    """Row order of a wide diff: change type (new, removed, changed), then row_id."""
+    rank = wide["change_type"].map(_WIDE_RANK)
+    return np.lexsort((wide["row_id"].to_numpy(dtype=str), rank.to_numpy()))
+
+def link_records(wide: pd.DataFrame, long: pd.DataFrame, tag: str):
+    """Report removed/new pairs that match fuzzily as value_changed rows.
+
+    The pair keeps the new row_id; matched_row_id holds the old one and
+    match_confidence the score from scripts/record_linkage.py. The two
+    columns only appear when something was linked.
+    """
+    if wide.empty:
+        return wide, long
+    ctype = wide["change_type"].to_numpy()
+    gone, added = np.flatnonzero(ctype == "removed_record"), np.flatnonzero(ctype == "new_record")
+    if not len(gone) or not len(added):
+        return wide, long
+
+    fields = [c for c in CMP_COLS if _has_cols(wide, f"{c}_old", f"{c}_new")]
+    others = [c for c in fields if c not in _KEY_COLS]
+    with instrument.stage("link", rows_in=len(gone) + len(added)) as st:
+        li, ri, conf = record_linkage.match(
+            wide["row_id"].to_numpy(dtype=str)[gone], wide["row_id"].to_numpy(dtype=str)[added],
+            wide[[f"{c}_old" for c in others]].to_numpy(dtype=object)[gone],
+            wide[[f"{c}_new" for c in others]].to_numpy(dtype=object)[added],
+        )
+        st.rows_out = len(li)
+    if not len(li):
+        return wide, long
+
+    old_rows = wide.take(gone[li]).reset_index(drop=True)
+    pairs = wide.take(added[ri]).reset_index(drop=True)
+    for c in wide.columns:
+        if c.endswith("_old"):
+            pairs[c] = old_rows[c].array
+    _, changes = _field_changes(pairs, fields)
+    pairs["_merge"] = "both"
+    pairs["change_type"] = "value_changed"
+    pairs["changed_fields"] = _changed_fields_labels(changes, fields)
+    pairs["matched_row_id"] = old_rows["row_id"].to_numpy(dtype=object)
+    pairs["match_confidence"] = conf
+
+    wide = pd.concat([wide.drop(index=wide.index[np.concatenate([gone[li], added[ri]])]), pairs],
+                     ignore_index=True)
+    wide = wide.take(_wide_order(wide)).reset_index(drop=True)
+
+    rows_c, cols_c = np.nonzero(changes)
+    linked_long = pd.DataFrame({
+        "row_id": pairs["row_id"].to_numpy(dtype=object)[rows_c],
+        "field":  np.array(fields, dtype=object)[cols_c],
+        "old":    np.array([pairs[f"{fields[j]}_old"].iat[i] for i, j in zip(rows_c, cols_c)], dtype=object),
+        "new":    np.array([pairs[f"{fields[j]}_new"].iat[i] for i, j in zip(rows_c, cols_c)], dtype=object),
+        "tag":    np.full(len(rows_c), tag, dtype=object),
+    })
+    if len(long):
+        ids = set(pairs["row_id"]) | set(pairs["matched_row_id"])
+        long = long[~((long["field"] == "_row") & long["row_id"].isin(ids))]
+    long = pd.concat([long, linked_long], ignore_index=True)
+    long = long.sort_values("row_id", kind="stable").reset_index(drop=True)
     return wide, long
 
-# ---------- Pipeline routine ----------
-def main() -> None:
-    args = parser.parse_args()
-
-    week_clean = clean_raw()
-    week_df = pd.read_csv(week_clean, parse_dates=DATE_FIELDS).dropna(how="all")
-
-    shutil.copy(week_clean, HIST_DIR / week_clean.name)
+# ---------- Sharded diff ----------
+_WIDE_RANK = {"new_record": 0, "removed_record": 1, "value_changed": 2}
+
+def row_ids(df: pd.DataFrame) -> np.ndarray:
+    """row_id of every row of *df*, as diff_frames builds it."""
+    key = df[[c for c in ("subject name", "primary position") if c in df]].copy()
+    return build_row_id(key).to_numpy(dtype=object)
+
+def _shard_jobs(old, new, tag, old_index, shards):
+    """Split *old*/*new* by a hash of row_id so matching rows land in the same shard."""
+    use_idx = _index_usable(old_index, old, new)
+    old_ids = old_index["row_id"] if use_idx else row_ids(old)
+    old_shard = pd.util.hash_array(old_ids) % shards
+    new_shard = pd.util.hash_array(row_ids(new)) % shards
+    jobs = []
+    for k in range(shards):
+        o, n = old_shard == k, new_shard == k
+        idx = ({**old_index, "row_id": old_index["row_id"][o], "hash": old_index["hash"][o]}
+               if use_idx else None)
+        jobs.append((old[o], new[n], tag, idx))
+    return jobs
+
+def _diff_job_shard(job):
+    old, new, tag, idx = job
+    # renamed rows land in other shards, so linkage runs on the merged result
+    return diff_frames(old, new, tag, old_index=idx, link=False)
+
+def _merge_shards(parts, tag):
+    """Concatenate shard outputs in the order a single diff_frames call produces."""
+    wides = [w for w, _ in parts]
+    wide = pd.concat(wides, ignore_index=True)
+    wide = wide.take(_wide_order(wide)).reset_index(drop=True)
+
+    longs = [l for _, l in parts if len(l)]
+    if not longs:
+        return link_records(wide, pd.DataFrame([]), tag)
+    long = pd.concat(longs, ignore_index=True)
+    long = long.sort_values("row_id", kind="stable").reset_index(drop=True)
+    return link_records(wide, long, tag)
 
-    if not LIVE_PATH.exists():
-        week_df = proper_case_status(week_df)   # <--- Add here
-        week_df.to_csv(LIVE_PATH, index=False)
-        print("ℹ️  No live file found. Seeded live dataset and exiting.")
+# ---------- Pipeline routine ----------
+def _read_clean(path: Path) -> pd.DataFrame:
+    return schema.read(path).dropna(how="all")
+
+def live_source() -> Path:
+    """The live dataset: the SQLite store once imported (scripts/live_db.py), else the CSV."""
+    return live_db.DB_PATH if live_db.enabled() else LIVE_PATH
+
+def live_exists() -> bool:
+    return live_source().exists()
+
+def _read_live(path: Path) -> pd.DataFrame:
+    """Live base snapshot plus its change journal (or the SQLite store)."""
+    if path.suffix == ".sqlite":
+        return schema.typed(live_db.read_all(path).dropna(how="all"))
+    # categories after the fold, so journal values can land in any column
+    base = live_journal.read_live(path, reader=schema.read, categories=False)
+    return schema.typed(base.dropna(how="all"))
+
+def load_live(live_path: Path | None = None) -> pd.DataFrame:
+    live_path = live_path or live_source()
+    return stage_cache.cached_frame(live_path, _read_live,
+                                    extra=[live_journal.journal_path(live_path)])
+
+def iter_live(live_path: Path | None = None, chunksize: int = 50_000):
+    """The live state as load_live() reads it, in chunks of about *chunksize* rows."""
+    live_path = live_path or live_source()
+    if live_path.suffix == ".sqlite":
+        chunks = live_db.iter_chunks(live_path, chunksize)
+    else:
+        chunks = live_journal.iter_live(live_path, chunksize, reader=schema.read, categories=False)
+    for chunk in chunks:
+        yield schema.typed(chunk.dropna(how="all"))
+
+def _stored_hashes(df: pd.DataFrame, cols) -> np.ndarray:
+    """Row hashes over *cols* as the live store keeps them: day strings, text, missing as None."""
+    text = {}
+    for c in cols:
+        s = df[c]
+        s = s.dt.strftime("%Y-%m-%d") if pd.api.types.is_datetime64_any_dtype(s) else s.astype(str)
+        text[c] = s.astype(object).where(df[c].notna().to_numpy(), None)
+    return row_index.row_hashes(pd.DataFrame(text, index=df.index), cols)
+
+def _index_hashes(live: pd.DataFrame):
+    """Row-hash index fields of typed live rows: (row_ids, hashes, compared columns) as
+    diff_frames sees them, then (hashes, columns) of every column as stored."""
+    raw_cols = [c for c in live.columns if c != "row_id"]
+    raw = _stored_hashes(live, raw_cols)
+    live = live.copy()
+    present = [c for c in CMP_COLS if c in live]
+    _normalize_for_diff(live)
+    return (build_row_id(live).to_numpy(dtype=object), row_index.row_hashes(live, present), present,
+            raw, raw_cols)
+
+def refresh_live_index(live_path: Path | None = None) -> dict:
+    """Rebuild the row-hash index of the live state as diff_frames will read it."""
+    live_path = live_path or live_source()
+    row_index.save(live_path, *_index_hashes(load_live(live_path)))
+    return row_index.load(live_path)
+
+def update_live_index(idx: dict | None, ops: list[dict], live_path: Path | None = None) -> dict:
+    """Bring *idx*, the row-hash index from before *ops* were applied, up to date.
+
+    Rows keep their place, removed rows drop out and rows new to live are
+    appended in op order (as the live store orders them), so only the rows
+    the ops wrote are read back and hashed. Falls back to a full rebuild
+    when there is no index or the compared columns changed.
+    """
+    live_path = live_path or live_source()
+    if idx is None:
+        return refresh_live_index(live_path)
+    old_ids = idx["row_id"]
+    touched = list(dict.fromkeys(op["row_id"] for op in ops))
+    at = dict(zip(touched, pd.Index(old_ids).get_indexer(touched)))
+    gone, added = set(), {}
+    for op in ops:
+        rid = op["row_id"]
+        if op["op"] == "remove":
+            if added.pop(rid, None) is None and at[rid] >= 0:
+                gone.add(at[rid])
+        elif rid not in added and (at[rid] < 0 or at[rid] in gone):
+            added[rid] = None
+    keep = np.ones(len(old_ids), dtype=bool)
+    keep[list(gone)] = False
+    ids = np.concatenate([old_ids[keep], np.array(list(added), dtype=object)])
+    hashes = np.concatenate([idx["hash"][keep], np.zeros(len(added), dtype=np.uint64)])
+    raw = np.concatenate([idx["raw_hash"][keep], np.zeros(len(added), dtype=np.uint64)])
+
+    written = [rid for rid in touched if rid in added or (at[rid] >= 0 and at[rid] not in gone)]
+    rows = live_rows(written, live_path)
+    vals = rows.drop(columns="row_id")
+    if not set(vals.columns) <= set(idx["raw_cols"]):   # the ops added a column
+        return refresh_live_index(live_path)
+    vals = schema.typed(vals.where(vals.notna(), np.nan).reindex(columns=idx["raw_cols"]))
+    row_ids, row_hashes, present, row_raw, _ = _index_hashes(vals)
+    pos = pd.Index(ids).get_indexer(row_ids)
+    if present != idx["cols"] or len(rows) != len(written) or (pos < 0).any():
+        return refresh_live_index(live_path)
+    hashes[pos], raw[pos] = row_hashes, row_raw
+    row_index.save(live_path, ids, hashes, present, raw, idx["raw_cols"])
+    return row_index.load(live_path)
+
+def write_live(df: pd.DataFrame) -> None:
+    df.to_csv(LIVE_PATH, index=False)
+    refresh_live_index()
+    live_aggregates.rebuild(LIVE_PATH, df)
+
+def live_rows(row_ids, live_path: Path | None = None) -> pd.DataFrame:
+    """Current live rows of *row_ids* (as object columns) with their row_id."""
+    live_path = live_path or live_source()
+    if live_path.suffix == ".sqlite":
+        return live_db.lookup(row_ids, live_path)
+    # base rows at their byte offsets plus their journal records, not the whole live state
+    rows = live_journal.read_rows(live_path, row_ids, reader=schema.read, categories=False)
+    rows = schema.typed(rows.dropna(how="all"))
+    ids = rows["row_id"] if "row_id" in rows.columns else build_row_id(rows.copy())
+    return rows.astype(object).assign(row_id=ids.to_numpy(dtype=object))
+
+def live_delta(week_df: pd.DataFrame, live_idx: dict) -> list[dict]:
+    """Journal ops that bring the live state to *week_df* (changed, new and dropped rows).
+
+    Rows are compared on their stored values, not the normalized ones the
+    diff uses, so a correction of case or spacing alone is still written.
+    """
+    week = week_df.copy()
+    _normalize_for_diff(week)
+    ids = build_row_id(week).to_numpy(dtype=object)
+    live_ids = live_idx["row_id"]
+    raw_cols = live_idx.get("raw_cols")
+    if raw_cols is not None and set(raw_cols) <= set(week_df.columns):
+        keep_live, keep_week = row_index.unchanged_masks(
+            {"row_id": live_ids, "hash": live_idx["raw_hash"]}, ids, _stored_hashes(week_df, raw_cols))
+    else:   # columns differ, so every row is rewritten
+        keep_live, keep_week = np.ones(len(live_ids), bool), np.ones(len(ids), bool)
+
+    known = set(live_ids)
+    ops = []
+    for rid, values in zip(ids[keep_week], week_df[keep_week].to_dict("records")):
+        op = live_journal.update_op if rid in known else live_journal.insert_op
+        ops.append(op(rid, values))
+    gone = pd.Index(live_ids[keep_live]).difference(ids)
+    ops += [live_journal.remove_op(rid) for rid in gone]
+    return ops
+
+def iter_week_diffs(week_df, live_df, live_idx, last_week_df=None, shards: int = 1, workers=None):
+    """Yield (tag, wide, long) for weekly_vs_live, then week_to_week when a previous week exists.
+
+    With *shards* > 1 each comparison is split by row_id hash and the
+    shards of both comparisons run together in a process pool; the output
+    is identical to the serial path.
+    """
+    pairs = [(live_df, "weekly_vs_live", live_idx)]
+    if last_week_df is not None:
+        pairs.append((last_week_df, "week_to_week", None))
+
+    if shards > 1:
+        with instrument.stage("sharded", rows_in=len(week_df) + sum(len(o) for o, _, _ in pairs)):
+            jobs = [_shard_jobs(old, week_df, tag, idx, shards) for old, tag, idx in pairs]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(_diff_job_shard, [j for js in jobs for j in js]))
+        for i, (_, tag, _) in enumerate(pairs):
+            yield (tag, *_merge_shards(parts[i * shards:(i + 1) * shards], tag))
+    else:
+        for old, tag, idx in pairs:
+            with instrument.stage(tag, rows_in=len(old) + len(week_df)):
+                out = diff_frames(old.copy(), week_df.copy(), tag, old_index=idx)
+            yield (tag, *out)
+
+def week_diffs(week_df, live_df, live_idx, last_week_df=None, shards: int = 1, workers=None):
+    """iter_week_diffs() concatenated into one wide and one long frame."""
+    outs = [out[1:] for out in iter_week_diffs(week_df, live_df, live_idx, last_week_df,
+                                                 shards, workers)]
+    if len(outs) == 1:
+        return outs[0]
+    return pd.concat([w for w, _ in outs]), pd.concat([l for _, l in outs])
+
+def diff_paths(week: str) -> tuple[Path, Path]:
+    return DIFF_WIDE / f"Changes_{week}", DIFF_LONG / f"ChangesLong_{week}"
+
+def backup_live(reason: str, live_path: Path | None = None) -> Path | None:
+    """Deduplicated snapshot of the live dataset and its journal (scripts/live_backup.py)."""
+    live_path = live_path or live_source()
+    return live_backup.backup([live_path, live_journal.journal_path(live_path)], reason)
+
+def apply_live_ops(ops: list[dict], source: str, **meta) -> str:
+    """Apply *ops* to the live dataset; returns where they went (for messages).
+
+    The live state is backed up first. The row-hash index and the summary
+    aggregates (scripts/live_aggregates.py) follow from the touched rows
+    alone, for both stores; aggregates missing for the store are rebuilt.
+    """
+    src = live_source()
+    with instrument.stage("backup"):
+        backup_live(source, src)
+    idx = row_index.load(src)
+    before = None
+    if live_aggregates.exists(src):
+        with instrument.stage("aggregates_before", rows_in=len(ops)):
+            before = live_rows({op["row_id"] for op in ops}, src)
+    if src.suffix == ".sqlite":
+        with instrument.stage("db_apply", rows_in=len(ops)):
+            live_db.apply(ops, source=source, db=src, **meta)
+        target = src.name
+    else:
+        with instrument.stage("journal_append", rows_in=len(ops)):
+            live_journal.append(src, ops, source=source, **meta)
+        with instrument.stage("compact"):
+            live_journal.maybe_compact(src)
+        target = live_journal.journal_path(src).name
+    with instrument.stage("update_index", rows_in=len(ops)):
+        update_live_index(idx, ops, src)
+    if before is not None:
+        with instrument.stage("aggregates", rows_in=len(ops)):
+            live_aggregates.apply(src, before, ops)
+    else:   # no store yet for this live source: build it once, updates are incremental after
+        with instrument.stage("aggregates_rebuild"):
+            live_aggregates.rebuild(src, load_live(src))
+    return target
+
+def auto_update(week_df: pd.DataFrame, week_file: str) -> None:
+    """Apply the changes that bring live to *week_df*."""
+    week_df = proper_case_status(week_df)
+    ops = live_delta(week_df, row_index.load(live_source()) or refresh_live_index())
+    target = apply_live_ops(ops, "auto_update", week_file=week_file)
+    print(f"🔄 Live dataset updated: {len(ops)} change(s) -> {target}")
+
+def seed_live(week_df: pd.DataFrame) -> None:
+    write_live(proper_case_status(week_df))
+    print("ℹ️  No live file found. Seeded live dataset.")
+
+def import_legacy_history(read) -> None:
+    """One-off move of full weekly copies in data/history/ into the history store."""
+    if not history_store.weeks() and any(HIST_DIR.glob("Weekly_Cleaned_*.csv")):
+        n = history_store.import_legacy(HIST_DIR, read=read)
+        print(f"🗃️  Imported {n} archived weekly file(s) into the history store.")
+
+
+# ---------- Backlog ----------
+PROCESSED_PATH = STAGING_DIR / "processed_raw.json"
+
+def raw_week(path: Path) -> str:
+    """Week label of a raw export: a YYYY-MM-DD in its name, else its mtime date."""
+    m = re.search(r"\d{4}-\d{2}-\d{2}", path.stem)
+    return m.group(0) if m else datetime.fromtimestamp(path.stat().st_mtime).date().isoformat()
+
+def _processed() -> dict:
+    try:
+        return json.loads(PROCESSED_PATH.read_text())
+    except FileNotFoundError:
+        return {}
+
+def mark_processed(raw: Path, week: str) -> None:
+    done = _processed()
+    done[stage_cache.file_digest(raw)] = {"file": raw.name, "week": week}
+    PROCESSED_PATH.write_text(json.dumps(done, indent=1))
+
+def unprocessed_raw() -> list[tuple[str, Path]]:
+    """Raw exports not yet processed (by content digest) as (week, path), oldest week first.
+
+    A week already in the history store is re-added from the new export,
+    as a single run would.
+    """
+    done = _processed()
+    return sorted((raw_week(f), f) for f in RAW_DIR.glob("*.csv")
+                  if stage_cache.file_digest(f) not in done)
+
+def week_clashes(todo) -> list[str]:
+    """Weeks that several of the (week, path) exports in *todo* map to."""
+    weeks = [w for w, _ in todo]
+    return sorted({w for w in weeks if weeks.count(w) > 1})
+
+def pending_raw() -> list[tuple[str, Path]]:
+    """unprocessed_raw(), refusing several exports for one week."""
+    todo = unprocessed_raw()
+    clash = week_clashes(todo)
+    if clash:
+        raise ValueError(f"❌ Several raw exports map to the same week: {clash}")
+    return todo
+
+def _clean_job(job) -> Path:
+    src, out, chunksize = job
+    return clean_raw(chunksize=chunksize, src=src, out=out)
+
+def _diff_job(job):
+    week_df, live_df, live_idx, last_week_df = job
+    if live_df is None:
+        return [("week_to_week", *diff_frames(last_week_df.copy(), week_df.copy(), "week_to_week"))]
+    return list(iter_week_diffs(week_df, live_df, live_idx, last_week_df))
+
+def write_diffs(week: str, outs, compression: str | None = None) -> tuple[Path, Path]:
+    """Write (tag, wide, long) comparisons of *week* as they arrive; returns the set dirs.
+
+    The long set is then added to the per-record change index.
+    """
+    wide_dir, long_dir = diff_paths(week)
+    with diff_store.DiffWriter(wide_dir, long_dir, compression) as writer:
+        for tag, wide, long in outs:
+            with instrument.stage(f"write_{tag}", rows_in=len(wide) + len(long)):
+                writer.write(tag, wide, long)
+    with instrument.stage("index_changes"):
+        change_index.add(long_dir)
+    return wide_dir, long_dir
+
+def run_backlog(workers: int | None = None, chunksize: int | None = None,
+                auto_update_live: bool = False, compression: str | None = None) -> list[str]:
+    """Clean and diff every pending raw export, one week at a time in effect.
+
+    Cleaning and the pairwise diffs run in a process pool; the history
+    store and live journal are only written here, in week order, so the
+    outputs match running the weeks one after another. With
+    *auto_update_live* each weekly_vs_live diff depends on the previous
+    week's update and runs in order after the parallel week_to_week diffs.
+    """
+    todo = pending_raw()
+    if not todo:
+        print("ℹ️  No unprocessed raw exports.")
+        return []
+    print(f"📦 Backlog: {len(todo)} raw export(s) -> {', '.join(w for w, _ in todo)}")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [(raw, staging_path(week), chunksize) for week, raw in todo]
+        cleaned = list(pool.map(_clean_job, jobs))
+        frames = [_read_clean(p) for p in cleaned]
+
+        import_legacy_history(_read_clean)
+        prev = []
+        for (week, _), df in zip(todo, frames):
+            history_store.add_week(week, df)
+            prev_week = history_store.previous_week(week)
+            prev.append(schema.typed(history_store.load_week(prev_week)) if prev_week else None)
+
+        start = 0
+        if not live_exists():
+            seed_live(frames[0])
+            start = 1
+        if auto_update_live:
+            jobs = [(df, None, None, p) for df, p in zip(frames[start:], prev[start:]) if p is not None]
+        else:
+            live_df = _read_live(live_source())
+            live_idx = row_index.load(live_source()) or refresh_live_index()
+            jobs = [(df, live_df, live_idx, p) for df, p in zip(frames[start:], prev[start:])]
+        results = iter(pool.map(_diff_job, jobs))
+
+    for (week, raw), df, last, path in list(zip(todo, frames, prev, cleaned))[start:]:
+        if auto_update_live:
+            ww = next(results) if last is not None else []
+            outs = [("weekly_vs_live", *diff_frames(
+                _read_live(live_source()), df.copy(), "weekly_vs_live",
+                old_index=row_index.load(live_source()) or refresh_live_index()))] + ww
+        else:
+            outs = next(results)
+        wide_dir, long_dir = write_diffs(week, outs, compression)
+        print(f"✅ {week}: diffs → {DIFF_WIDE.name}/{wide_dir.name}, {DIFF_LONG.name}/{long_dir.name}")
+        if auto_update_live:
+            auto_update(df, path.name)
+    for (week, raw) in todo:
+        mark_processed(raw, week)
+    return [w for w, _ in todo]
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parser.parse_args(argv)
+    if args.report:
+        instrument.start("run_weekly_pipeline", trace_memory=args.trace_memory, args=vars(args))
+    try:
+        with instrument.profiled(args.profile):
+            run(args)
+    finally:
+        path = instrument.finish(instrument.report_path(REPORT_DIR, "RunReport"))
+        if path:
+            print(f"📊 Run report → {path}")
+
+def run(args) -> None:
+    ensure_dirs()
+    if args.backlog:
+        run_backlog(args.workers, args.chunk_size, args.auto_update, args.diff_compression)
+        if not args.auto_update:
+            print("ℹ️  Live file NOT updated (manual approval mode).")
         return
 
+    use_cache = not args.no_cache
+    load = (lambda p: stage_cache.cached_frame(p, _read_clean)) if use_cache else _read_clean
 
-    live_df = pd.read_csv(LIVE_PATH, parse_dates=DATE_FIELDS).dropna(how="all")
-
-    wide_wl, long_wl = diff_frames(live_df.copy(), week_df.copy(), "weekly_vs_live")
+    raw = latest_raw()
+    week = raw_week(raw)   # same label as --backlog and the watch daemon give this export
+    week_clean = staging_path(week)
+    with instrument.stage("clean"):
+        if use_cache and stage_cache.reuse("clean", [raw], [week_clean]):
+            print(f"♻️  Raw file unchanged; reusing cleaned file -> {week_clean}")
+        else:
+            week_clean = clean_raw(chunksize=args.chunk_size, src=raw, out=week_clean)
+            stage_cache.record("clean", [raw], [week_clean])
+    with instrument.stage("read_week") as st:
+        week_df = load(week_clean)
+        st.rows_out = len(week_df)
+
+    with instrument.stage("history", rows_in=len(week_df)):
+        import_legacy_history(load)
+        history_store.add_week(week, week_df)
+        mark_processed(raw, week)
+
+    if not live_exists():
+        with instrument.stage("seed_live", rows_in=len(week_df)):
+            seed_live(week_df)
+        return
 
-    hist_files = sorted(HIST_DIR.glob("Weekly_Cleaned_*.csv"))
-    if len(hist_files) >= 2:
-        last_week_df = pd.read_csv(hist_files[-2], parse_dates=DATE_FIELDS).dropna(how="all")
-        
-        wide_ww, long_ww = diff_frames(last_week_df.copy(), week_df.copy(), "week_to_week")
-        wide_out = pd.concat([wide_wl, wide_ww])
-        long_out = pd.concat([long_wl, long_ww])
+    prev_week = history_store.previous_week(week)
+    prev_hist = history_store.week_file(prev_week) if prev_week else None
+
+    wide_path, long_path = diff_paths(week)
+    live_src = live_source()
+    diff_inputs = [week_clean, live_src, live_journal.journal_path(live_src), prev_hist]
+    # options that change what is written (format, row order, linkage under a budget)
+    diff_params = {"compression": args.diff_compression or diff_store.DEFAULT_COMPRESSION,
+                   "out_of_core": args.out_of_core, "shards": args.shards,
+                   "memory_budget": args.memory_budget if args.out_of_core else None}
+
+    if use_cache and stage_cache.reuse("diff", diff_inputs, [wide_path, long_path], diff_params):
+        print("♻️  Inputs unchanged since last run; reusing diffs.")
+        change_index.add(long_path)
+    elif args.out_of_core:
+        from scripts import ooc_diff   # imports this module
+        with instrument.stage("diff_out_of_core"):
+            ooc_diff.write_week(week, week_clean, live_src, prev_week,
+                                args.memory_budget, args.diff_compression)
+        stage_cache.record("diff", diff_inputs, [wide_path, long_path], diff_params)
     else:
-        wide_out, long_out = wide_wl, long_wl
-
-    today = datetime.now().date().isoformat()
-    wide_out.to_csv(DIFF_WIDE / f"Changes_{today}.csv",  index=False)
-    long_out.to_csv(DIFF_LONG / f"ChangesLong_{today}.csv", index=False)
-    print(f"✅ Wide diff  → {DIFF_WIDE / f'Changes_{today}.csv'}")
-    print(f"✅ Long diff  → {DIFF_LONG / f'ChangesLong_{today}.csv'}")
+        with instrument.stage("read_live") as st:
+            live_df = load_live() if use_cache else _read_live(live_src)
+            live_idx = row_index.load(live_src) or refresh_live_index()
+            st.rows_out = len(live_df)
+        with instrument.stage("read_last_week") as st:
+            last_week_df = schema.typed(history_store.load_week(prev_week)) if prev_week else None
+            st.rows_out = 0 if last_week_df is None else len(last_week_df)
+        with instrument.stage("diff"):
+            # each comparison is written as soon as it is done
+            outs = iter_week_diffs(week_df, live_df, live_idx, last_week_df,
+                                   shards=args.shards, workers=args.workers)
+            write_diffs(week, outs, args.diff_compression)
+        stage_cache.record("diff", diff_inputs, [wide_path, long_path], diff_params)
+    print(f"✅ Wide diff  → {wide_path}")
+    print(f"✅ Long diff  → {long_path}")
 
     # ----- auto-update live (optional) -----
     if args.auto_update:
-        backup_dir = LIVE_PATH.parent / "backups"; backup_dir.mkdir(exist_ok=True)
-        bkup = backup_dir / f"Stakeholder_Live_Clean_backup_{datetime.now():%Y%m%d_%H%M%S}.csv"
-        shutil.copy(LIVE_PATH, bkup)
-        week_df = proper_case_status(week_df)
-        week_df.to_csv(LIVE_PATH, index=False)
-        print(f"🔄 Live dataset updated. Backup stored at {bkup}")
+        with instrument.stage("auto_update", rows_in=len(week_df)):
+            auto_update(week_df, week_clean.name)
     else:
         print("ℹ️  Live file NOT updated (manual approval mode).")
 
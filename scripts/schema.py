@@ -0,0 +1,172 @@
+# scripts/schema.py
+"""
+Stakeholder schema and CSV reader
+---------------------------------
+The one definition of the stakeholder columns, in compare/output order,
+and how each is held in memory:
+
+• Dates                 -> datetime64, normalized to the day
+• Low-cardinality text  -> category (one code per row, one string per value)
+• Free text             -> left as str objects
+
+read() sniffs the header line (raw exports carry a metadata line above
+it), validates it before touching the body, and parses the body once
+with explicit dtypes (each distinct date string is converted once), on
+the multithreaded pyarrow engine when pyarrow is installed. typed()
+converts a frame that was read some other way (e.g. live after its
+journal is folded in).
+"""
+
+import csv
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "date case created",
+    "case status",
+    "subject name",
+    "employee type",
+    "primary position",
+    "sector",
+    "region",
+    "nominee personal email address",
+    "requestor name",
+    "cisa nominator / sponsor email address",
+    "clearance type",
+    "clearance status",
+    "date suitability decision",
+    "suitability decision",
+    "date clearance completed",
+]
+
+DATE_COLS = [
+    "date case created",
+    "date suitability decision",
+    "date clearance completed",
+]
+
+CATEGORY_COLS = [
+    "case status",
+    "employee type",
+    "primary position",
+    "sector",
+    "region",
+    "requestor name",
+    "cisa nominator / sponsor email address",
+    "clearance type",
+    "clearance status",
+    "suitability decision",
+]
+
+TEXT_COLS = [
+    "subject name",
+    "nominee personal email address",
+]
+
+
+def _as_day(col: pd.Series, coerce: bool = False) -> pd.Series:
+    """datetime64 day values, parsing each distinct string once.
+
+    The format is inferred from the first value, then retried per value.
+    Unless *coerce*, *col* is returned unchanged if some values are not dates.
+    """
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col.dt.normalize()
+    codes, uniques = pd.factorize(col)
+    uniques = pd.Index(uniques, dtype=object)
+    days = pd.to_datetime(uniques, errors="coerce")
+    if not coerce and days.isna().any():
+        days = pd.to_datetime(uniques, errors="coerce", format="mixed")
+        if days.isna().any():
+            return col   # keep unparseable entries visible rather than blanking them
+    days = np.append(days.normalize().to_numpy("datetime64[ns]"), np.datetime64("NaT", "ns"))
+    return pd.Series(days[codes], index=col.index, name=col.name)
+
+def typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert the schema columns present in *df* in place; returns *df*."""
+    for c in DATE_COLS:
+        if c in df.columns:
+            df[c] = _as_day(df[c])
+    for c in CATEGORY_COLS:
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+    return df
+
+
+# ---------- Reader ----------
+SNIFF_LINES = 10
+
+try:
+    import pyarrow  # noqa: F401
+    DEFAULT_ENGINE = "pyarrow"
+except ImportError:
+    DEFAULT_ENGINE = "c"
+
+def clean_name(name: str) -> str:
+    """Strip, lowercase and collapse whitespace in a header name."""
+    return " ".join(str(name).split()).lower()
+
+def sniff_header(path: Path) -> tuple[int, list[str]]:
+    """(row number, raw names) of the header: the first row naming a schema column.
+
+    Falls back to the first line, so files without schema columns read as before.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        # blank lines are not counted, as read_csv's header= does not count them
+        rows = [row for _, row in zip(range(SNIFF_LINES), filter(None, csv.reader(fh)))]
+    for i, row in enumerate(rows):
+        if {clean_name(c) for c in row} & set(COLUMNS):
+            return i, row
+    return 0, rows[0] if rows else []
+
+def check_header(names) -> None:
+    """Raise if schema columns are missing; note any extras."""
+    names = set(names)
+    missing = set(COLUMNS) - names
+    extra = names - set(COLUMNS)
+    if missing:
+        print(f"⚠️  WARNING: Raw data is missing expected columns: {missing}")
+        raise ValueError(f"Aborting: Required columns missing: {missing}")
+    if extra:
+        print(f"⚠️  NOTE: Raw data has extra columns not in expected schema: {extra}")
+
+def _finish(df: pd.DataFrame, raw_to_clean: dict, coerce_dates: bool) -> pd.DataFrame:
+    df = df.rename(columns=raw_to_clean)
+    for c in DATE_COLS:
+        if c in df.columns:
+            df[c] = _as_day(df[c], coerce_dates)
+    return df
+
+def read(path: Path, *, schema_only: bool = False, strict: bool = False,
+         categories: bool = True, coerce_dates: bool = False,
+         chunksize: int | None = None, engine: str | None = None):
+    """Read a stakeholder CSV with schema dtypes; header names come back cleaned.
+
+    • schema_only   load only the schema columns (usecols)
+    • strict        raise before reading the body if schema columns are missing
+    • categories    read low-cardinality columns straight into categories
+    • coerce_dates  unparseable dates become NaT instead of leaving the column as text
+    • chunksize     return an iterator of frames (always the C engine)
+    """
+    skip, raw_names = sniff_header(path)
+    cleaned = [clean_name(c) for c in raw_names]
+    if strict:
+        check_header(cleaned)
+    raw_to_clean = dict(zip(raw_names, cleaned))
+    by_clean = {c: r for r, c in raw_to_clean.items()}
+
+    usecols = [by_clean[c] for c in COLUMNS if c in by_clean] if schema_only else None
+    dtype = {by_clean[c]: "category" if categories else object
+             for c in CATEGORY_COLS if c in by_clean}
+    # dates are read as text and parsed per distinct value in _finish
+    dtype.update({by_clean[c]: object for c in TEXT_COLS + DATE_COLS if c in by_clean})
+
+    engine = "c" if chunksize else (engine or DEFAULT_ENGINE)
+    kw = dict(header=skip, usecols=usecols, dtype=dtype, engine=engine)
+    if chunksize:
+        kw["chunksize"] = chunksize
+    reader = pd.read_csv(path, **kw)
+    if chunksize:
+        return (_finish(chunk, raw_to_clean, coerce_dates) for chunk in reader)
+    return _finish(reader, raw_to_clean, coerce_dates)
@@ -0,0 +1,154 @@
+# scripts/stage_cache.py
+"""
+Content-fingerprint cache for pipeline stages
+---------------------------------------------
+• Fingerprints input files by content hash (stat-checked, so unchanged
+  files are not re-hashed)
+• Records each stage's input fingerprints, the options that shape its
+  output and its output files in a JSON manifest, so a re-run with the
+  same inputs and options can reuse the outputs
+• Keeps parsed, typed DataFrames as pickles for fast reload
+"""
+
+import hashlib, json, os, shutil
+from pathlib import Path
+import pandas as pd
+
+# Bump when stage logic changes so stale entries are ignored.
+CACHE_VERSION = 1
+
+ROOT       = Path(__file__).resolve().parent.parent
+CACHE_DIR  = ROOT / "data" / "cache"
+FRAMES_DIR = CACHE_DIR / "frames"
+MANIFEST   = CACHE_DIR / "manifest.json"
+
+
+# ---------- Manifest ----------
+def _load() -> dict:
+    try:
+        m = json.loads(MANIFEST.read_text())
+    except (FileNotFoundError, ValueError):
+        m = {}
+    if m.get("version") != CACHE_VERSION:
+        m = {"version": CACHE_VERSION, "files": {}, "stages": {}, "frames": {}}
+    return m
+
+def _save(m: dict) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST.with_suffix(".tmp")
+    tmp.write_text(json.dumps(m, indent=1))
+    os.replace(tmp, MANIFEST)
+
+
+# ---------- Fingerprints ----------
+def _hash_file(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as fh:
+        while block := fh.read(1 << 20):
+            h.update(block)
+    return h.hexdigest()
+
+def _digest(path, m: dict) -> str | None:
+    """Content hash of *path*, reusing the manifest entry while size/mtime match.
+
+    A directory hashes as the names and content hashes of the files in it.
+    """
+    if path is None:
+        return None
+    path = Path(path)
+    if not path.exists():
+        return None
+    if path.is_dir():
+        h = hashlib.blake2b(digest_size=20)
+        for f in sorted(p for p in path.rglob("*") if p.is_file()):
+            h.update(f"{f.relative_to(path).as_posix()}:{_digest(f, m)};".encode())
+        return h.hexdigest()
+    st = path.stat()
+    key = str(path.resolve())
+    ent = m["files"].get(key)
+    if ent and ent["size"] == st.st_size and ent["mtime_ns"] == st.st_mtime_ns:
+        return ent["digest"]
+    digest = _hash_file(path)
+    m["files"][key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest}
+    return digest
+
+def file_digest(path) -> str | None:
+    """Content hash of a file (None if it does not exist)."""
+    m = _load()
+    digest = _digest(path, m)
+    _save(m)
+    return digest
+
+
+# ---------- Stage outputs ----------
+def _params(params: dict | None) -> dict:
+    return json.loads(json.dumps(params or {}, sort_keys=True))
+
+def reuse(stage: str, inputs, targets, params: dict | None = None) -> bool:
+    """Restore *stage* outputs into *targets* if its inputs and *params* are unchanged.
+
+    Returns True on a hit. Recorded outputs that still exist with their
+    recorded content are copied to the target paths when those differ.
+    """
+    m = _load()
+    key = [_digest(p, m) for p in inputs]
+    entry = m["stages"].get(stage)
+    hit = (entry is not None and entry["inputs"] == key and entry.get("params", {}) == _params(params)
+           and len(entry["outputs"]) == len(targets))
+    if hit:
+        for (src, digest), dst in zip(entry["outputs"], targets):
+            if _digest(src, m) != digest:
+                hit = False
+                break
+        else:
+            for (src, _), dst in zip(entry["outputs"], targets):
+                if Path(src).resolve() == Path(dst).resolve():
+                    continue
+                if Path(src).is_dir():
+                    shutil.rmtree(dst, ignore_errors=True)
+                    shutil.copytree(src, dst)
+                else:
+                    shutil.copy(src, dst)
+    _save(m)
+    return hit
+
+def record(stage: str, inputs, outputs, params: dict | None = None) -> None:
+    """Remember that *inputs*, with options *params*, produced *outputs* for *stage*."""
+    m = _load()
+    m["stages"][stage] = {
+        "inputs": [_digest(p, m) for p in inputs],
+        "params": _params(params),
+        "outputs": [[str(Path(p).resolve()), _digest(p, m)] for p in outputs],
+    }
+    _save(m)
+
+
+# ---------- Parsed frames ----------
+def cached_frame(path, read, extra=()) -> pd.DataFrame:
+    """Return read(path), reloading a pickled copy while the file content is unchanged.
+
+    *extra* lists further files read() depends on (e.g. the live journal).
+    """
+    m = _load()
+    path = Path(path)
+    key = str(path.resolve())
+    digest = _digest(path, m)
+    if extra:
+        parts = [digest] + [_digest(p, m) or "-" for p in extra]
+        digest = hashlib.blake2b("+".join(parts).encode(), digest_size=20).hexdigest()
+    ent = m["frames"].get(key)
+    if ent and ent["digest"] == digest and Path(ent["pickle"]).exists():
+        _save(m)
+        return pd.read_pickle(ent["pickle"])
+
+    df = read(path)
+    FRAMES_DIR.mkdir(parents=True, exist_ok=True)
+    pkl = FRAMES_DIR / f"{digest}.pkl"
+    df.to_pickle(pkl)
+    if ent and ent["pickle"] != str(pkl) and ent["pickle"] not in (
+        e["pickle"] for k, e in m["frames"].items() if k != key
+    ):
+        Path(ent["pickle"]).unlink(missing_ok=True)
+    m["frames"][key] = {"digest": digest, "pickle": str(pkl)}
+    _save(m)
+    return df
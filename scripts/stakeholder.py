@@ -0,0 +1,132 @@
+# scripts/stakeholder.py
+"""
+stakeholder — one entry point for the weekly workflow
+-----------------------------------------------------
+    ./stakeholder status                     what is on disk, at a glance
+    ./stakeholder clean [--src FILE] [--chunk-size N]
+    ./stakeholder diff [...]                 run_weekly_pipeline (same flags)
+    ./stakeholder approve [...]              manual_approver (same flags)
+    ./stakeholder benchmark [...]            benchmark (same flags)
+
+(`python -m scripts.stakeholder ...` works the same.) Only the standard
+library is imported here: each command imports the modules it needs when
+it runs, and the delegated commands' flags are parsed by cli_args first,
+so `status` and every `--help` start without loading pandas, and no
+directory is created until a command writes to it. The library modules
+themselves (diff_frames etc.) have no import-time side effects either.
+"""
+
+from pathlib import Path
+import argparse, importlib, json, sys
+
+ROOT      = Path(__file__).resolve().parent.parent
+DATA      = ROOT / "data"
+RAW_DIR   = DATA / "raw"
+LIVE_CSV  = DATA / "live" / "Stakeholder_Live_Clean.csv"
+LIVE_DB   = DATA / "live" / "Stakeholder_Live.sqlite"
+WEEKS     = DATA / "history" / "store" / "weeks.json"
+PROCESSED = DATA / "staging" / "processed_raw.json"
+DIFF_WIDE = DATA / "diffs" / "wide"
+APPROVED  = DATA / "diffs" / "approved"
+
+# subcommand -> (module whose main() takes the remaining arguments, its parser in cli_args, help)
+DELEGATED = {
+    "diff":      ("scripts.run_weekly_pipeline", "pipeline_parser",
+                  "Clean, archive and diff the newest raw export (pipeline flags)"),
+    "approve":   ("scripts.manual_approver", "approver_parser",
+                  "Review and apply the latest diffs (approver flags)"),
+    "benchmark": ("scripts.benchmark", "benchmark_parser",
+                  "Benchmark the pipeline stages (benchmark flags)"),
+}
+
+
+# ---------- status (standard library only) ----------
+def _json(path: Path, default):
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return default
+
+def _lines(path: Path) -> int:
+    if not path.exists():
+        return 0
+    with open(path, "rb") as fh:
+        return sum(block.count(b"\n") for block in iter(lambda: fh.read(1 << 20), b""))
+
+def _newest(d: Path, pattern: str) -> Path | None:
+    found = sorted(d.glob(pattern)) if d.exists() else []
+    return found[-1] if found else None
+
+def status() -> None:
+    raw = sorted(RAW_DIR.glob("*.csv")) if RAW_DIR.exists() else []
+    done = {v["file"] for v in _json(PROCESSED, {}).values()}
+    print(f"📦 Raw exports : {len(raw)} ({sum(p.name not in done for p in raw)} not yet processed)")
+
+    weeks = [w["week"] for w in _json(WEEKS, [])]
+    print(f"🗃️  History     : {len(weeks)} week(s)" + (f", {weeks[0]} … {weeks[-1]}" if weeks else ""))
+
+    live = LIVE_DB if LIVE_DB.exists() else LIVE_CSV
+    if live.exists():
+        journal = live.with_name(live.stem + ".journal.jsonl")
+        print(f"📗 Live        : {live.name} ({live.stat().st_size / 2**20:.1f} MB), "
+              f"{_lines(journal)} journal record(s) pending")
+        agg = _json(live.with_name(live.stem + ".aggregates.json"), None)
+        if agg:
+            print(f"🧮 Live rows   : {agg['rows']} (aggregates updated {agg.get('updated')})")
+    else:
+        print("📗 Live        : not seeded yet")
+
+    latest = _newest(DIFF_WIDE, "Changes_*")
+    if latest is not None:
+        parts = _json(latest / "partitions.json", {}).get("partitions", [])
+        by_tag = {}
+        for p in parts:
+            by_tag.setdefault(p["tag"], []).append(f"{p['rows']} {p['change_type']}")
+        print(f"🔍 Latest diff : {latest.name}"
+              + "".join(f"\n      {tag}: {', '.join(v)}" for tag, v in by_tag.items()))
+    approved = _newest(APPROVED, "Approved_Changes_*.csv")
+    if approved is not None:
+        print(f"✅ Approvals   : latest {approved.name}")
+
+    from scripts import live_backup   # standard library only
+    snaps = live_backup.snapshots(live_backup.store_dir(live))
+    if snaps:
+        print(f"💾 Backups     : {len(snaps)} snapshot(s), latest "
+              f"{live_backup.snapshot_time(snaps[-1]):%Y-%m-%d %H:%M:%S}")
+
+
+# ---------- clean ----------
+def clean(src: Path | None, chunksize: int | None) -> None:
+    from scripts import run_weekly_pipeline as pipe
+    pipe.ensure_dirs()
+    pipe.clean_raw(chunksize=chunksize, src=src)
+
+
+# ---------- CLI ----------
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in DELEGATED:
+        # everything after the subcommand goes to the module's own parser; check it with the
+        # light copy first so --help and usage errors exit before pandas is imported
+        module, build, _ = DELEGATED[argv[0]]
+        from scripts import cli_args   # standard library only
+        getattr(cli_args, build)(prog=f"stakeholder {argv[0]}").parse_args(argv[1:])
+        return importlib.import_module(module).main(argv[1:])
+
+    parser = argparse.ArgumentParser(prog="stakeholder", description="Stakeholder weekly workflow.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Summarize raw, history, live, diffs and backups on disk")
+    p = sub.add_parser("clean", help="Clean a raw export into data/staging/")
+    p.add_argument("--src", type=Path, help="Raw export (default: the newest in data/raw/)")
+    p.add_argument("--chunk-size", type=int, help="Stream the export in chunks of this many rows")
+    for name, (*_, text) in DELEGATED.items():
+        sub.add_parser(name, help=text)   # listed for --help; dispatched above
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        status()
+    else:
+        clean(args.src, args.chunk_size)
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,90 @@
 # scripts/utils.py
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import infer_dtype
 
 def normalize_text(v):
     """Trim + lowercase string, or return empty string for NaN."""
     return str(v).strip().lower() if pd.notna(v) else ""
 
+def _per_unique(s, op):
+    """Apply *op* (Index -> Index string transform) once per distinct value.
+
+    Only for pure-string object columns, where equal keys always stringify
+    identically. Returns (result, na_mask) with NaN left at null positions,
+    or None for any other column.
+    """
+    if s.dtype != object or infer_dtype(s, skipna=True) != "string":
+        return None
+    codes, uniques = pd.factorize(s)
+    norm = np.append(np.asarray(op(pd.Index(uniques, dtype=object)), dtype=object), np.nan)
+    return pd.Series(norm[codes], index=s.index, name=s.name, dtype=object), codes < 0
+
+def _normalize_codes(codes, uniques, index, name, categorical):
+    """normalize_text over factorized values; NaN (code -1) becomes ""."""
+    norm = np.array([normalize_text(u) for u in np.asarray(uniques, dtype=object)] + [""],
+                    dtype=object)
+    if not categorical:
+        return pd.Series(norm[codes], index=index, name=name, dtype=object)
+    cats, inverse = np.unique(norm.astype(str), return_inverse=True)
+    cat = pd.Categorical.from_codes(inverse.ravel()[codes], categories=cats.astype(object))
+    return pd.Series(cat, index=index, name=name)
+
+def normalize_text_series(s, categorical=False):
+    """Vectorized normalize_text: same result as s.apply(normalize_text).
+
+    Each distinct value is normalized once, so low-cardinality columns cost
+    little more than a factorize; category columns are normalized on their
+    categories alone (nulls become "" as in normalize_text). With
+    *categorical* the result is a category column.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return _normalize_codes(s.cat.codes.to_numpy(), s.cat.categories, s.index, s.name,
+                                categorical)
+    if categorical and s.dtype != object and not s.empty:
+        codes, uniques = pd.factorize(s)
+        return _normalize_codes(codes, uniques, s.index, s.name, True)
+
+    res = _per_unique(s, lambda u: u.str.strip().str.lower())
+    if s.empty:
+        # apply() keeps an empty column's dtype
+        out = s.apply(normalize_text)
+    elif res is not None:
+        out, na = res
+        out[na] = ""
+    elif s.dtype == object:
+        # mixed objects: 1 and 1.0 would share a factorize key
+        out = s.map(normalize_text).astype(object)
+    else:
+        codes, uniques = pd.factorize(s)
+        out = _normalize_codes(codes, uniques, s.index, s.name, False)
+    return out.astype("category") if categorical else out
+
 def normalize_dates(df, cols=("date_submitted", "date_cleared")):
-    """Standardize specified date columns to datetime.date."""
+    """Standardize specified date columns to datetime64 at day precision."""
     for c in cols:
         if c in df.columns:
-            df[c] = pd.to_datetime(df[c], errors="coerce").dt.date
+            df[c] = pd.to_datetime(df[c], errors="coerce").dt.normalize()
     return df
 
 def proper_case_status(df):
     """Ensure the 'status' column values use title case (e.g., 'Approved')."""
     if "status" in df.columns:
-        df["status"] = df["status"].astype(str).str.title()
+        res = _per_unique(df["status"], lambda u: u.str.title())
+        if res is None:
+            df["status"] = df["status"].astype(str).str.title()
+        else:
+            out, na = res
+            # nulls keep their astype(str) rendering ("Nan", "None")
+            out[na] = df["status"][na].astype(str).str.title()
+            df["status"] = out
     return df
 
 
 def build_row_id(df):
     """Create row_id using just Subject Name and Primary Position for clarity and stability."""
 
-    def safe(v):
-        return normalize_text(v) if pd.notna(v) else ""
-
     # Ensure required columns exist
     for col in ["subject name", "primary position"]:
         if col not in df.columns:
@@ -33,15 +92,18 @@ def build_row_id(df):
 
     # Build simple row ID
     row_ids = (
-        df["subject name"].apply(safe)
+        normalize_text_series(df["subject name"])
         + "_" +
-        df["primary position"].apply(safe)
+        normalize_text_series(df["primary position"])
     )
 
-    # Detect duplicates (optional safety check)
-    if row_ids.duplicated().any():
+    # Detect duplicates (optional safety check); every group is reported at once
+    dup = row_ids.duplicated(keep=False)
+    if dup.any():
         duplicates = row_ids[row_ids.duplicated()].unique()
-        raise ValueError(f"❌ Duplicate row_id(s) found: {list(duplicates)}")
+        groups = row_ids[dup].groupby(row_ids[dup], sort=False).groups
+        rows = {rid: list(groups[rid]) for rid in duplicates}
+        raise ValueError(f"❌ Duplicate row_id(s) found: {list(duplicates)} (rows: {rows})")
 
     return row_ids
 
@@ -0,0 +1,163 @@
+# scripts/watch_daemon.py
+"""
+Watch daemon
+------------
+Keeps one process alive that polls data/raw/ and runs the weekly
+clean -> history -> diff -> write steps for every new export, with the
+live frame, its row index and the last weekly snapshot held in memory.
+A cold `run_weekly_pipeline` pays for the imports and the live parse on
+every drop; here only the new file is read.
+
+• A file is picked up once its size/mtime are unchanged for one poll
+  (so half-copied exports are not read) and it is not yet processed
+  (same bookkeeping as --backlog; the week label comes from the name).
+• The in-memory live state is reloaded whenever the live file, its
+  journal or the SQLite store changes on disk (approvals, --auto-update,
+  compaction), so it never serves stale rows.
+• An export that fails (bad header, parse error, several exports for one
+  week) is moved to data/raw/failed/ with a <name>.error.txt next to it,
+  and the daemon keeps watching. Fix the file and move it back to retry.
+
+    python -m scripts.watch_daemon [--interval 1] [--auto-update] [--once]
+"""
+
+from pathlib import Path
+import argparse, time, traceback
+from scripts import run_weekly_pipeline as pipe
+from scripts import history_store, live_journal, row_index, schema
+
+
+def _stamp(path: Path):
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+def failed_dir() -> Path:
+    return pipe.RAW_DIR / "failed"
+
+def set_aside(raw: Path, error: str) -> Path:
+    """Move *raw* to data/raw/failed/ with the error next to it; returns its new path."""
+    out = failed_dir() / raw.name
+    out.parent.mkdir(exist_ok=True)
+    raw.replace(out)
+    out.with_name(out.name + ".error.txt").write_text(error)
+    print(f"❌ {raw.name} failed and was moved to {out.parent.name}/ ({error.strip().splitlines()[-1]})")
+    return out
+
+def _live_stamp() -> tuple:
+    src = pipe.live_source()
+    return str(src), _stamp(src), _stamp(live_journal.journal_path(src))
+
+
+class LiveState:
+    """Parsed live frame + row index, reloaded only when live changes on disk."""
+
+    def __init__(self):
+        self.stamp = None
+        self.df = self.index = None
+
+    def get(self):
+        stamp = _live_stamp()
+        if stamp != self.stamp:
+            self.df = pipe.load_live()
+            self.index = row_index.load(pipe.live_source()) or pipe.refresh_live_index()
+            self.stamp = _live_stamp()   # refresh_live_index may have written the index
+            print(f"📥 Live state loaded ({len(self.df)} rows).")
+        return self.df, self.index
+
+
+class Watcher:
+    def __init__(self, auto_update: bool = False, shards: int = 1, workers=None,
+                 compression: str | None = None):
+        self.auto_update, self.shards, self.workers = auto_update, shards, workers
+        self.compression = compression
+        self.live = LiveState()
+        self.last = None          # (week, frame) of the newest week processed here
+        self.seen = {}            # raw name -> stamp at the previous poll
+        self.waiting = False      # pending exports still being written
+
+    def _last_week(self, week: str):
+        prev = history_store.previous_week(week)
+        if prev is None:
+            return None
+        if self.last and self.last[0] == prev:
+            return self.last[1]
+        return schema.typed(history_store.load_week(prev))
+
+    def process(self, week: str, raw: Path) -> None:
+        t0 = time.perf_counter()
+        week_clean = pipe.clean_raw(src=raw, out=pipe.staging_path(week))
+        week_df = pipe._read_clean(week_clean)
+        history_store.add_week(week, week_df)
+
+        if not pipe.live_exists():
+            pipe.seed_live(week_df)
+        else:
+            live_df, live_idx = self.live.get()
+            outs = pipe.iter_week_diffs(week_df, live_df, live_idx, self._last_week(week),
+                                        shards=self.shards, workers=self.workers)
+            wide_dir, long_dir = pipe.write_diffs(week, outs, self.compression)
+            print(f"✅ {week}: diffs → {pipe.DIFF_WIDE.name}/{wide_dir.name}, "
+                  f"{pipe.DIFF_LONG.name}/{long_dir.name}")
+            if self.auto_update:
+                pipe.auto_update(week_df, week_clean.name)
+        pipe.mark_processed(raw, week)
+        if self.last is None or week >= self.last[0]:
+            self.last = (week, week_df)
+        print(f"⏱️  {raw.name} done in {time.perf_counter() - t0:.2f}s")
+
+    def poll(self) -> int:
+        """Process the settled, unprocessed raw exports; returns how many."""
+        now = {p.name: _stamp(p) for p in pipe.RAW_DIR.glob("*.csv")}
+        settled = {n for n, s in now.items() if self.seen.get(n) == s}
+        check = now != self.seen or self.waiting
+        self.seen = now
+        if not check:
+            return 0
+        todo = pipe.unprocessed_raw()
+        self.waiting = any(p.name not in settled for _, p in todo)
+        ready = [(w, p) for w, p in todo if p.name in settled]
+        clash = pipe.week_clashes(todo)
+        done = 0
+        for week, raw in ready:
+            if week in clash:
+                set_aside(raw, f"Several raw exports map to week {week}\n")
+                continue
+            try:
+                self.process(week, raw)
+                done += 1
+            except Exception:   # one bad export must not stop the daemon
+                set_aside(raw, traceback.format_exc())
+        return done
+
+    def run(self, interval: float = 1.0, once: bool = False) -> None:
+        pipe.ensure_dirs()
+        print(f"👀 Watching {pipe.RAW_DIR} (every {interval:g}s, Ctrl-C to stop)")
+        if pipe.live_exists():
+            self.live.get()
+        try:
+            while True:
+                self.poll()
+                if once and not self.waiting:
+                    return
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("👋 Watcher stopped.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process new raw exports as they land in data/raw/.")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls (default: 1)")
+    parser.add_argument("--auto-update", action="store_true",
+                        help="Apply each week's changes to live (see run_weekly_pipeline --auto-update)")
+    parser.add_argument("--once", action="store_true", help="Process what is pending, then exit")
+    parser.add_argument("--shards", type=int, default=1, help="Row_id-hash shards per diff")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --shards")
+    parser.add_argument("--diff-compression", choices=pipe.diff_store.COMPRESSIONS, default=None)
+    args = parser.parse_args()
+    Watcher(args.auto_update, args.shards, args.workers, args.diff_compression).run(args.interval, args.once)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,32 @@
 # tests/conftest.py
 import sys, pathlib
+import pytest
 
 # Add project root (one level up) to Python path so `import scripts...` works.
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
+
+# the raw export layout: a metadata row above the real header
+RAW_METADATA = "This information is for Offical Use Only" + "," * 14
+RAW_HEADER = ("Date Case Created,Case Status,Subject Name,Employee Type,Primary Position,"
+              "Sector,Region,Nominee Personal Email Address,Requestor Name,"
+              "CISA Nominator / Sponsor Email Address,Clearance Type,Clearance Status,"
+              "Date Suitability Decision,Suitability Decision,Date Clearance Completed")
+
+@pytest.fixture
+def raw_export():
+    """Write a raw export at *path* from its data lines; returns *path*."""
+    def write(path, lines):
+        path.write_text("\n".join([RAW_METADATA, RAW_HEADER, *lines]) + "\n")
+        return path
+    return write
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the stage cache (scripts/stage_cache.py) at a fresh directory under tmp_path."""
+    from scripts import stage_cache
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(stage_cache, "CACHE_DIR", cache)
+    monkeypatch.setattr(stage_cache, "FRAMES_DIR", cache / "frames")
+    monkeypatch.setattr(stage_cache, "MANIFEST", cache / "manifest.json")
+    return cache
@@ -0,0 +1,35 @@
+import json
+import pandas as pd
+import pytest
+from scripts.approval_rules import load_rules, evaluate
+
+DIFF = pd.DataFrame({
+    "row_id": ["a_p", "b_p", "c_p", "d_p"],
+    "change_type": ["value_changed", "value_changed", "removed_record", "value_changed"],
+    "changed_fields": ["date clearance completed", "date clearance completed, region", "", "region"],
+    "date clearance completed_old": [None, None, "2020-01-01", None],
+    "date clearance completed_new": ["2020-07-07 00:00:00", "2020-07-07", None, None],
+    "region_old": ["ca", "ca", "ca", "ca"],
+    "region_new": ["ca", "ny", None, "tx"],
+})
+
+def _rules(tmp_path, rules):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": rules}))
+    return load_rules(path)
+
+def test_first_matching_rule_wins(tmp_path):
+    rules = _rules(tmp_path, [
+        {"name": "date filled", "action": "approve", "change_type": "value_changed",
+         "changed_fields": ["date clearance completed"],
+         "fields": {"date clearance completed": {"old": "blank", "new": "date"}}},
+        {"name": "no texas", "action": "reject", "fields": {"region": {"new": {"equals": "tx"}}}},
+        {"action": "approve", "fields": {"region": {"new": {"in": ["ny", "tx"]}}}},
+    ])
+    decision, rule = evaluate(DIFF, rules)
+    assert decision.tolist() == ["approve", "approve", "queue", "reject"]
+    assert rule.tolist() == ["date filled", "rule 3", None, "no texas"]
+
+def test_unknown_predicate_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        _rules(tmp_path, [{"action": "approve", "fields": {"region": {"new": "sunny"}}}])
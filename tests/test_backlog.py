@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+import scripts.run_weekly_pipeline as pipeline
+from scripts import change_index, diff_store, history_store, live_db, live_journal, watch_daemon
+
+@pytest.fixture
+def sandbox(tmp_path, monkeypatch, cache_dir):
+    dirs = {k: tmp_path / k for k in ("raw", "staging", "wide", "long", "live", "cache", "store")}
+    for d in dirs.values():
+        d.mkdir()
+    for name, key in [("RAW_DIR", "raw"), ("STAGING_DIR", "staging"), ("HIST_DIR", "store"),
+                      ("DIFF_WIDE", "wide"), ("DIFF_LONG", "long")]:
+        monkeypatch.setattr(pipeline, name, dirs[key])
+    monkeypatch.setattr(pipeline, "PROCESSED_PATH", dirs["staging"] / "processed_raw.json")
+    monkeypatch.setattr(pipeline, "LIVE_PATH", dirs["live"] / "live.csv")
+    monkeypatch.setattr(live_db, "DB_PATH", dirs["live"] / "live.sqlite")
+    monkeypatch.setattr(change_index, "INDEX_PATH", dirs["cache"] / "change_index.sqlite")
+    monkeypatch.setattr(history_store, "STORE_DIR", dirs["store"])
+    return dirs
+
+@pytest.fixture
+def drop(sandbox, raw_export):
+    """Drop a weekly export for *week* into the sandbox raw dir, one row per status."""
+    def write(week, statuses):
+        raw_export(sandbox["raw"] / f"Stakeholder_Weekly_{week}.csv", [
+            f'5/5/2020,{st},"Miller, Sam {i}",Private Sector,Manager,Chemical,CA,'
+            f's{i}@nail.com,"Wolf, Kelly",kelly.w@c.com,Secret,Active,6/6/2020,Grant,'
+            for i, st in enumerate(statuses)])
+    return write
+
+def test_backlog_runs_weeks_in_order(sandbox, drop):
+    drop("2025-07-19", ["Open", "Closed", "Open"])
+    drop("2025-07-05", ["Open", "Open", "Open"])
+    drop("2025-07-12", ["Open", "Closed"])
+    assert [w for w, _ in pipeline.pending_raw()] == ["2025-07-05", "2025-07-12", "2025-07-19"]
+
+    assert pipeline.run_backlog(workers=2) == ["2025-07-05", "2025-07-12", "2025-07-19"]
+    assert pipeline.pending_raw() == []
+    assert history_store.weeks() == ["2025-07-05", "2025-07-12", "2025-07-19"]
+
+    # first week seeds live; later weeks diff against live and the week before
+    assert not (sandbox["wide"] / "Changes_2025-07-05").exists()
+    ww = diff_store.read(sandbox["long"] / "ChangesLong_2025-07-19", tag="week_to_week")
+    assert set(ww["row_id"]) == {"miller, sam 2_manager"}
+    assert (ww["tag"] == "week_to_week").all()
+
+def test_backlog_rejects_two_drops_for_one_week(sandbox, drop):
+    drop("2025-07-05", ["Open"])
+    (sandbox["raw"] / "Stakeholder_Weekly_2025-07-05.csv").rename(
+        sandbox["raw"] / "A_2025-07-05.csv")
+    drop("2025-07-05", ["Closed"])
+    with pytest.raises(ValueError, match="same week"):
+        pipeline.pending_raw()
+
+def test_watcher_processes_settled_drops(sandbox, drop):
+    watcher = watch_daemon.Watcher()
+    drop("2025-07-05", ["Open", "Open", "Open"])
+    assert watcher.poll() == 0          # just appeared: may still be copying
+    assert watcher.poll() == 1          # seeds live
+    drop("2025-07-12", ["Open", "Closed"])
+    assert watcher.poll() == 0
+    assert watcher.poll() == 1
+    assert watcher.poll() == 0 and pipeline.pending_raw() == []
+
+    ww = diff_store.read(sandbox["long"] / "ChangesLong_2025-07-12", tag="week_to_week")
+    assert set(ww["row_id"]) == {"miller, sam 1_manager", "miller, sam 2_manager"}
+
+    # the in-memory live frame follows changes made on disk
+    assert len(watcher.live.get()[0]) == 3
+    live_journal.append(pipeline.LIVE_PATH, [live_journal.remove_op("miller, sam 0_manager")],
+                        source="unit")
+    assert len(watcher.live.get()[0]) == 2
+
+def test_single_run_labels_by_export_date(sandbox, drop):
+    drop("2025-07-05", ["Open", "Open", "Open"])
+    pipeline.run(pipeline.parser.parse_args(["--no-cache"]))     # seeds live
+    drop("2025-07-12", ["Open", "Closed"])
+    pipeline.run(pipeline.parser.parse_args(["--no-cache"]))
+    assert history_store.weeks() == ["2025-07-05", "2025-07-12"]
+    assert diff_store.latest(sandbox["wide"], "Changes_") == sandbox["wide"] / "Changes_2025-07-12"
+    assert pipeline.pending_raw() == []
+
+    # a re-export for a stored week is still pending: only processed digests count
+    drop("2025-07-12", ["Open", "Closed", "Closed"])
+    assert [w for w, _ in pipeline.pending_raw()] == ["2025-07-12"]
+
+def test_diff_cache_follows_output_options(sandbox, drop):
+    drop("2025-07-05", ["Open", "Open"])
+    pipeline.run(pipeline.parser.parse_args([]))                 # seeds live
+    drop("2025-07-12", ["Open", "Closed"])
+    parts = lambda: sorted(p.name for p in (sandbox["wide"] / "Changes_2025-07-12").rglob("*.csv*"))
+    pipeline.run(pipeline.parser.parse_args(["--diff-compression", "gzip"]))
+    assert parts() and all(n.endswith(".csv.gz") for n in parts())
+    pipeline.run(pipeline.parser.parse_args(["--diff-compression", "none"]))
+    assert parts() and all(n.endswith(".csv") for n in parts())
+
+def test_watcher_sets_bad_drops_aside(sandbox, drop):
+    watcher = watch_daemon.Watcher()
+    (sandbox["raw"] / "Stakeholder_Weekly_2025-07-05.csv").write_text("not,a,stakeholder,export\n1,2,3,4\n")
+    drop("2025-07-12", ["Open"])
+    (sandbox["raw"] / "Stakeholder_Weekly_2025-07-12.csv").rename(sandbox["raw"] / "A_2025-07-12.csv")
+    drop("2025-07-12", ["Closed"])
+    drop("2025-07-19", ["Open", "Open"])
+    assert watcher.poll() == 0
+    assert watcher.poll() == 1          # only the good export; the daemon keeps going
+    failed = sandbox["raw"] / "failed"
+    assert sorted(p.name for p in failed.glob("*.csv")) == [
+        "A_2025-07-12.csv", "Stakeholder_Weekly_2025-07-05.csv", "Stakeholder_Weekly_2025-07-12.csv"]
+    assert (failed / "Stakeholder_Weekly_2025-07-05.csv.error.txt").read_text()
+    assert history_store.weeks() == ["2025-07-19"]
+    assert watcher.poll() == 0 and pipeline.unprocessed_raw() == []
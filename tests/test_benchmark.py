@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scripts import benchmark
+from scripts.run_weekly_pipeline import EXPECTED_COLS, _clean_columns, clean_raw
+
+def test_generated_export_matches_real_schema(tmp_path):
+    raw = benchmark.write_raw(tmp_path / "raw.csv", 120, seed=3)
+    assert raw.read_text().splitlines()[0].startswith("This information is for Offical Use Only")
+    df = pd.read_csv(raw, skiprows=1)
+    assert set(_clean_columns(df.columns)) == EXPECTED_COLS
+    assert len(df) == 120 and df["Subject Name"].is_unique
+    assert clean_raw(src=raw, out=tmp_path / "clean.csv").exists()
+
+def test_generator_is_seeded_and_churns(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark, "BLOCK", 50)
+    a = benchmark.write_raw(tmp_path / "a.csv", 400, seed=1).read_text()
+    assert a == benchmark.write_raw(tmp_path / "b.csv", 400, seed=1).read_text()
+
+    live = pd.read_csv(tmp_path / "a.csv", skiprows=1).set_index("Subject Name")
+    week = pd.read_csv(benchmark.write_raw(tmp_path / "w.csv", 400, seed=1, churn=0.2),
+                       skiprows=1).set_index("Subject Name")
+    kept = live.index.intersection(week.index)
+    assert 0 < len(live) - len(kept) < 80            # ~10% dropped
+    assert len(week.index.difference(live.index)) == 40
+    changed = (live.loc[kept, "Case Status"] != week.loc[kept, "Case Status"]).sum()
+    assert 0 < changed < 80
+
+def test_compare_flags_regressions():
+    base = {"results": [{"size": "10k", "stage": "diff", "wall_s": 1.0, "peak_rss_mb": 100.0},
+                        {"size": "10k", "stage": "read", "wall_s": 0.01, "peak_rss_mb": 100.0}]}
+    cur = {"results": [{"size": "10k", "stage": "diff", "wall_s": 1.5, "peak_rss_mb": 100.0},
+                       {"size": "10k", "stage": "read", "wall_s": 0.03, "peak_rss_mb": 100.0}]}
+    assert [f["stage"] for f in benchmark.compare(cur, base)] == ["diff"]
+
+def test_peak_is_measured_from_the_reset():
+    big = np.ones(20_000_000)                        # ~160 MB, like a setup step
+    del big
+    lifetime = benchmark._peak_mb(False)
+    if not benchmark._reset_peak():
+        pytest.skip("no /proc/self/clear_refs here")
+    assert benchmark._peak_mb(True) < lifetime - 100
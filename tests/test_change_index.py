@@ -0,0 +1,40 @@
+import pandas as pd
+from scripts import change_index, diff_store
+from scripts.run_weekly_pipeline import diff_frames
+
+def _rows(names, status):
+    return pd.DataFrame({"subject name": names, "primary position": "P", "case status": status})
+
+def _week(long_dir, wide_dir, week, old, new):
+    wide, long = diff_frames(old, new, "weekly_vs_live")
+    with diff_store.DiffWriter(wide_dir / f"Changes_{week}", long_dir / f"ChangesLong_{week}", "gzip") as w:
+        w.write("weekly_vs_live", wide, long)
+    return wide
+
+def test_timeline_is_indexed_incrementally(tmp_path):
+    long_dir, wide_dir, approved = tmp_path / "long", tmp_path / "wide", tmp_path / "approved"
+    approved.mkdir()
+    db = tmp_path / "index.sqlite"
+    kw = dict(db=db, long_dir=long_dir, approved_dir=approved)
+
+    _week(long_dir, wide_dir, "2025-07-05", _rows(["A", "B"], "open"), _rows(["A", "B"], ["open", "closed"]))
+    wide = _week(long_dir, wide_dir, "2025-07-12", _rows(["A", "B"], ["open", "closed"]),
+                 _rows(["B", "C"], ["pending", "open"]))
+    wide.assign(approved_by="kelly", rule="rule 1").to_csv(
+        approved / "Approved_Changes_2025-07-13.csv", index=False)
+
+    assert change_index.update(**kw) > 0
+    assert change_index.update(**kw) == 0          # nothing new on disk
+
+    tl = change_index.timeline("b_p", "case status", db)
+    assert tl[["date", "source", "old", "new"]].values.tolist() == [
+        ["2025-07-05", "diff", "open", "closed"],
+        ["2025-07-12", "diff", "closed", "pending"],
+        ["2025-07-13", "approved", "closed", "pending"]]
+    assert tl["approved_by"].iloc[-1] == "kelly"
+    assert change_index.timeline("c_p", db=db)["field"].tolist() == ["_row", "_row"]
+
+    # a deleted source drops out of the index
+    (approved / "Approved_Changes_2025-07-13.csv").unlink()
+    change_index.update(**kw)
+    assert change_index.timeline("b_p", "case status", db)["source"].tolist() == ["diff", "diff"]
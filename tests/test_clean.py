@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+import scripts.run_weekly_pipeline as pipeline
+
+@pytest.fixture
+def make_raw(tmp_path, raw_export):
+    def make(n):
+        raw = tmp_path / "raw"; raw.mkdir()
+        lines = []
+        for i in range(n):
+            done = "" if i % 3 else f"7/{i % 28 + 1}/2020"
+            lines.append(f'5/5/2020,Completed,"Miller, Sam {i}",Private Sector,Manager,'
+                         f'Chemical,CA,s{i}@nail.com,"Wolf, Kelly",kelly.w@c.com,Secret,'
+                         f'Active,6/6/2020,Grant,{done}')
+            if i % 7 == 0:
+                lines.append("," * 14)
+        raw_export(raw / "Stakeholder_Weekly.csv", lines)
+        return raw
+    return make
+
+def test_chunked_clean_matches_single_pass(tmp_path, monkeypatch, make_raw):
+    monkeypatch.setattr(pipeline, "RAW_DIR", make_raw(50))
+    monkeypatch.setattr(pipeline, "STAGING_DIR", tmp_path)
+
+    whole = pipeline.clean_raw().read_bytes()
+    for size in (1, 7, 1000):
+        assert pipeline.clean_raw(chunksize=size).read_bytes() == whole
+
+def test_chunked_clean_rejects_bad_header(tmp_path, monkeypatch, make_raw):
+    raw = make_raw(3)
+    f = raw / "Stakeholder_Weekly.csv"
+    f.write_text(f.read_text().replace("Sector,", "Sectr,"))
+    monkeypatch.setattr(pipeline, "RAW_DIR", raw)
+    monkeypatch.setattr(pipeline, "STAGING_DIR", tmp_path)
+    try:
+        pipeline.clean_raw(chunksize=2)
+    except ValueError as e:
+        assert "sector" in str(e)
+    else:
+        raise AssertionError("missing column not detected")
+
+def test_header_is_sniffed_and_extras_dropped(tmp_path, monkeypatch, make_raw):
+    raw = make_raw(4)
+    f = raw / "Stakeholder_Weekly.csv"
+    meta, header, *body = f.read_text().splitlines()
+    # two metadata lines and an extra column
+    f.write_text("\n".join([meta, "Exported 2025-07-19" + "," * 15, header + ",Notes"]
+                           + [line + ",x" for line in body]) + "\n")
+    monkeypatch.setattr(pipeline, "RAW_DIR", raw)
+    monkeypatch.setattr(pipeline, "STAGING_DIR", tmp_path)
+
+    df = pd.read_csv(pipeline.clean_raw())
+    assert list(df.columns) == pipeline.CMP_COLS
+    assert df["date case created"].tolist() == ["2020-05-05"] * 4
@@ -1,5 +1,7 @@
 import pandas as pd
-from scripts.run_weekly_pipeline import diff_frames, normalize_dates
+from scripts.run_weekly_pipeline import diff_frames, normalize_dates, refresh_live_index, week_diffs
+from scripts import row_index, live_journal
+import scripts.run_weekly_pipeline as pipeline
 
 def _df(rows):
     return pd.DataFrame(rows)
@@ -40,3 +42,111 @@ def test_date_time_vs_date():
     new = normalize_dates(new, ["date_cleared"])
     wide, long = diff_frames(old, new, tag="unit")
     assert wide.empty
+
+def test_multi_field_change_order():
+    old = _df([
+        {"subject name":"A","primary position":"P","case status":"open","region":"CA"},
+        {"subject name":"B","primary position":"P","case status":"open","region":"NY"},
+        {"subject name":"C","primary position":"P","case status":"open","region":"TX"},
+    ])
+    new = _df([
+        {"subject name":"B","primary position":"P","case status":"closed","region":"WA"},
+        {"subject name":"A","primary position":"P","case status":"open","region":"CA"},
+        {"subject name":"D","primary position":"P","case status":"open","region":"TX"},
+    ])
+    wide, long = diff_frames(old, new, tag="unit")
+    assert list(wide["change_type"]) == ["new_record", "removed_record", "value_changed"]
+    assert wide.loc[2, "changed_fields"] == "case status, region"
+    assert list(zip(long["row_id"], long["field"])) == [
+        ("b_p", "case status"),
+        ("b_p", "region"),
+        ("c_p", "_row"),
+        ("d_p", "_row"),
+    ]
+    assert (long["tag"] == "unit").all()
+
+def test_row_index_diff_matches_full_diff(tmp_path, cache_dir):
+    live_path = tmp_path / "live.csv"
+    rows = [{"subject name": f"S{i}", "primary position": "P", "case status": "Open",
+             "region": "CA", "date case created": f"2020-05-{i + 1:02d}",
+             "date suitability decision": None, "date clearance completed": None}
+            for i in range(20)]
+    _df(rows).to_csv(live_path, index=False)
+    idx = refresh_live_index(live_path)
+    live = pd.read_csv(live_path, parse_dates=["date case created", "date suitability decision",
+                                               "date clearance completed"])
+
+    week = live.copy()
+    week.loc[3, "case status"] = "Closed"
+    week.loc[7, "date case created"] = pd.Timestamp("2021-01-01")
+    week = pd.concat([week.drop(index=11), _df([{**rows[0], "subject name": "New"}])])
+
+    full = diff_frames(live.copy(), week.copy(), "unit")
+    fast = diff_frames(live.copy(), week.copy(), "unit", old_index=idx)
+    for a, b in zip(full, fast):
+        pd.testing.assert_frame_equal(a, b)
+    assert sorted(fast[0]["change_type"]) == ["new_record", "removed_record",
+                                              "value_changed", "value_changed"]
+
+    live_path.write_text(live_path.read_text() + "\n")
+    assert row_index.load(live_path) is None
+
+def test_live_delta_writes_case_and_spacing_fixes(tmp_path, cache_dir):
+    live_path = tmp_path / "live.csv"
+    _df([{"subject name": f"Person {i}", "primary position": "P", "case status": "Open",
+          "region": "CA", "date case created": f"2020-05-{i + 1:02d}", "date clearance completed": None}
+         for i in range(10)]).to_csv(live_path, index=False)
+    idx = refresh_live_index(live_path)
+    live = pipeline.load_live(live_path)
+    assert pipeline.live_delta(live, idx) == []
+
+    week = live.copy()
+    week["subject name"] = week["subject name"].astype(object)
+    week.loc[3, "subject name"] = "person 3"          # same row_id, different case
+    week.loc[5, "subject name"] = "Person 5 "
+    ops = pipeline.live_delta(week, idx)
+    assert [(op["op"], op["row_id"]) for op in ops] == [("update", "person 3_p"), ("update", "person 5_p")]
+
+    live_journal.append(live_path, ops, source="unit")
+    idx = pipeline.update_live_index(idx, ops, live_path)
+    assert pipeline.load_live(live_path)["subject name"][3] == "person 3"
+    assert pipeline.live_delta(week, idx) == []
+
+def test_sharded_week_diffs_match_serial():
+    live = _df([{"subject name": f"S{i}", "primary position": "P", "case status": "open",
+                 "region": "CA"} for i in range(30)])
+    week = live.copy()
+    week.loc[[2, 9, 17], "case status"] = "closed"
+    week = pd.concat([week.drop(index=[4, 21]), _df([{**live.iloc[0], "subject name": "New"}])])
+    last = live.drop(index=[5]).assign(region="NY")
+
+    serial = week_diffs(week, live, None, last)
+    for shards in (2, 5):
+        for a, b in zip(serial, week_diffs(week, live, None, last, shards=shards, workers=2)):
+            pd.testing.assert_frame_equal(a, b)
+
+def _people(names, position="P"):
+    return _df([{"subject name": n, "primary position": position, "case status": "open",
+                 "region": "CA", "nominee personal email address": f"{n.split()[0]}@x.com",
+                 "sector": "Energy"} for n in names])
+
+def test_renamed_row_is_linked():
+    old = _people(["Emily Wang", "Alice Chen", "Bob Stone"])
+    new = _people(["Emily Wangd", "Alice Chen", "Rob Stein"])
+    wide, long = diff_frames(old, new, tag="unit")
+    assert list(wide["change_type"]) == ["new_record", "removed_record", "value_changed"]
+    linked = wide.iloc[2]
+    assert (linked["row_id"], linked["matched_row_id"]) == ("emily wangd_p", "emily wang_p")
+    assert linked["changed_fields"] == "subject name"
+    assert 0.9 <= linked["match_confidence"] <= 1
+    assert list(zip(long["row_id"], long["field"])) == [
+        ("bob stone_p", "_row"), ("emily wangd_p", "subject name"), ("rob stein_p", "_row")]
+
+def test_sharded_linking_matches_serial():
+    names = [f"Person {chr(65 + i)}{chr(75 + i)}x" for i in range(12)]
+    old, new = _people(names), _people(names)
+    new.loc[[1, 6], "subject name"] = ["Persn BLx", "Person GQxx"]
+    serial = diff_frames(old.copy(), new.copy(), "weekly_vs_live")
+    assert serial[0]["matched_row_id"].notna().sum() == 2
+    for a, b in zip(serial, week_diffs(new, old, None, shards=3, workers=2)):
+        pd.testing.assert_frame_equal(a, b)
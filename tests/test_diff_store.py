@@ -0,0 +1,49 @@
+import io
+import pandas as pd
+import pytest
+from scripts import diff_store
+from scripts.run_weekly_pipeline import diff_frames
+
+def _rows(names, status):
+    return pd.DataFrame({"subject name": names, "primary position": "P", "case status": status})
+
+def test_partitions_round_trip(tmp_path):
+    old = _rows(["A", "B", "C"], "open")
+    new = _rows(["A", "B", "Dee"], ["open", "closed", "open"])
+    wide, long = diff_frames(old, new, "weekly_vs_live")
+    ww_wide, ww_long = diff_frames(old.iloc[:2].copy(), new, "week_to_week")
+
+    for comp in ("gzip", "none"):
+        w_dir, l_dir = tmp_path / comp / "Changes_2025-07-19", tmp_path / comp / "ChangesLong_2025-07-19"
+        with diff_store.DiffWriter(w_dir, l_dir, comp) as writer:
+            writer.write("weekly_vs_live", wide, long)
+            writer.write("week_to_week", ww_wide, ww_long)
+
+        assert [(p["tag"], p["change_type"]) for p in diff_store.partitions(w_dir)] == [
+            ("weekly_vs_live", "new_record"), ("weekly_vs_live", "removed_record"),
+            ("weekly_vs_live", "value_changed"), ("week_to_week", "new_record"),
+            ("week_to_week", "value_changed")]
+        pd.testing.assert_frame_equal(diff_store.read(w_dir, "weekly_vs_live"),
+                                      pd.read_csv(io.StringIO(wide.to_csv(index=False))))
+        changed = diff_store.read(w_dir, change_type="value_changed")
+        assert changed["row_id"].tolist() == ["b_p", "b_p"]
+        assert diff_store.read(l_dir, "week_to_week", "new_record")["row_id"].tolist() == ["dee_p"]
+        assert diff_store.latest(tmp_path / comp, "Changes_") == w_dir
+
+def test_failed_write_keeps_previous_set(tmp_path):
+    old, new = _rows(["A", "B"], "open"), _rows(["A", "Cee"], "open")
+    wide, long = diff_frames(old, new, "weekly_vs_live")
+    w_dir, l_dir = tmp_path / "Changes_2025-07-19", tmp_path / "ChangesLong_2025-07-19"
+    with diff_store.DiffWriter(w_dir, l_dir, "gzip") as writer:
+        writer.write("weekly_vs_live", wide, long)
+    before = diff_store.partitions(w_dir)
+
+    def outs():
+        yield "weekly_vs_live", wide.iloc[:1], long.iloc[:1]
+        raise RuntimeError("export broke mid-diff")
+    with pytest.raises(RuntimeError), diff_store.DiffWriter(w_dir, l_dir, "gzip") as writer:
+        for tag, w, l in outs():
+            writer.write(tag, w, l)
+    assert diff_store.partitions(w_dir) == before
+    assert diff_store.latest(tmp_path, "Changes_") == w_dir
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["ChangesLong_2025-07-19", "Changes_2025-07-19"]
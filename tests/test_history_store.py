@@ -0,0 +1,49 @@
+import pandas as pd
+from scripts import history_store as hs
+
+def _week(statuses, names=("A", "B", "C")):
+    return pd.DataFrame({
+        "subject name": list(names),
+        "primary position": ["P"] * len(names),
+        "case status": statuses,
+        "date case created": pd.to_datetime(["2020-05-05"] * len(names)),
+    })
+
+def _same(a, b):
+    key = ["subject name", "primary position"]
+    pd.testing.assert_frame_equal(a.sort_values(key).reset_index(drop=True),
+                                  b.sort_values(key).reset_index(drop=True))
+
+def test_as_of_reconstructs_each_week(tmp_path, monkeypatch):
+    monkeypatch.setattr(hs, "KEYFRAME_EVERY", 2)
+    w1 = _week(["Open", "Open", "Open"])
+    w2 = _week(["Open", "Closed", "Open"])
+    w3 = _week(["Open", "Closed", "Open", "Open"], names=("A", "B", "D", "E"))
+    for label, df in [("2025-07-05", w1), ("2025-07-12", w2), ("2025-07-19", w3)]:
+        assert hs.add_week(label, df, tmp_path)
+    assert not hs.add_week("2025-07-19", w3, tmp_path)   # unchanged re-run is a no-op
+
+    _same(hs.as_of("2025-07-11", tmp_path), w1)
+    _same(hs.as_of("2025-07-12", tmp_path), w2)
+    _same(hs.as_of("2026-01-01", tmp_path), w3)
+    assert [w["kind"] for w in hs._load(tmp_path)] == ["full", "delta", "full"]
+
+def test_out_of_order_week_keeps_later_weeks(tmp_path):
+    w1, w2, w3 = _week(["Open"] * 3), _week(["Closed"] * 3), _week(["Open", "Closed", "Open"])
+    hs.add_week("2025-07-05", w1, tmp_path)
+    hs.add_week("2025-07-19", w3, tmp_path)
+    hs.add_week("2025-07-12", w2, tmp_path)
+    assert hs.weeks(tmp_path) == ["2025-07-05", "2025-07-12", "2025-07-19"]
+    _same(hs.load_week("2025-07-12", tmp_path), w2)
+    _same(hs.load_week("2025-07-19", tmp_path), w3)
+
+def test_timeline(tmp_path):
+    hs.add_week("2025-07-05", _week(["Open", "Open", "Open"]), tmp_path)
+    hs.add_week("2025-07-12", _week(["Open", "Closed", "Open"]), tmp_path)
+    hs.add_week("2025-07-19", _week(["Open", "Closed"], names=("A", "C")), tmp_path)
+
+    t = hs.timeline("b_p", tmp_path)
+    assert t["week"].tolist() == ["2025-07-05", "2025-07-12", "2025-07-19"]
+    assert t["op"].tolist() == ["added", "changed", "removed"]
+    assert t["case status"].tolist()[:2] == ["Open", "Closed"]
+    assert hs.timeline("a_p", tmp_path)["op"].tolist() == ["added"]
@@ -0,0 +1,27 @@
+import json
+from pathlib import Path
+import numpy as np
+from scripts import instrument
+
+def test_stages_are_noops_without_report():
+    with instrument.stage("anything", rows_in=5) as st:
+        st.rows_out = 3
+    assert instrument.finish(Path("unused.json")) is None
+
+def test_nested_stages_and_report(tmp_path):
+    instrument.start("unit", trace_memory=True, args={"flag": True})
+    with instrument.stage("outer", rows_in=1000) as st:
+        with instrument.stage("inner") as inner:
+            buf = np.ones(2_000_000)      # ~15 MB traced inside "inner"
+            inner.rows_out = len(buf)
+        del buf
+        st.rows_out = 10
+    path = instrument.finish(tmp_path / "report.json")
+
+    report = json.loads(path.read_text())
+    assert report["command"] == "unit" and report["args"] == {"flag": True}
+    outer, inner = report["stages"]
+    assert (outer["stage"], inner["stage"]) == ("outer", "outer.inner")
+    assert outer["rows_in"] == 1000 and outer["rows_out"] == 10 and outer["rows_per_s"] > 0
+    assert inner["traced_peak_mb"] >= 15 and outer["traced_peak_mb"] >= inner["traced_peak_mb"]
+    assert outer["wall_s"] >= inner["wall_s"]
@@ -0,0 +1,27 @@
+import pandas as pd
+from scripts import live_aggregates as la
+from scripts import live_journal as lj
+
+def _live():
+    return pd.DataFrame({
+        "row_id": ["a_p", "b_p", "c_p"],
+        "sector": ["Energy", "Energy", None],
+        "case status": ["Open", "Open", "Closed"],
+        "date case created": ["2020-05-01", "2020-05-01", "2020-05-01"],
+        "date clearance completed": [None, "2020-05-11", "2020-05-31"],
+    })
+
+def test_apply_matches_rebuild(tmp_path):
+    path = tmp_path / "live.csv"
+    live = _live()
+    ops = [lj.update_op("a_p", {"case status": "Closed", "date clearance completed": "2020-05-21"}),
+           lj.remove_op("b_p"),
+           lj.insert_op("d_p", {"sector": "Water", "case status": "Open"})]
+    assert not la.apply(path, live.iloc[:2], ops)      # no store yet: left to a rebuild
+
+    la.rebuild(path, live)
+    assert la.apply(path, live.iloc[:2], ops)          # only the touched rows
+    store = la.load(path)
+    assert {k: store[k] for k in ("rows", "counts", "days_to_clear")} == la.tally(lj.fold(live, ops))
+    assert store["counts"]["sector"] == {"Energy": 1, "Water": 1, la.BLANK: 1}
+    assert la.time_to_clear(store) == {"cleared": 2, "mean": 25.0, "median": 20, "p90": 30}
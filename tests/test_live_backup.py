@@ -0,0 +1,36 @@
+import os
+from datetime import datetime
+from scripts import live_backup as lb
+
+def _write(path, rows):
+    path.write_text("subject name,case status\n" + "".join(f"person {i},{s}\n" for i, s in rows))
+
+def test_snapshots_dedupe_restore_and_verify(tmp_path, monkeypatch):
+    monkeypatch.setattr(lb, "MIN_CHUNK", 256)
+    monkeypatch.setattr(lb, "CUT_MASK", 0x7)
+    live = tmp_path / "live.csv"
+    _write(live, [(i, "Open") for i in range(2000)])
+    original = live.read_bytes()
+    first = lb.backup([live, tmp_path / "live.journal.jsonl"], "unit")   # no journal yet
+    assert [f["name"] for f in lb.read_snapshot(first)["files"]] == ["live.csv"]
+
+    _write(live, [(i, "Closed" if i == 700 else "Open") for i in range(2000)])
+    second = lb.backup([live], "unit")
+    new = lb.read_snapshot(second)["files"][0]["new_bytes"]
+    assert 0 < new < len(original) / 20           # only the chunk around row 700
+    assert lb.read_snapshot(lb.backup([live], "unit"))["files"][0]["new_bytes"] == 0
+
+    out = lb.restore(lb.find(live.parent / "backups", lb.snapshot_time(first)), tmp_path / "r")
+    assert out[0].read_bytes() == original
+    assert lb.verify(live.parent / "backups") == []
+
+    chunk = next((live.parent / "backups" / "chunks").glob("*/*.gz"))
+    chunk.write_bytes(b"garbage")
+    assert lb.verify(live.parent / "backups")
+
+def test_retention_keeps_recent_daily_and_weekly(tmp_path):
+    names = [datetime(2025, 7, d, h) for d in range(1, 29) for h in (9, 17)]
+    manifests = [tmp_path / f"{t.strftime(lb.TIME_FMT)}_unit.json" for t in names]
+    kept = sorted(lb.snapshot_time(m) for m in lb.keep(manifests, last=3, daily=2, weekly=3))
+    assert kept == [datetime(2025, 7, 20, 17), datetime(2025, 7, 27, 17), datetime(2025, 7, 28, 9),
+                    datetime(2025, 7, 28, 17)]
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from scripts import live_db, live_journal as lj
+
+def _live(tmp_path):
+    path = tmp_path / "live.csv"
+    pd.DataFrame({
+        "subject name": ["A", "B", "C"],
+        "primary position": ["P", "P", "P"],
+        "case status": ["Open", "Open", "Closed"],
+        "date case created": ["2020-05-05", "2020-05-06", "2020-05-07"],
+    }).to_csv(path, index=False)
+    return path
+
+def test_apply_matches_journal_fold(tmp_path):
+    path, db = _live(tmp_path), tmp_path / "live.sqlite"
+    lj.append(path, [lj.update_op("c_p", {"case status": "Reopened"})], source="unit")
+    assert live_db.import_live(path, db) == 3
+
+    ops = [
+        lj.update_op("a_p", {"case status": "Closed"}),
+        lj.remove_op("b_p"),
+        lj.insert_op("d_p", {"subject name": "D", "primary position": "P",
+                             "date case created": pd.Timestamp("2021-01-01")}),
+        lj.update_op("a_p", {"date case created": "2020-06-01", "region": "CA"}),
+    ]
+    assert live_db.apply(ops, source="unit", db=db) == 4
+    lj.append(path, ops, source="unit")
+
+    expected = lj.read_live(path, dtype=str).reset_index(drop=True).fillna(np.nan)
+    pd.testing.assert_frame_equal(live_db.read_all(db), expected, check_like=True)
+    assert live_db.existing_ids(["a_p", "b_p", "x_p"], db) == {"a_p"}
+    assert live_db.lookup(["d_p"], db)["date case created"].tolist() == ["2021-01-01"]
+
+    out = live_db.export_csv(tmp_path / "export.csv", db)
+    assert pd.read_csv(out)["subject name"].tolist() == ["A", "C", "D"]
+
+def test_index_follows_ops_incrementally(tmp_path, monkeypatch, cache_dir):
+    from scripts import row_index
+    import scripts.run_weekly_pipeline as pipeline
+    db = tmp_path / "live.sqlite"
+    live_db.import_live(_live(tmp_path), db)
+    idx = pipeline.refresh_live_index(db)
+
+    ops = [lj.remove_op("a_p"),
+           lj.insert_op("d_p", {"subject name": "D", "primary position": "P", "case status": "Open"}),
+           lj.update_op("c_p", {"case status": "Open", "date case created": "2020-06-01"}),
+           lj.insert_op("a_p", {"subject name": "A", "primary position": "P", "case status": "New"}),
+           lj.remove_op("x_p")]
+    live_db.apply(ops, source="unit", db=db)
+    with monkeypatch.context() as m:
+        m.setattr(pipeline, "load_live", None)        # no full read of live
+        got = pipeline.update_live_index(idx, ops, db)
+    full = pipeline.refresh_live_index(db)
+    assert got["row_id"].tolist() == full["row_id"].tolist() == ["b_p", "c_p", "d_p", "a_p"]
+    assert got["hash"].tolist() == full["hash"].tolist()
+    assert row_index.load(db) is not None
+
+def test_import_and_approvals_keep_aggregates(tmp_path, monkeypatch, cache_dir):
+    from scripts import live_aggregates
+    import scripts.run_weekly_pipeline as pipeline
+    db = tmp_path / "live.sqlite"
+    monkeypatch.setattr(live_db, "DB_PATH", db)
+    live_db.import_live(_live(tmp_path), db)
+    assert live_aggregates.exists(db)
+
+    def matches_rebuild():
+        stored = live_aggregates.load(db)
+        stored.pop("updated")
+        return stored == live_aggregates.tally(pipeline.load_live(db))
+
+    pipeline.apply_live_ops([lj.update_op("c_p", {"case status": "Open"}), lj.remove_op("a_p"),
+                             lj.insert_op("d_p", {"subject name": "D", "primary position": "P",
+                                                  "case status": "New"})], "unit")
+    assert matches_rebuild() and live_aggregates.load(db)["rows"] == 3
+
+    live_aggregates.store_path(db).unlink()            # a store without aggregates gets them back
+    pipeline.apply_live_ops([lj.update_op("b_p", {"case status": "Closed"})], "unit")
+    assert matches_rebuild()
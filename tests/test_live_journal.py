@@ -0,0 +1,85 @@
+import pandas as pd
+from scripts import live_journal as lj
+
+def _live(tmp_path):
+    path = tmp_path / "live.csv"
+    pd.DataFrame({
+        "subject name": ["A", "B", "C"],
+        "primary position": ["P", "P", "P"],
+        "case status": ["Open", "Open", "Closed"],
+        "date case created": ["2020-05-05", "2020-05-06", "2020-05-07"],
+    }).to_csv(path, index=False)
+    return path
+
+def test_read_live_folds_journal(tmp_path):
+    path = _live(tmp_path)
+    lj.append(path, [
+        lj.update_op("a_p", {"case status": "Closed"}),
+        lj.remove_op("b_p"),
+        lj.insert_op("d_p", {"subject name": "D", "primary position": "P",
+                             "date case created": pd.Timestamp("2021-01-01")}),
+        lj.update_op("a_p", {"date case created": "2020-06-01"}),
+    ], source="unit")
+    lj.append(path, [lj.insert_op("b_p", {"subject name": "B", "primary position": "P"})], source="unit")
+
+    live = lj.read_live(path, parse_dates=["date case created"])
+    assert live["subject name"].tolist() == ["A", "C", "D", "B"]
+    assert live["case status"].tolist()[:2] == ["Closed", "Closed"]
+    assert live["date case created"].tolist()[:3] == [pd.Timestamp("2020-06-01"),
+                                                      pd.Timestamp("2020-05-07"),
+                                                      pd.Timestamp("2021-01-01")]
+    assert pd.isna(live["case status"].iloc[3])
+
+def test_compact_folds_and_archives(tmp_path):
+    path = _live(tmp_path)
+    lj.append(path, [lj.update_op("c_p", {"case status": "Reopened"}), lj.remove_op("a_p")],
+              source="unit")
+    before = lj.read_live(path)
+
+    assert lj.compact(path) is not None
+    assert lj.pending(path) == 0
+    pd.testing.assert_frame_equal(lj.read_live(path).reset_index(drop=True),
+                                  before.reset_index(drop=True))
+    archived = list(lj.archive_dir(path).glob("*.jsonl"))
+    assert len(archived) == 1 and len(archived[0].read_text().splitlines()) == 2
+
+    # replaying the archived records on the new base changes nothing
+    replay = lj.fold(pd.read_csv(path), [
+        lj.update_op("c_p", {"case status": "Reopened"}), lj.remove_op("a_p")])
+    pd.testing.assert_frame_equal(replay.reset_index(drop=True), before.reset_index(drop=True))
+
+def test_read_rows_reads_only_the_asked_rows(tmp_path, monkeypatch):
+    path = _live(tmp_path)
+    lj.append(path, [lj.update_op("a_p", {"case status": "Closed"}), lj.remove_op("b_p"),
+                     lj.insert_op("d_p", {"subject name": "D", "primary position": "P"})], source="unit")
+    full = lj.read_live(path)
+    lj.base_offsets(path)
+    with monkeypatch.context() as m:
+        m.setattr(lj, "read_live", None)              # no full read of live
+        got = lj.read_rows(path, ["a_p", "b_p", "d_p", "x_p"])
+    pd.testing.assert_frame_equal(got.reset_index(drop=True),
+                                  full[full["subject name"] != "C"].reset_index(drop=True))
+
+    lj.compact(path)                                  # a new base gets new offsets
+    assert lj.read_rows(path, ["c_p", "d_p"])["subject name"].tolist() == ["C", "D"]
+
+def test_csv_index_follows_ops_incrementally(tmp_path, monkeypatch, cache_dir):
+    from scripts import row_index
+    import scripts.run_weekly_pipeline as pipeline
+    path = _live(tmp_path)
+    idx = pipeline.refresh_live_index(path)
+
+    batches = [[lj.insert_op("d_p", {"subject name": "D", "primary position": "P", "case status": "New"}),
+                lj.remove_op("a_p")],
+               [lj.insert_op("e_p", {"subject name": "E", "primary position": "P"}),
+                lj.update_op("d_p", {"subject name": "D", "primary position": "P", "case status": "Open"}),
+                lj.insert_op("a_p", {"subject name": "A", "primary position": "P", "case status": "New"})]]
+    for ops in batches:
+        lj.append(path, ops, source="unit")
+        with monkeypatch.context() as m:
+            m.setattr(pipeline, "load_live", None)    # no full read of live
+            idx = pipeline.update_live_index(idx, ops, path)
+    full = pipeline.refresh_live_index(path)
+    assert idx["row_id"].tolist() == full["row_id"].tolist() == ["b_p", "c_p", "d_p", "e_p", "a_p"]
+    assert idx["hash"].tolist() == full["hash"].tolist()
+    assert row_index.load(path) is not None
@@ -0,0 +1,60 @@
+import pandas as pd
+from scripts import manual_approver as ma
+
+def _diff():
+    return pd.DataFrame({
+        "row_id": ["a_p", "b_p", "c_p"],
+        "change_type": "value_changed",
+        "changed_fields": ["case status", "case status", "region"],
+        "case status_old": ["open", "open", "open"], "case status_new": ["closed", "pending", "open"],
+        "region_old": ["ca", "ca", "ca"], "region_new": ["ca", "ca", "tx"],
+    })
+
+def test_session_checkpoints_and_resumes(tmp_path):
+    path, diff = tmp_path / "Review_x.jsonl", _diff()
+    session = ma.ReviewSession(path, "digest-1")
+    session.decide([0, 1], "y")                        # a whole changed_fields group
+    session.decide([2], "o", {"region": "NV"})
+
+    resumed = ma.ReviewSession(path, "digest-1")
+    assert sorted(resumed.decisions) == [0, 1, 2]
+    assert ma.session_rows(diff, resumed, "y")["row_id"].tolist() == ["a_p", "b_p"]
+    assert ma.session_rows(diff, resumed, "o")["region_new"].tolist() == ["NV"]
+
+    resumed.mark_applied([0, 1])
+    again = ma.ReviewSession(path, "digest-1")
+    assert ma.session_rows(diff, again, "y").empty       # applied rows are not applied twice
+
+    fresh = ma.ReviewSession(path, "digest-2")           # diff content changed
+    assert fresh.decisions == {} and len(list(tmp_path.glob("Review_x_stale_*.jsonl"))) == 1
+
+def test_journal_ops_from_columns():
+    upd = _diff().set_index("row_id")
+    upd["date case created_new"] = ["2020-05-05 00:00:00", None, "not a date"]
+    ops = ma.journal_ops(upd, {"a_p", "c_p"}, ["case status", "region", "date case created"])
+    assert [(o["op"], o["row_id"]) for o in ops] == [("update", "a_p"), ("insert", "b_p"), ("update", "c_p")]
+    assert ops[0]["values"] == {"case status": "closed"}
+    assert str(ops[1]["values"]["date case created"]) == "None"
+    assert ops[2]["values"] == {"region": "tx"}
+
+def test_resumed_review_keeps_each_batch(tmp_path, monkeypatch, cache_dir):
+    from scripts import change_index, diff_store, live_db, schema
+    import scripts.run_weekly_pipeline as pipeline
+    live = pd.DataFrame({c: None for c in schema.COLUMNS}, index=range(2))
+    live["subject name"], live["primary position"], live["case status"] = ["A", "B"], "P", "Open"
+    monkeypatch.setattr(pipeline, "LIVE_PATH", tmp_path / "live.csv")
+    monkeypatch.setattr(live_db, "DB_PATH", tmp_path / "live.sqlite")
+    for name in ("DIFF_WIDE", "APPROVED_DIR", "SESSION_DIR", "REPORT_DIR"):
+        monkeypatch.setattr(ma, name, tmp_path / name.lower())
+    monkeypatch.setattr(change_index, "INDEX_PATH", tmp_path / "index.sqlite")
+    pipeline.write_live(live)
+    wide, long = pipeline.diff_frames(live, live.assign(**{"case status": "Closed"}), "weekly_vs_live")
+    with diff_store.DiffWriter(tmp_path / "diff_wide" / "Changes_2025-07-19", tmp_path / "long") as w:
+        w.write("weekly_vs_live", wide, long)
+
+    for answers in (["y", "s"], ["y"]):                 # approve one, skip; resume and approve the other
+        monkeypatch.setattr("builtins.input", lambda _, a=iter(answers): next(a))
+        ma.main([])
+    assert len(list((tmp_path / "approved_dir").glob("Approved_Changes_*.csv"))) == 2
+    for rid in ("a_p", "b_p"):
+        assert change_index.timeline(rid, "case status")["source"].tolist() == ["approved"]
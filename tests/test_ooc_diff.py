@@ -0,0 +1,57 @@
+import pandas as pd
+from scripts import diff_store, ooc_diff
+from scripts.run_weekly_pipeline import diff_frames
+
+def _rows(n, renamed=None):
+    names = [f"subject {i:05d}" for i in range(n)]
+    if renamed is not None:
+        names[renamed] += "x"           # a typo fix that record linkage pairs up
+    return pd.DataFrame({"subject name": names, "primary position": "analyst",
+                         "case status": ["open" if i % 7 else "closed" for i in range(n)]})
+
+def _chunks(df, rows):
+    return (df.iloc[i:i + rows] for i in range(0, len(df), rows))
+
+def _inputs():
+    old = _rows(1500).iloc[::-1].reset_index(drop=True)
+    new = _rows(1600, renamed=123).drop(index=range(200, 260))
+    new.loc[new.index % 11 == 0, "case status"] = "pending"
+    return old, new
+
+def test_matches_in_memory_diff(tmp_path, monkeypatch):
+    monkeypatch.setattr(ooc_diff, "PAGE_ROWS", 40)   # many runs, pages and merge passes
+    monkeypatch.setattr(ooc_diff, "LINK_COST", 0.1)  # ... but the new/removed rows fit for linkage
+    old, new = _inputs()
+
+    mem, ooc = tmp_path / "mem", tmp_path / "ooc"
+    with diff_store.DiffWriter(mem / "wide", mem / "long") as w:
+        w.write("weekly_vs_live", *diff_frames(old.copy(), new.copy(), "weekly_vs_live"))
+    with diff_store.DiffWriter(ooc / "wide", ooc / "long") as w:
+        ooc_diff.diff_chunks(w, "weekly_vs_live", _chunks(old, 300), _chunks(new, 250), mb=0.01,
+                             workdir=tmp_path)
+
+    for kind in ("wide", "long"):
+        assert diff_store.partitions(mem / kind) == diff_store.partitions(ooc / kind)
+        for ctype in diff_store.CHANGE_TYPES:
+            a, b = (diff_store.read(d / kind, change_type=ctype) for d in (mem, ooc))
+            if ctype == "value_changed":   # linked pairs are written last
+                a, b = (x.sort_values(["row_id", "field"] if kind == "long" else "row_id",
+                                      ignore_index=True) for x in (a, b))
+            pd.testing.assert_frame_equal(a, b)
+    linked = diff_store.read(ooc / "wide", change_type="value_changed").dropna(subset="matched_row_id")
+    assert "subject 00123_analyst" in set(linked["matched_row_id"])
+    assert list(tmp_path.glob("ooc_diff_*")) == []   # scratch runs are removed
+
+def test_unlinked_past_the_budget(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(ooc_diff, "PAGE_ROWS", 40)
+    old, new = _inputs()
+    mem, ooc = tmp_path / "mem", tmp_path / "ooc"
+    with diff_store.DiffWriter(mem / "wide", mem / "long") as w:
+        w.write("weekly_vs_live", *diff_frames(old.copy(), new.copy(), "weekly_vs_live", link=False))
+    with diff_store.DiffWriter(ooc / "wide", ooc / "long") as w:
+        ooc_diff.diff_chunks(w, "weekly_vs_live", _chunks(old, 300), _chunks(new, 250), mb=0.01,
+                             workdir=tmp_path)
+    assert "written unlinked" in capsys.readouterr().out
+    for kind in ("wide", "long"):
+        assert diff_store.partitions(mem / kind) == diff_store.partitions(ooc / kind)
+        pd.testing.assert_frame_equal(diff_store.read(mem / kind), diff_store.read(ooc / kind))
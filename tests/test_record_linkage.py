@@ -0,0 +1,23 @@
+import numpy as np
+from scripts import record_linkage as rl
+
+def test_match_pairs_typos_only():
+    left = ["alice chen_acme corp", "emily wang_gamma inc", "bill hicks_risa"]
+    right = ["zed quinn_orion group", "alice chen_acme corpd", "emily wangd_gamma inc"]
+    same = np.zeros((3, 2), dtype=object)   # the other fields all agree
+    li, ri, conf = rl.match(left, right, same, same)
+    assert list(zip(li, ri)) == [(0, 1), (1, 2)]
+    assert (conf >= rl.THRESHOLD).all()
+
+def test_field_disagreement_blocks_match():
+    fields = lambda *v: np.array([v], dtype=object)
+    li, _, _ = rl.match(["person 1_p"], ["person 11_p"],
+                        fields("p1@x.com", "2020-01-01"), fields("p11@x.com", "2021-03-04"))
+    assert not len(li)
+
+def test_blocking_keeps_candidates_linear():
+    keys = [f"subject {i:05d}_analyst" for i in range(5000)]
+    grams = [rl.grams(k) for k in keys]
+    li, ri = rl.candidates(keys, keys, grams, grams)
+    assert len(li) <= (rl.TOP_K + 2 * rl.WINDOW) * len(keys)
+    assert (li == ri).sum() == len(keys)   # every key still finds itself
@@ -0,0 +1,30 @@
+import pandas as pd
+from scripts import schema
+from scripts.run_weekly_pipeline import diff_frames
+
+def _frame(status, region, dates):
+    return pd.DataFrame({"subject name": ["A", "B", "C"], "primary position": "P",
+                         "case status": status, "region": region, "date case created": dates})
+
+def test_typed_columns():
+    df = schema.typed(_frame(["Open", None, "Open"], ["CA", "CA", "NY"],
+                             ["2020-05-05 13:00", "5/6/2020", None]))
+    assert isinstance(df["case status"].dtype, pd.CategoricalDtype)
+    assert df["date case created"].tolist()[:2] == [pd.Timestamp("2020-05-05"), pd.Timestamp("2020-05-06")]
+    assert df["subject name"].dtype == object
+
+def test_unparseable_dates_are_left_as_text():
+    df = schema.typed(_frame(["Open"] * 3, ["CA"] * 3, ["2020-05-05", "soon", None]))
+    assert df["date case created"].tolist()[1] == "soon"
+
+def test_typed_diff_matches_untyped():
+    old = _frame(["Open", None, "Closed"], ["CA", "NY", None], ["2020-05-05", None, "2020-05-07"])
+    new = _frame(["OPEN ", "Open", "Closed"], ["CA", None, "TX"], ["2020-05-05", "2020-05-06", None])
+    for d in (old, new):   # loaders parse dates either way
+        d["date case created"] = pd.to_datetime(d["date case created"])
+    plain = diff_frames(old.copy(), new.copy(), "unit")
+    typed = diff_frames(schema.typed(old.copy()), schema.typed(new.copy()), "unit")
+    for a, b in zip(plain, typed):
+        assert a.to_csv(index=False) == b.to_csv(index=False)
+    assert plain[0]["changed_fields"].tolist() == ["date case created, case status, region",
+                                                   "date case created, region"]
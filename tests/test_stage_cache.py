@@ -0,0 +1,39 @@
+import pandas as pd
+from scripts import stage_cache
+
+def test_stage_reused_until_input_changes(tmp_path, cache_dir):
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    src.write_text("a\n1\n"); out.write_text("result\n")
+
+    assert not stage_cache.reuse("clean", [src], [out])
+    stage_cache.record("clean", [src], [out])
+    assert stage_cache.reuse("clean", [src], [out])
+    assert not stage_cache.reuse("clean", [src], [out], {"compression": "zstd"})
+    stage_cache.record("clean", [src], [out], {"compression": "zstd"})
+    assert stage_cache.reuse("clean", [src], [out], {"compression": "zstd"})
+    stage_cache.record("clean", [src], [out])
+
+    copy = tmp_path / "out_copy.csv"
+    assert stage_cache.reuse("clean", [src], [copy])
+    assert copy.read_text() == "result\n"
+
+    src.write_text("a\n2\n")
+    assert not stage_cache.reuse("clean", [src], [out])
+
+def test_cached_frame_reloads_until_file_changes(tmp_path, cache_dir):
+    src = tmp_path / "live.csv"
+    src.write_text("a\n1\n")
+    calls = []
+    def read(p):
+        calls.append(p)
+        return pd.read_csv(p)
+
+    first = stage_cache.cached_frame(src, read)
+    again = stage_cache.cached_frame(src, read)
+    pd.testing.assert_frame_equal(first, again)
+    assert len(calls) == 1
+
+    src.write_text("a\n1\n2\n")
+    assert len(stage_cache.cached_frame(src, read)) == 2
+    assert len(calls) == 2
+    assert len(list((tmp_path / "cache" / "frames").glob("*.pkl"))) == 1
@@ -0,0 +1,29 @@
+import shutil, subprocess, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def _python(code, cwd):
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+
+def test_imports_and_status_have_no_side_effects(tmp_path):
+    shutil.copytree(ROOT / "scripts", tmp_path / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    _python("from scripts.run_weekly_pipeline import diff_frames\n"
+            "import scripts.manual_approver, scripts.watch_daemon, scripts.ooc_diff", tmp_path)
+    out = _python("import sys\nfrom scripts import stakeholder\nstakeholder.main(['status'])\n"
+                  "assert 'pandas' not in sys.modules", tmp_path).stdout
+    assert "not seeded yet" in out
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["scripts"]   # no data/ dirs created
+
+def test_delegated_help_skips_pandas(tmp_path):
+    shutil.copytree(ROOT / "scripts", tmp_path / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    for cmd in ("diff", "approve", "benchmark"):
+        out = _python("import sys\nfrom scripts import stakeholder\ntry:\n"
+                      f"    stakeholder.main(['{cmd}', '--help'])\nexcept SystemExit as e:\n    assert e.code == 0\n"
+                      "assert 'pandas' not in sys.modules and 'numpy' not in sys.modules", tmp_path).stdout
+        assert out.startswith(f"usage: stakeholder {cmd}")
+
+def test_light_parsers_match_the_modules():
+    from scripts import cli_args, run_weekly_pipeline, manual_approver
+    assert run_weekly_pipeline.parser.parse_args([]) == cli_args.pipeline_parser().parse_args([])
+    assert manual_approver.parser.parse_args([]) == cli_args.approver_parser().parse_args([])
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scripts.utils import normalize_text, normalize_text_series, proper_case_status, build_row_id
+
+@pytest.mark.parametrize("values", [
+    [" Alice ", None, np.nan, "ALICE", "bob"],
+    [1, 1.0, True, "A ", None],
+    pd.to_datetime(["2020-05-05", None, "2021-01-02 03:04:05"], format="mixed"),
+    [],
+])
+def test_normalize_text_series_matches_scalar(values):
+    s = pd.Series(values, dtype=None if len(values) else object)
+    assert normalize_text_series(s).tolist() == s.apply(normalize_text).tolist()
+
+def test_normalize_text_series_categorical():
+    out = normalize_text_series(pd.Series(["CA ", "ca", None]), categorical=True)
+    assert isinstance(out.dtype, pd.CategoricalDtype)
+    assert out.tolist() == ["ca", "ca", ""]
+
+def test_proper_case_status_keeps_null_rendering():
+    df = proper_case_status(pd.DataFrame({"status": ["approved", None, np.nan, "PENDING"]}))
+    assert df["status"].tolist() == ["Approved", "None", "Nan", "Pending"]
+
+def test_build_row_id_reports_every_duplicate_group():
+    df = pd.DataFrame({"subject name": ["A", "a ", "B", "b", "C"], "primary position": "P"})
+    with pytest.raises(ValueError) as err:
+        build_row_id(df)
+    assert "'a_p': [0, 1]" in str(err.value) and "'b_p': [2, 3]" in str(err.value)